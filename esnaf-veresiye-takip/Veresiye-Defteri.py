@@ -2,19 +2,45 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
+
+# Açılış aşamaları: (aşama, bitiş zamanı); --profile-startup ile süreleri yazdırılır
+STARTUP_MARKS = [("başlangıç", time.perf_counter())]
+
+def mark_startup(phase):
+    STARTUP_MARKS.append((phase, time.perf_counter()))
+
 import os
-import sqlite3
-import csv
-import json
-import shutil
-import winreg  # Windows kayıt defteri işlemleri için
-import win32api
-import win32con
+import bisect
+import copy
 from datetime import datetime, timedelta
-from PyQt5.QtWidgets import *ß
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
-import pandas as pd  # For Excel export/import
+mark_startup("import: standart kütüphane")
+
+# Qt modülleri açılış süresinin büyük kısmıdır; yalnızca kullanılan adlar alınır.
+# openpyxl ve pywin32 ilk kullanıldıkları yerde yüklenir.
+from PyQt5.QtCore import (QAbstractTableModel, QEvent, QModelIndex, QObject, QRunnable, QThreadPool, QTimer,
+                          Qt, pyqtSignal)
+mark_startup("import: PyQt5.QtCore")
+from PyQt5.QtGui import QColor, QFont, QIcon, QKeySequence, QPainter
+mark_startup("import: PyQt5.QtGui")
+from PyQt5.QtWidgets import (QAbstractItemView, QApplication, QCheckBox, QComboBox, QDialog, QFileDialog,
+                             QFormLayout, QGroupBox, QHBoxLayout, QInputDialog, QLabel, QLineEdit,
+                             QMainWindow, QMenu, QMessageBox, QProgressDialog, QPushButton, QRadioButton,
+                             QShortcut, QSpinBox, QStyle, QStyledItemDelegate, QSystemTrayIcon, QTableView,
+                             QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+mark_startup("import: PyQt5.QtWidgets")
+
+from veresiye import (EMPTY_PAGE, EMPTY_STATS, BackupCancelled, ImportCancelled, Ledger, VeresiyeError,
+                      format_money, parse_money, set_startup, is_startup_enabled)
+mark_startup("import: veresiye")
+
+def print_startup_profile():
+    """Açılış aşamalarının sürelerini yazdır (--profile-startup)"""
+    print("Açılış profili (ms):", file=sys.stderr)
+    for (_, previous), (phase, finished) in zip(STARTUP_MARKS, STARTUP_MARKS[1:]):
+        print(f"  {phase:<34}{(finished - previous) * 1000:9.1f}", file=sys.stderr)
+    total = STARTUP_MARKS[-1][1] - STARTUP_MARKS[0][1]
+    print(f"  {'toplam':<34}{total * 1000:9.1f}", file=sys.stderr)
 
 # EXE için gerekli kaynak yolu çözümleme fonksiyonu
 def resource_path(relative_path):
@@ -26,489 +52,77 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-def get_app_data_folder():
-    """Uygulama verilerini saklamak için klasör yolu"""
-    if sys.platform == "win32":
-        base_path = os.path.join(os.environ['APPDATA'], "VeresiyeDefteri")
-    else:
-        base_path = os.path.join(os.path.expanduser('~'), ".veresiyedefteri")
-    
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
-    return base_path
-
-def set_startup(enabled=True):
-    """Uygulamayı Windows başlangıcına ekle/kaldır"""
-    if sys.platform != "win32":
-        return False
-        
-    app_name = "VeresiyeDefteri"
-    key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
-    
-    try:
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER,
-            key_path,
-            0,
-            winreg.KEY_WRITE | winreg.KEY_READ
-        )
-        
-        if enabled:
-            # EXE veya script yolunu al
-            if getattr(sys, 'frozen', False):
-                # PyInstaller ile paketlenmiş
-                app_path = sys.executable
-            else:
-                # Script olarak çalışıyor
-                app_path = os.path.abspath(sys.argv[0])
-            
-            # Kayıt defterine ekle
-            winreg.SetValueEx(key, app_name, 0, winreg.REG_SZ, f'"{app_path}" --minimized')
-        else:
-            # Kayıt defterinden kaldır
-            try:
-                winreg.DeleteValue(key, app_name)
-            except FileNotFoundError:
-                # Zaten kayıtlı değilse sorun yok
-                pass
-        
-        winreg.CloseKey(key)
-        return True
-    except Exception as e:
-        print(f"Başlangıç ayarı hatası: {str(e)}")
-        return False
+class Database:
+    """Arayüz için motor sarmalayıcısı: motor hatalarını mesaj kutusuyla bildirir.
 
-def is_startup_enabled():
-    """Uygulamanın başlangıçta açılıp açılmadığını kontrol et"""
-    if sys.platform != "win32":
-        return False
-        
-    app_name = "VeresiyeDefteri"
-    key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
+    Diğer bütün öznitelikler doğrudan motora (self.engine) yönlendirilir;
+    arka plan işleri hataları kendileri ele almak için motoru kullanır.
+    """
+    
+    # Hatası kullanıcıya gösterilen motor metotları -> hata durumunda dönen değer
+    REPORTED = {
+        "get_ledger_stats": EMPTY_STATS,
+        "add_customer": None,
+        "get_customers": EMPTY_PAGE,
+        "search_customers": EMPTY_PAGE,
+        "count_customers": 0,
+        "update_customer_debt": None,
+        "get_customer": None,
+        "get_payments": [],
+        "delete_customer": None,
+        "delete_payment": False,
+        "restore_customer": False,
+        "restore_point": False,
+        "restore_from": False,
+        "get_setting": None,
+        "set_setting": False,
+        "set_settings": False,
+    }
+    
+    def __init__(self, db_name=None):
+        self.engine = Ledger(db_name, initialize=False)
+        self.init_db()
     
-    try:
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER,
-            key_path,
-            0,
-            winreg.KEY_READ
-        )
+    def __getattr__(self, name):
+        attribute = getattr(self.engine, name)
+        if name not in self.REPORTED:
+            return attribute
+        fallback = self.REPORTED[name]
         
-        try:
-            value, _ = winreg.QueryValueEx(key, app_name)
-            winreg.CloseKey(key)
-            return value is not None
-        except FileNotFoundError:
-            winreg.CloseKey(key)
-            return False
-    except Exception:
-        return False
-
-class Database:
-    def __init__(self):
-        # Veritabanını kullanıcının appdata klasörüne kaydet
-        self.db_name = os.path.join(get_app_data_folder(), "veresiye.db")
-        self.init_db()
-        self.backup_folder = os.path.join(get_app_data_folder(), "backups")
-        if not os.path.exists(self.backup_folder):
-            os.makedirs(self.backup_folder)
+        def reported(*args, **kwargs):
+            try:
+                return attribute(*args, **kwargs)
+            except VeresiyeError as e:
+                QMessageBox.critical(None, "Hata", str(e))
+                # Liste gibi değiştirilebilir dönüş değerleri paylaşılmasın
+                return copy.copy(fallback)
+        return reported
     
     def init_db(self):
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            # Müşteriler tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS customers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    surname TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    debt REAL DEFAULT 0,
-                    created_date TEXT
-                )
-            ''')
-            
-            # Ödemeler tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS payments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    customer_id INTEGER,
-                    amount REAL,
-                    payment_type TEXT,
-                    note TEXT,
-                    date TEXT,
-                    FOREIGN KEY (customer_id) REFERENCES customers (id)
-                )
-            ''')
-            
-            # Ayarlar tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-            
-            # Otomatik yedekleme ayarları
-            cursor.execute('''
-                INSERT OR IGNORE INTO settings (key, value) 
-                VALUES ('auto_backup', 'daily')
-            ''')
-            
-            cursor.execute('''
-                INSERT OR IGNORE INTO settings (key, value) 
-                VALUES ('last_backup', '')
-            ''')
-            
-            cursor.execute('''
-                INSERT OR IGNORE INTO settings (key, value) 
-                VALUES ('theme', 'light')
-            ''')
-            
-            # Başlangıçta açılma ayarı
-            cursor.execute('''
-                INSERT OR IGNORE INTO settings (key, value) 
-                VALUES ('start_with_windows', '0')
-            ''')
-            
-            conn.commit()
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Veritabanı Hatası", f"Veritabanı başlatılamadı: {str(e)}")
-        finally:
-            conn.close()
-    
-    def add_customer(self, name, surname="", phone="", address="", debt=0):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO customers (name, surname, phone, address, debt, created_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (name, surname, phone, address, debt, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            conn.commit()
-            return cursor.lastrowid
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Müşteri eklenemedi: {str(e)}")
-            return None
-        finally:
-            conn.close()
-    
-    def get_customers(self, filter_type="all", page=1, page_size=50):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            base_query = "SELECT * FROM customers"
-            if filter_type == "debt":
-                base_query += " WHERE debt > 0"
-            elif filter_type == "paid":
-                base_query += " WHERE debt <= 0"
-            
-            offset = (page - 1) * page_size
-            query = f"{base_query} LIMIT {page_size} OFFSET {offset}"
-            cursor.execute(query)
-            customers = cursor.fetchall()
-            return customers
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Müşteriler yüklenemedi: {str(e)}")
-            return []
-        finally:
-            conn.close()
-    
-    def search_customers(self, search_text, filter_type="all", page=1, page_size=50):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            search_query = f"%{search_text}%"
-            base_query = '''
-                SELECT * FROM customers 
-                WHERE (name LIKE ? OR surname LIKE ? OR phone LIKE ?)
-            '''
-            
-            if filter_type == "debt":
-                base_query += " AND debt > 0"
-            elif filter_type == "paid":
-                base_query += " AND debt <= 0"
-            
-            offset = (page - 1) * page_size
-            query = f"{base_query} LIMIT {page_size} OFFSET {offset}"
-            cursor.execute(query, (search_query, search_query, search_query))
-            customers = cursor.fetchall()
-            return customers
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Arama hatası: {str(e)}")
-            return []
-        finally:
-            conn.close()
-    
-    def update_customer_debt(self, customer_id, amount, is_payment=True, note=""):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            current_debt = self.get_customer(customer_id)[5]
-            if is_payment:
-                new_debt = current_debt - amount
-                cursor.execute("UPDATE customers SET debt = ? WHERE id = ?", (new_debt, customer_id))
-                payment_type = "payment"
-            else:
-                new_debt = current_debt + amount
-                cursor.execute("UPDATE customers SET debt = ? WHERE id = ?", (new_debt, customer_id))
-                payment_type = "debt"
-            
-            # Ödeme kaydını ekle
-            cursor.execute('''
-                INSERT INTO payments (customer_id, amount, payment_type, date, note)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (customer_id, amount, payment_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), note))
-            
-            conn.commit()
-            return cursor.lastrowid
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Borç güncellenemedi: {str(e)}")
-            return None
-        finally:
-            conn.close()
-    
-    def get_customer(self, customer_id):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
-            customer = cursor.fetchone()
-            return customer
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Müşteri bilgisi alınamadı: {str(e)}")
-            return None
-        finally:
-            conn.close()
+            self.engine.init_db()
+        except VeresiyeError as e:
+            QMessageBox.critical(None, "Veritabanı Hatası", str(e))
     
-    def get_payments(self, customer_id, days=None):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            if days:
-                date_limit = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-                cursor.execute('''
-                    SELECT * FROM payments WHERE customer_id = ? AND date >= ?
-                    ORDER BY date DESC
-                ''', (customer_id, date_limit))
-            else:
-                cursor.execute('''
-                    SELECT * FROM payments WHERE customer_id = ?
-                    ORDER BY date DESC
-                ''', (customer_id,))
-            
-            payments = cursor.fetchall()
-            return payments
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Ödemeler yüklenemedi: {str(e)}")
-            return []
-        finally:
-            conn.close()
-    
-    def delete_customer(self, customer_id):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
-            cursor.execute("DELETE FROM payments WHERE customer_id = ?", (customer_id,))
-            conn.commit()
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Müşteri silinemedi: {str(e)}")
-        finally:
-            conn.close()
-    
-    def get_total_debt(self):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT SUM(debt) FROM customers WHERE debt > 0")
-            total = cursor.fetchone()[0]
-            return total if total else 0
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Toplam borç hesaplanamadı: {str(e)}")
-            return 0
-        finally:
-            conn.close()
-    
-    def get_average_debt(self):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT AVG(debt) FROM customers WHERE debt > 0")
-            avg = cursor.fetchone()[0]
-            return avg if avg else 0
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Ortalama borç hesaplanamadı: {str(e)}")
-            return 0
-        finally:
-            conn.close()
-    
-    def export_to_csv(self, filename):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM customers")
-            customers = cursor.fetchall()
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['ID', 'Ad', 'Soyad', 'Telefon', 'Adres', 'Borç', 'Kayıt Tarihi'])
-                writer.writerows(customers)
-            
-            return True
-        except (sqlite3.Error, IOError) as e:
-            QMessageBox.critical(None, "Hata", f"CSV dışa aktarma hatası: {str(e)}")
-            return False
-        finally:
-            conn.close()
-    
-    def export_to_excel(self, filename):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            df = pd.read_sql_query("SELECT * FROM customers", conn)
-            df.to_excel(filename, index=False, sheet_name='Müşteriler')
-            return True
-        except Exception as e:
-            QMessageBox.critical(None, "Hata", f"Excel dışa aktarma hatası: {str(e)}")
-            return False
-        finally:
-            conn.close()
-    
-    def import_from_csv(self, filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                next(reader)  # Başlık satırını atla
-                conn = sqlite3.connect(self.db_name)
-                cursor = conn.cursor()
-                for row in reader:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO customers (id, name, surname, phone, address, debt, created_date)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', row)
-                conn.commit()
-            return True
-        except (sqlite3.Error, IOError, csv.Error) as e:
-            QMessageBox.critical(None, "Hata", f"CSV içe aktarma hatası: {str(e)}")
-            return False
-        finally:
-            conn.close()
-    
-    def import_from_excel(self, filename):
-        try:
-            df = pd.read_excel(filename, sheet_name='Müşteriler')
-            conn = sqlite3.connect(self.db_name)
-            df.to_sql('customers', conn, if_exists='replace', index=False)
-            return True
-        except Exception as e:
-            QMessageBox.critical(None, "Hata", f"Excel içe aktarma hatası: {str(e)}")
-            return False
-        finally:
-            conn.close()
-    
-    def get_setting(self, key):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Ayar alınamadı: {str(e)}")
-            return None
-        finally:
-            conn.close()
-    
-    def set_setting(self, key, value):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO settings (key, value) 
-                VALUES (?, ?)
-            ''', (key, value))
-            conn.commit()
-            
-            # Windows başlangıç ayarını güncelle
-            if key == 'start_with_windows':
-                set_startup(value == '1')
-            
-            return True
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Hata", f"Ayar kaydedilemedi: {str(e)}")
-            return False
-        finally:
-            conn.close()
-    
-    def auto_backup(self):
-        frequency = self.get_setting('auto_backup')
-        last_backup = self.get_setting('last_backup')
-        
-        if not frequency or frequency == "none":
-            return
-        
-        now = datetime.now()
-        if last_backup:
-            last_date = datetime.strptime(last_backup, "%Y-%m-%d %H:%M:%S")
-        else:
-            last_date = datetime(2000, 1, 1)
-        
-        should_backup = False
-        if frequency == "hourly" and (now - last_date).total_seconds() >= 3600:
-            should_backup = True
-        elif frequency == "daily" and (now - last_date).days >= 1:
-            should_backup = True
-        elif frequency == "weekly" and (now - last_date).days >= 7:
-            should_backup = True
-        elif frequency == "monthly" and now.month != last_date.month:
-            should_backup = True
-        
-        if should_backup:
-            self.do_backup("auto", "csv")
-    
-    def do_backup(self, backup_type="manual", format="csv"):
-        try:
-            if backup_type == "auto":
-                folder = self.backup_folder
-            else:
-                folder = QFileDialog.getExistingDirectory(None, "Yedek Klasörü Seç", os.path.expanduser("~"))
-                if not folder:
-                    return None
-            
-            timestamp = datetime.now().strftime('%d-%m-%Y_%H%M')
-            if format == "csv":
-                filename = os.path.join(folder, f"veresiye_yedek_{timestamp}.csv")
-                if self.export_to_csv(filename):
-                    self.set_setting('last_backup', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                    return filename
-            elif format == "excel":
-                filename = os.path.join(folder, f"veresiye_yedek_{timestamp}.xlsx")
-                if self.export_to_excel(filename):
-                    self.set_setting('last_backup', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                    return filename
-            return None
-        except Exception as e:
-            QMessageBox.critical(None, "Hata", f"Yedekleme hatası: {str(e)}")
-            return None
-
 class SystemTrayIcon(QSystemTrayIcon):
-    def __init__(self, icon, parent=None):
-        QSystemTrayIcon.__init__(self, icon, parent)
-        self.parent = parent
-        menu = QMenu(parent)
+    def __init__(self, icon, app):
+        QSystemTrayIcon.__init__(self, icon, app)
+        self.app = app
+        # CSV/Excel yedekleri arka planda, sırayla yazılır
+        self.file_pool = QThreadPool(self)
+        self.file_pool.setMaxThreadCount(1)
+        self.export_task = None
+        # Menünün üst penceresi yok; başvuru burada tutulur
+        self.menu = menu = QMenu()
         
         open_action = menu.addAction("Aç")
         open_action.triggered.connect(self.show_window)
         
         menu.addSeparator()
         
+        backup_db_action = menu.addAction("Yedekle (Veritabanı)")
+        backup_db_action.triggered.connect(lambda: self.backup("db"))
+        
         backup_csv_action = menu.addAction("Yedekle (CSV)")
         backup_csv_action.triggered.connect(lambda: self.backup("csv"))
         
@@ -521,6 +135,7 @@ class SystemTrayIcon(QSystemTrayIcon):
         exit_action.triggered.connect(self.exit_application)
         
         self.setContextMenu(menu)
+        self.setToolTip("Veresiye Defteri")
         self.activated.connect(self.on_tray_icon_activated)
     
     def on_tray_icon_activated(self, reason):
@@ -528,16 +143,60 @@ class SystemTrayIcon(QSystemTrayIcon):
             self.show_window()
     
     def show_window(self):
-        self.parent.show()
-        self.parent.raise_()
-        self.parent.activateWindow()
+        # Yalnızca tepside başlatıldıysa ana pencere burada ilk kez kurulur
+        window = self.app.show_main_window()
+        window.raise_()
+        window.activateWindow()
     
     def backup(self, format):
-        filename = self.parent.db.do_backup("manual", format)
+        if format == "db":
+            # Veritabanı yedeği arka planda alınır; sonuç bitince bildirilir
+            task = self.app.scheduler.backup_manually()
+            if task is not None:
+                task.signals.finished.connect(lambda filename, created: self.on_backup_finished(format, filename))
+            return
+        
+        folder = QFileDialog.getExistingDirectory(None, "Yedek Klasörü Seç", os.path.expanduser("~"))
+        if not folder:
+            return
+        # Dışa aktarma arayüz iş parçacığını bekletmez; Hesap penceresindeki gibi ExportTask ile yazılır
+        task = ExportTask(self.app.db.engine, self.app.db.backup_filename(folder, format), format)
+        progress = QProgressDialog("Yedekleniyor...", "İptal", 0, 100)
+        progress.setWindowTitle("Yedekle")
+        progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(lambda done, total: progress.setValue(min(done * 100 // total, 100))
+                                      if total else progress.setMaximum(0))
+        task.signals.finished.connect(progress.close)
+        task.signals.finished.connect(lambda filename: self.on_backup_finished(format, filename))
+        task.signals.failed.connect(progress.close)
+        task.signals.failed.connect(self.on_export_failed)
+        self.export_task = task
+        self.file_pool.start(task)
+    
+    def cancel_export(self):
+        """Çalışan CSV/Excel yedeğini iptal et ve bitmesini bekle (yarım dosya silinir)"""
+        if self.export_task is not None:
+            self.export_task.cancel()
+            self.file_pool.waitForDone()
+            self.export_task = None
+    
+    def on_backup_finished(self, format, filename):
+        if format != "db":
+            self.export_task = None
         if filename:
             self.showMessage("Yedekleme", f"{format.upper()} yedekleme tamamlandı: {filename}", QSystemTrayIcon.Information, 3000)
     
+    def on_export_failed(self, message):
+        self.export_task = None
+        QMessageBox.critical(None, "Hata", message)
+    
     def exit_application(self):
+        # Yarım kalan otomatik yedek ve dışa aktarma beklenmeden iptal edilir
+        self.app.scheduler.cancel_backup()
+        self.cancel_export()
         QApplication.quit()
 
 class AddCustomerDialog(QDialog):
@@ -602,9 +261,11 @@ class AddCustomerDialog(QDialog):
         address = self.address_edit.text().strip()
         
         try:
-            debt = float(self.debt_edit.text()) if self.debt_edit.text() else 0
+            debt = parse_money(self.debt_edit.text()) if self.debt_edit.text() else 0
         except ValueError:
-            debt = 0
+            # Yuvarlanamayan ya da okunamayan tutar sıfır sayılmaz; kullanıcı düzeltir
+            QMessageBox.warning(self, "Uyarı", "Geçerli bir borç miktarı giriniz!")
+            return
         
         self.customer_data = {
             'name': name,
@@ -626,7 +287,7 @@ class CustomerProfileDialog(QDialog):
     
     def init_ui(self):
         self.setWindowTitle("Müşteri Profili")
-        self.setFixedSize(600, 700)
+        self.setFixedSize(600, 770)
         
         layout = QVBoxLayout()
         
@@ -709,7 +370,7 @@ class CustomerProfileDialog(QDialog):
             info_text = f"<b>Ad-Soyad:</b> {customer[1]} {customer[2] or ''}<br>"
             info_text += f"<b>Telefon:</b> {customer[3] or 'Belirtilmemiş'}<br>"
             info_text += f"<b>Adres:</b> {customer[4] or 'Belirtilmemiş'}<br>"
-            info_text += f"<b>Güncel Borç:</b> <span style='color: {'red' if customer[5] > 0 else 'green'};'>{customer[5]:.2f} TL</span>"
+            info_text += f"<b>Güncel Borç:</b> <span style='color: {'red' if customer[5] > 0 else 'green'};'>{format_money(customer[5])}</span>"
             self.customer_info_label.setText(info_text)
         
         # Ödeme geçmişini yükle
@@ -718,7 +379,7 @@ class CustomerProfileDialog(QDialog):
         
         for i, payment in enumerate(payments):
             date_str = payment[5][:16]  # Tarih ve saat
-            amount = f"{payment[2]:.2f} TL"
+            amount = format_money(payment[2])
             payment_type = "Ödeme" if payment[3] == "payment" else "Borç"
             note = payment[4] or ""
             
@@ -735,18 +396,18 @@ class CustomerProfileDialog(QDialog):
     
     def process_transaction(self, is_payment):
         try:
-            amount = float(self.amount_edit.text())
+            amount = parse_money(self.amount_edit.text())
             if amount <= 0:
                 QMessageBox.warning(self, "Uyarı", "Geçerli bir miktar giriniz!")
                 return
             
             note = self.note_edit.text().strip()
-            payment_id = self.db.update_customer_debt(self.customer_id, amount, is_payment, note)
-            if payment_id:
+            entry = self.db.update_customer_debt(self.customer_id, amount, is_payment, note)
+            if entry:
                 self.parent().undo_stack.append({
                     'action': 'transaction',
                     'customer_id': self.customer_id,
-                    'payment_id': payment_id,
+                    'payment_id': entry.payment_id,
                     'is_payment': is_payment,
                     'amount': amount
                 })
@@ -755,7 +416,7 @@ class CustomerProfileDialog(QDialog):
                 self.note_edit.clear()
                 
                 action = "ödeme" if is_payment else "borç"
-                QMessageBox.information(self, "Başarılı", f"{amount:.2f} TL {action} kaydedildi!")
+                QMessageBox.information(self, "Başarılı", f"{format_money(amount)} {action} kaydedildi!")
         except ValueError:
             QMessageBox.warning(self, "Uyarı", "Geçerli bir miktar giriniz!")
     
@@ -763,39 +424,16 @@ class CustomerProfileDialog(QDialog):
         reply = QMessageBox.question(self, "Onay", "Bu işlemi silmek istediğinizden emin misiniz?")
         if reply == QMessageBox.Yes:
             # Ödemeyi veritabanından sil ve borcu güncelle
-            try:
-                conn = sqlite3.connect(self.db.db_name)
-                cursor = conn.cursor()
-                
-                # Ödeme bilgilerini al
-                cursor.execute("SELECT customer_id, amount, payment_type FROM payments WHERE id = ?", (payment_id,))
-                payment = cursor.fetchone()
-                
-                if payment:
-                    customer_id = payment[0]
-                    amount = payment[1]
-                    is_payment = (payment[2] == "payment")
-                    
-                    # Borcu tersine çevir
-                    if is_payment:
-                        cursor.execute("UPDATE customers SET debt = debt + ? WHERE id = ?", (amount, customer_id))
-                    else:
-                        cursor.execute("UPDATE customers SET debt = debt - ? WHERE id = ?", (amount, customer_id))
-                    
-                    # Ödemeyi sil
-                    cursor.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
-                    conn.commit()
-                
+            if self.db.delete_payment(payment_id):
                 self.load_customer_data()
-            except sqlite3.Error as e:
-                QMessageBox.critical(self, "Hata", f"İşlem silinemedi: {str(e)}")
-            finally:
-                conn.close()
 
 class AccountDialog(QDialog):
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
+        # İçe/dışa aktarma işleri sırayla arka planda çalışır
+        self.file_pool = QThreadPool(self)
+        self.file_pool.setMaxThreadCount(1)
         self.init_ui()
         self.calculate_totals()
     
@@ -814,10 +452,14 @@ class AccountDialog(QDialog):
         
         self.average_debt_label = QLabel()
         self.debtor_count_label = QLabel()
+        self.day_debits_label = QLabel()
+        self.day_credits_label = QLabel()
         
         info_layout.addWidget(self.total_debt_label)
         info_layout.addWidget(self.average_debt_label)
         info_layout.addWidget(self.debtor_count_label)
+        info_layout.addWidget(self.day_debits_label)
+        info_layout.addWidget(self.day_credits_label)
         
         calculate_btn = QPushButton("Toplam Borcu Hesapla")
         calculate_btn.clicked.connect(self.calculate_totals)
@@ -830,6 +472,14 @@ class AccountDialog(QDialog):
         backup_group = QGroupBox("Yedekleme ve Veri Yönetimi")
         backup_layout = QVBoxLayout()
         
+        backup_db_btn = QPushButton("Yedekle (Veritabanı)")
+        backup_db_btn.clicked.connect(lambda: self.backup_data("db"))
+        backup_layout.addWidget(backup_db_btn)
+        
+        restore_btn = QPushButton("Yedekten Geri Yükle")
+        restore_btn.clicked.connect(self.restore_backup)
+        backup_layout.addWidget(restore_btn)
+        
         backup_csv_btn = QPushButton("Yedekle (CSV)")
         backup_csv_btn.clicked.connect(lambda: self.backup_data("csv"))
         backup_layout.addWidget(backup_csv_btn)
@@ -868,43 +518,125 @@ class AccountDialog(QDialog):
         self.setLayout(layout)
     
     def calculate_totals(self):
-        total_debt = self.db.get_total_debt()
-        avg_debt = self.db.get_average_debt()
+        stats = self.db.get_ledger_stats()
         
-        try:
-            conn = sqlite3.connect(self.db.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM customers WHERE debt > 0")
-            debtor_count = cursor.fetchone()[0]
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Hata", f"Borçlu sayısı hesaplanamadı: {str(e)}")
-            debtor_count = 0
-        finally:
-            conn.close()
-        
-        self.total_debt_label.setText(f"Toplam Borç: {total_debt:.2f} TL")
-        self.average_debt_label.setText(f"Ortalama Borç: {avg_debt:.2f} TL")
-        self.debtor_count_label.setText(f"Borçlu Müşteri Sayısı: {debtor_count}")
+        self.total_debt_label.setText(f"Toplam Borç: {format_money(stats.total_debt)}")
+        self.average_debt_label.setText(f"Ortalama Borç: {format_money(stats.average_debt)}")
+        self.debtor_count_label.setText(f"Borçlu Müşteri Sayısı: {stats.debtor_count}")
+        self.day_debits_label.setText(f"Bugün Yazılan Borç: {format_money(stats.day_debits)}")
+        self.day_credits_label.setText(f"Bugün Alınan Ödeme: {format_money(stats.day_credits)}")
     
     def backup_data(self, format):
-        filename = self.db.do_backup("manual", format)
+        if format == "db":
+            # Veritabanı yedeği otomatik yedeklerle aynı iş parçacığında, çakışmadan alınır
+            task = self.parent().scheduler.backup_manually(self)
+            if task is not None:
+                task.signals.finished.connect(lambda filename, created: self.on_backup_finished(None, filename))
+            return
+        
+        folder = QFileDialog.getExistingDirectory(self, "Yedek Klasörü Seç", os.path.expanduser("~"))
+        if not folder:
+            return
+        task = ExportTask(self.db.engine, self.db.backup_filename(folder, format), format)
+        progress = self.start_file_task(task, "Yedekleniyor...", "Yedekle")
+        task.signals.finished.connect(lambda filename: self.on_backup_finished(progress, filename))
+        task.signals.failed.connect(lambda message: self.on_task_failed(progress, message))
+    
+    def on_backup_finished(self, progress, filename):
+        if progress is not None:
+            progress.close()
         if filename:
             self.backup_info_label.setText(f"Yedeklendi: {os.path.basename(filename)}\nSon Yedek: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
             QMessageBox.information(self, "Başarılı", f"Yedekleme tamamlandı:\n{filename}")
     
+    def start_file_task(self, task, label, title):
+        """İşi arka planda başlat; ilerlemeyi gösteren, iptal edilebilen pencereyi döndür"""
+        progress = QProgressDialog(label, "İptal", 0, 100, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(lambda done, total: self.on_task_progress(progress, done, total))
+        self.file_pool.start(task)
+        return progress
+    
+    def restore_backup(self):
+        # Depodaki geri yükleme noktaları, en yeniden eskiye; en sonda dosyadan seçme
+        points = self.db.backups.snapshots()
+        kinds = {"full": "tam", "delta": "artımlı"}
+        items = [f"{entry['created']} ({kinds.get(entry['kind'], entry['kind'])})" for entry in points]
+        items.append("Dosyadan seç...")
+        item, ok = QInputDialog.getItem(self, "Yedekten Geri Yükle", "Geri yükleme noktası:", items, 0, False)
+        if not ok:
+            return
+        
+        entry = points[items.index(item)] if item in items[:-1] else None
+        filename = None
+        if entry is None:
+            filename, _ = QFileDialog.getOpenFileName(self, "Yedek Dosyası Seç", self.db.backup_folder,
+                                                      "Veritabanı Yedeği (*.db *.db.gz *.db.zst)")
+            if not filename:
+                return
+        
+        reply = QMessageBox.question(self, "Onay", "Mevcut veriler seçilen yedekle değiştirilecek. Devam edilsin mi?")
+        if reply == QMessageBox.Yes:
+            # Arka planda çalışan arama, dosya işi ve yedek eski bağlantıyı kullanmasın
+            self.parent().cancel_search(wait=True)
+            self.parent().scheduler.cancel_backup()
+            self.file_pool.waitForDone()
+            restored = self.db.restore_point(entry) if entry else self.db.restore_from(filename)
+            if restored:
+                self.calculate_totals()
+                self.parent().load_customers()
+                QMessageBox.information(self, "Başarılı", "Yedek geri yüklendi!")
+    
     def import_data(self, format):
         filename, _ = QFileDialog.getOpenFileName(self, "Veri Dosyası Seç", "", f"{format.upper()} Files (*.{format})")
-        if filename:
-            if format == "csv":
-                success = self.db.import_from_csv(filename)
-            else:
-                success = self.db.import_from_excel(filename)
-            if success:
-                QMessageBox.information(self, "Başarılı", "Veriler içe aktarıldı! Uygulamayı yeniden başlatın.")
-                self.parent().load_customers()
+        if not filename:
+            return
+        
+        # Büyük dosyalar arka planda aktarılır; pencere ilerleme gösterir ve iptal edilebilir
+        task = ImportTask(self.db.engine, filename, format)
+        progress = self.start_file_task(task, "Veriler içe aktarılıyor...", "İçe Aktar")
+        task.signals.finished.connect(lambda result: self.on_import_finished(progress, result))
+        task.signals.failed.connect(lambda message: self.on_task_failed(progress, message))
+    
+    def on_task_progress(self, progress, done, total):
+        if total:
+            progress.setValue(min(done * 100 // total, 100))
+        else:
+            # Boyutu yazılmamış Excel dosyalarında toplam bilinmez; belirsiz çubuk gösterilir
+            progress.setMaximum(0)
+    
+    def on_import_finished(self, progress, result):
+        progress.close()
+        if result is None:
+            QMessageBox.information(self, "İçe Aktar", "İçe aktarma iptal edildi, veriler değiştirilmedi.")
+            return
+        
+        self.calculate_totals()
+        self.parent().load_customers()
+        message = f"{result.imported} müşteri içe aktarıldı."
+        if result.payments:
+            message += f"\n{result.payments} ödeme kaydı içe aktarıldı."
+        if result.failed:
+            lines = "\n".join(f"Satır {line}: {error}" for line, error in result.errors[:10])
+            message += f"\n{result.failed} satır atlandı:\n{lines}"
+            if result.failed > 10:
+                message += "\n..."
+            QMessageBox.warning(self, "İçe Aktar", message)
+        else:
+            QMessageBox.information(self, "Başarılı", message)
+    
+    def on_task_failed(self, progress, message):
+        progress.close()
+        QMessageBox.critical(self, "Hata", message)
     
     def open_backup_folder(self):
-        backup_folder = self.db.backup_folder
+        # Depo klasörü ilk yedekte oluşturulur; henüz yedek alınmadıysa boş açılır
+        backup_folder = self.db.backups.ensure_folder()
         if sys.platform == "win32":
             os.startfile(backup_folder)
         elif sys.platform == "darwin":
@@ -913,23 +645,12 @@ class AccountDialog(QDialog):
             os.system(f"xdg-open '{backup_folder}'")
     
     def clean_backups(self):
-        # 30 günden eski yedekleri sil
-        backup_folder = self.db.backup_folder
-        now = datetime.now()
-        deleted = 0
-        
-        for filename in os.listdir(backup_folder):
-            filepath = os.path.join(backup_folder, filename)
-            if os.path.isfile(filepath) and (filename.endswith(".csv") or filename.endswith(".xlsx")):
-                try:
-                    file_date_str = filename.split("_")[-1].split(".")[0]
-                    file_date = datetime.strptime(file_date_str, "%d-%m-%Y_%H%M")
-                    if (now - file_date).days > 30:
-                        os.remove(filepath)
-                        deleted += 1
-                except ValueError:
-                    pass
-        
+        # Depoda saklama kurallarını uygula, depo öncesi 30 günden eski yedekleri sil
+        try:
+            deleted = self.db.backups.prune() + self.db.backups.remove_legacy(days=30)
+        except OSError as e:
+            QMessageBox.critical(self, "Hata", f"Yedekler silinemedi: {str(e)}")
+            return
         QMessageBox.information(self, "Başarılı", f"{deleted} eski yedek dosyası silindi!")
 
 class StyleManager:
@@ -950,7 +671,7 @@ class StyleManager:
             QPushButton:hover {
                 background-color: #45a049;
             }
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 background-color: white;
                 alternate-background-color: #f9f9f9;
@@ -1008,7 +729,7 @@ class StyleManager:
                 border-radius: 4px;
                 color: white;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #353535;
                 gridline-color: #555;
                 color: white;
@@ -1050,32 +771,620 @@ class StyleManager:
             }
         """
 
+class CustomerTableModel(QAbstractTableModel):
+    """Ana listedeki müşteriler; kaydırdıkça parça parça yüklenir.
+
+    Satırlar (id, ad-soyad, telefon, borç) demetleridir ve bloklar halinde
+    tutulur. Her blok başladığı imleci saklar; görünür alandan uzak bloklar
+    bellekten atılır ve gerekirse aynı imleçle yeniden okunur.
+    """
+    
+    HEADERS = ["ID", "Ad-Soyad", "Telefon", "Borç", "Düzenle", "Sil"]
+    EDIT_COLUMN = 4
+    DELETE_COLUMN = 5
+    
+    BLOCK_SIZE = 100          # Veritabanından tek seferde okunan satır
+    PREFETCH_ROWS = 150       # Görünür alanın bu kadar altı yüklü tutulur
+    MAX_CACHED_BLOCKS = 20    # Bellekte tutulan en fazla blok
+    
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.search_text = ""
+        self.filter_type = "all"
+        self.clear()
+    
+    def clear(self):
+        # blocks: {"cursor": başlangıç imleci, "size": satır sayısı, "rows": liste ya da None}
+        self.blocks = []
+        self.offsets = []  # her bloğun ilk satır numarası (bisect için)
+        self.row_count = 0
+        self.next_cursor = None
+        self.has_more = False
+        self.row_of = {}  # bellekteki müşteri id -> satır numarası
+    
+    @staticmethod
+    def compact(customer):
+        full_name = f"{customer[1]} {customer[2] or ''}".strip()
+        return (customer[0], full_name, customer[3] or "", customer[5])
+    
+    @staticmethod
+    def debt_color(debt):
+        # Borç rengi (Yeşil: <500 TL, Sarı: 500-1000 TL, Kırmızı: >1000 TL); debt kuruş
+        if debt > 100000:
+            return QColor(255, 0, 0)  # Kırmızı (alarm)
+        elif debt > 50000:
+            return QColor(255, 165, 0)  # Sarı (riskli)
+        elif debt > 0:
+            return QColor(0, 128, 0)  # Yeşil (normal)
+        return QColor(0, 0, 0)  # Siyah
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.row_at(index.row())
+        if row is None:
+            return None
+        customer_id, full_name, phone, debt = row
+        column = index.column()
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(customer_id)
+            elif column == 1:
+                return full_name
+            elif column == 2:
+                return phone
+            elif column == 3:
+                return format_money(debt)
+        elif role == Qt.ForegroundRole and column == 3:
+            return self.debt_color(debt)
+        elif role == Qt.UserRole:
+            return customer_id
+        return None
+    
+    # --- Yükleme ---
+    
+    def fetch(self, cursor, page_size):
+        if self.search_text:
+            return self.db.search_customers(self.search_text, self.filter_type, cursor, False, page_size)
+        return self.db.get_customers(self.filter_type, cursor, False, page_size)
+    
+    def reset_query(self, search_text, filter_type, first_page=None):
+        """Yeni sorgu: listeyi boşalt ve ilk bloğu yükle (verildiyse onu kullan)"""
+        self.beginResetModel()
+        self.search_text = search_text
+        self.filter_type = filter_type
+        self.clear()
+        self.has_more = True
+        if first_page is None:
+            first_page = self.fetch(None, self.BLOCK_SIZE)
+        self._append_block(None, first_page)
+        self.endResetModel()
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.has_more:
+            return
+        page = self.fetch(self.next_cursor, self.BLOCK_SIZE)
+        if not page.customers:
+            self.has_more = False
+            return
+        self.beginInsertRows(QModelIndex(), self.row_count, self.row_count + len(page.customers) - 1)
+        self._append_block(self.next_cursor, page)
+        self.endInsertRows()
+    
+    def _append_block(self, cursor, page):
+        rows = [self.compact(customer) for customer in page.customers]
+        for i, row in enumerate(rows):
+            self.row_of[row[0]] = self.row_count + i
+        self.blocks.append({"cursor": cursor, "size": len(rows), "rows": rows})
+        self.offsets.append(self.row_count)
+        self.row_count += len(rows)
+        self.next_cursor = page.next_cursor
+        self.has_more = page.has_more
+    
+    def _block_index(self, row):
+        return bisect.bisect_right(self.offsets, row) - 1
+    
+    def row_at(self, row):
+        block_index = self._block_index(row)
+        if block_index < 0:
+            return None
+        block = self.blocks[block_index]
+        if block["rows"] is None:
+            self._reload_block(block_index)
+        position = row - self.offsets[block_index]
+        rows = block["rows"]
+        return rows[position] if position < len(rows) else None
+    
+    def _reload_block(self, block_index):
+        # Bellekten atılmış blok, başladığı imleçten tekrar okunur
+        block = self.blocks[block_index]
+        page = self.fetch(block["cursor"], block["size"])
+        block["rows"] = [self.compact(customer) for customer in page.customers][:block["size"]]
+        offset = self.offsets[block_index]
+        for i, row in enumerate(block["rows"]):
+            self.row_of[row[0]] = offset + i
+    
+    def set_viewport(self, first_row, last_row):
+        """Görünür alan değişti: ileriyi önceden yükle, uzak blokları bellekten at"""
+        while self.has_more and last_row + self.PREFETCH_ROWS >= self.row_count:
+            before = self.row_count
+            self.fetchMore()
+            if self.row_count == before:
+                break
+        
+        cached = [i for i, block in enumerate(self.blocks) if block["rows"] is not None]
+        if len(cached) <= self.MAX_CACHED_BLOCKS:
+            return
+        center = self._block_index(max(0, (first_row + last_row) // 2))
+        # Görünür alana en uzak bloklardan başlayarak at
+        cached.sort(key=lambda i: abs(i - center), reverse=True)
+        for block_index in cached[:len(cached) - self.MAX_CACHED_BLOCKS]:
+            block = self.blocks[block_index]
+            for row in block["rows"]:
+                self.row_of.pop(row[0], None)
+            block["rows"] = None
+    
+    # --- Satır düzeyinde değişiklikler ---
+    
+    def update_customer(self, customer):
+        """Tek satırı güncelle; yalnızca o satır için dataChanged yayınlanır"""
+        row = self.row_of.get(customer[0])
+        if row is None:
+            return
+        block_index = self._block_index(row)
+        self.blocks[block_index]["rows"][row - self.offsets[block_index]] = self.compact(customer)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+    
+    def remove_customer(self, customer_id):
+        row = self.row_of.get(customer_id)
+        if row is None:
+            return
+        block_index = self._block_index(row)
+        block = self.blocks[block_index]
+        
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del block["rows"][row - self.offsets[block_index]]
+        block["size"] -= 1
+        for i in range(block_index + 1, len(self.offsets)):
+            self.offsets[i] -= 1
+        self.row_count -= 1
+        self.row_of = {}
+        for i, cached in enumerate(self.blocks):
+            if cached["rows"] is not None:
+                for position, cached_row in enumerate(cached["rows"]):
+                    self.row_of[cached_row[0]] = self.offsets[i] + position
+        self.endRemoveRows()
+
+class CustomerActionDelegate(QStyledItemDelegate):
+    """Düzenle/Sil hücrelerini buton gibi çizer; gerçek widget oluşturmaz"""
+    
+    editClicked = pyqtSignal(int)
+    deleteClicked = pyqtSignal(int)
+    
+    BUTTONS = {
+        CustomerTableModel.EDIT_COLUMN: ("✏️ Düzenle", QColor("#2196F3")),
+        CustomerTableModel.DELETE_COLUMN: ("❌ Sil", QColor("#f44336")),
+    }
+    
+    def paint(self, painter, option, index):
+        button = self.BUTTONS.get(index.column())
+        if button is None:
+            super().paint(painter, option, index)
+            return
+        
+        text, color = button
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color.darker(110) if option.state & QStyle.State_MouseOver else color)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(QColor("white"))
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(rect, Qt.AlignCenter, text)
+        painter.restore()
+    
+    def editorEvent(self, event, model, option, index):
+        if index.column() in self.BUTTONS and event.type() == QEvent.MouseButtonRelease \
+                and event.button() == Qt.LeftButton and option.rect.contains(event.pos()):
+            customer_id = index.data(Qt.UserRole)
+            if index.column() == CustomerTableModel.EDIT_COLUMN:
+                self.editClicked.emit(customer_id)
+            else:
+                self.deleteClicked.emit(customer_id)
+            return True
+        return super().editorEvent(event, model, option, index)
+
+class SearchSignals(QObject):
+    finished = pyqtSignal(int, object, int)
+    failed = pyqtSignal(int, str)
+
+class SearchTask(QRunnable):
+    """Müşteri aramasını arka plan iş parçacığında çalıştırır"""
+    
+    def __init__(self, db, generation, search_text, filter_type, page_size):
+        super().__init__()
+        self.db = db
+        self.generation = generation
+        self.search_text = search_text
+        self.filter_type = filter_type
+        self.page_size = page_size
+        self.cancelled = False
+        self.signals = SearchSignals()
+    
+    def cancel(self):
+        # Çalışan sorgu SQLite ilerleme işleyicisi üzerinden kesilir
+        self.cancelled = True
+    
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            page = self.db.search_customers(self.search_text, self.filter_type, page_size=self.page_size,
+                                            cancelled=lambda: self.cancelled)
+            total = self.db.count_customers(self.search_text, self.filter_type)
+        except VeresiyeError as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self.generation, str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation, page, total)
+
+class BackupSignals(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str, bool)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+class BackupTask(QRunnable):
+    """Veritabanı yedeğini arka plan iş parçacığında alır.
+
+    folder verilmezse otomatik yedek (depoya), verilirse elle yedek (o
+    klasöre tek dosya) alınır.
+    """
+    
+    def __init__(self, db, folder=None):
+        super().__init__()
+        self.db = db
+        self.folder = folder
+        self.cancelled = False
+        self.signals = BackupSignals()
+    
+    def cancel(self):
+        # Çevrimiçi yedekleme bir sonraki sayfa adımında kesilir
+        self.cancelled = True
+    
+    def run(self):
+        if self.cancelled:
+            self.signals.cancelled.emit()
+            return
+        try:
+            if self.folder is None:
+                filename, created = self.db.run_auto_backup(progress=self.signals.progress.emit,
+                                                            cancelled=lambda: self.cancelled)
+            else:
+                filename = self.db.backup("db", self.folder, progress=self.signals.progress.emit,
+                                          cancelled=lambda: self.cancelled)
+                created = True
+        except BackupCancelled:
+            self.signals.cancelled.emit()
+            return
+        except VeresiyeError as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(filename, created)
+
+class FileSignals(QObject):
+    progress = pyqtSignal(int, int)
+    # ImportResult ya da yazılan dosya adı; iptal edildiyse None
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class ImportTask(QRunnable):
+    """CSV ya da Excel dosyasını arka plan iş parçacığında içe aktarır"""
+    
+    def __init__(self, db, filename, format="csv"):
+        super().__init__()
+        self.db = db
+        self.filename = filename
+        self.format = format
+        self.cancelled = False
+        self.signals = FileSignals()
+    
+    def cancel(self):
+        # Bir sonraki parçadan sonra kesilir; işlem geri alınır
+        self.cancelled = True
+    
+    def run(self):
+        importer = self.db.import_csv if self.format == "csv" else self.db.import_excel
+        try:
+            result = importer(self.filename, progress=self.signals.progress.emit,
+                              cancelled=lambda: self.cancelled)
+        except ImportCancelled:
+            self.signals.finished.emit(None)
+            return
+        except VeresiyeError as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+class ExportTask(QRunnable):
+    """CSV ya da Excel yedeğini arka plan iş parçacığında yazar"""
+    
+    def __init__(self, db, filename, format="csv"):
+        super().__init__()
+        self.db = db
+        self.filename = filename
+        self.format = format
+        self.cancelled = False
+        self.signals = FileSignals()
+    
+    def cancel(self):
+        # Bir sonraki parçada kesilir; yarım dosya silinir
+        self.cancelled = True
+    
+    def run(self):
+        try:
+            filename = self.db.export_backup(self.filename, self.format, progress=self.signals.progress.emit,
+                                             cancelled=lambda: self.cancelled)
+        except BackupCancelled:
+            self.signals.finished.emit(None)
+            return
+        except VeresiyeError as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(filename)
+
+class BackupScheduler(QWidget):
+    """Otomatik yedek zamanlayıcısı ve WAL checkpoint.
+
+    Ana pencereden bağımsızdır; uygulama yalnızca sistem tepsisinde çalışırken
+    de yedek alır. Hiç gösterilmeyen bir pencere olarak uyku dönüşü
+    bildirimini (WM_POWERBROADCAST) alır.
+    """
+    
+    # Başarısız otomatik yedek bu kadar sonra yeniden denenir
+    BACKUP_RETRY_MS = 15 * 60 * 1000
+    # QTimer aralığı 32 bit; daha uzak yedek zamanları ara uyanışlarla beklenir
+    MAX_TIMER_MS = 24 * 60 * 60 * 1000
+    
+    # Her commit'ten sonra (herhangi bir iş parçacığından) yazma sayısıyla yayılır
+    writes_committed = pyqtSignal(int)
+    # Ayar değiştiğinde (anahtar, yeni değer); ayar deposu dinleyicisinden yayılır
+    setting_changed = pyqtSignal(str, str)
+    
+    def __init__(self, db, tray_icon=None):
+        super().__init__()
+        self.db = db
+        self.tray_icon = tray_icon
+        self.setting_changed.connect(self.on_setting_changed)
+        self.db.settings.subscribe(self.setting_changed.emit)
+        
+        # Otomatik ve elle yedek: tek iş parçacığı, aynı anda en fazla bir yedek
+        self.backup_task = None
+        self.backup_pool = QThreadPool(self)
+        self.backup_pool.setMaxThreadCount(1)
+        
+        # Bir sonraki yedek zamanına kurulan tek seferlik zamanlayıcı,
+        # ayrıca isteğe bağlı olarak belirli sayıda yazmadan sonra
+        self.backup_after_writes = 0
+        self.backup_write_mark = self.db.connections.write_count
+        self.backup_timer = QTimer(self)
+        self.backup_timer.setSingleShot(True)
+        self.backup_timer.timeout.connect(self.check_auto_backup)
+        self.writes_committed.connect(self.on_writes_committed)
+        self.db.connections.commit_hook = self.writes_committed.emit
+        # Gizli pencerenin de uyku dönüşü bildirimini alması için yerel pencere gerekir
+        self.winId()
+        
+        # Uygulama boştayken WAL checkpoint
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.timeout.connect(self.db.checkpoint_if_idle)
+    
+    def start(self):
+        self.schedule_backup()
+        self.checkpoint_timer.start(30000)
+    
+    def on_setting_changed(self, key, value):
+        if key in ('auto_backup', 'last_backup', 'backup_after_writes'):
+            self.schedule_backup()
+    
+    def schedule_backup(self):
+        """Bir sonraki otomatik yedeğin zamanına tek seferlik zamanlayıcı kur"""
+        self.backup_timer.stop()
+        self.backup_after_writes = self.db.settings.get_int('backup_after_writes')
+        if self.backup_task is not None:
+            # Çalışan yedek bitince yeniden kurulur
+            return
+        
+        due = self.db.next_backup_time()
+        if due is None:
+            return
+        delay_ms = max(0, int((due - datetime.now()).total_seconds() * 1000))
+        self.backup_timer.start(min(delay_ms, self.MAX_TIMER_MS))
+    
+    def check_auto_backup(self):
+        # Önceki yedek sürerken yenisi başlatılmaz
+        if self.backup_task is not None:
+            return
+        if not self.db.backup_due():
+            # Ara uyanış ya da yedek zamanı elle alınan yedekle ileri kaydı
+            self.schedule_backup()
+            return
+        self.start_backup()
+    
+    def on_writes_committed(self, write_count):
+        if self.backup_after_writes <= 0 or self.backup_task is not None:
+            return
+        if write_count < self.backup_write_mark:
+            # Geri yüklemeden sonra bağlantılar sayaçla birlikte yenilendi
+            self.backup_write_mark = write_count
+        if write_count - self.backup_write_mark >= self.backup_after_writes:
+            self.start_backup()
+    
+    def nativeEvent(self, event_type, message):
+        # Uyku modundan dönüşte zamanlayıcı gecikmiş ya da yedek zamanı geçmiş olabilir
+        if bytes(event_type) == b"windows_generic_MSG":
+            # Yalnızca Windows'ta buraya gelinir; pywin32 ilk iletide yüklenir
+            from ctypes import wintypes
+            import win32con
+            msg = wintypes.MSG.from_address(int(message))
+            if (msg.message == win32con.WM_POWERBROADCAST and
+                    msg.wParam in (win32con.PBT_APMRESUMEAUTOMATIC, win32con.PBT_APMRESUMESUSPEND)):
+                self.schedule_backup()
+        return super().nativeEvent(event_type, message)
+    
+    def start_backup(self, folder=None):
+        """Yedeği arka planda başlat; başka bir yedek sürüyorsa None döndürür"""
+        if self.backup_task is not None:
+            return None
+        self.backup_timer.stop()
+        self.backup_write_mark = self.db.connections.write_count
+        task = BackupTask(self.db.engine, folder)
+        task.signals.progress.connect(self.on_backup_progress)
+        task.signals.finished.connect(self.on_backup_finished)
+        task.signals.failed.connect(self.on_backup_failed)
+        task.signals.cancelled.connect(self.on_backup_cancelled)
+        self.backup_task = task
+        self.backup_pool.start(task)
+        return task
+    
+    def backup_manually(self, parent=None):
+        """Elle veritabanı yedeği: klasör sorulur, yedek ilerleme penceresiyle arka planda alınır.
+
+        Başlayan işi döndürür (sonucu task.signals.finished ile alınır);
+        vazgeçildiyse ya da başka bir yedek sürüyorsa None.
+        """
+        folder = QFileDialog.getExistingDirectory(parent, "Yedek Klasörü Seç", os.path.expanduser("~"))
+        if not folder:
+            return None
+        task = self.start_backup(folder)
+        if task is None:
+            QMessageBox.information(parent, "Yedekleme", "Başka bir yedekleme sürüyor, bitince tekrar deneyin.")
+            return None
+        
+        progress = QProgressDialog("Yedekleniyor...", "İptal", 0, 100, parent)
+        progress.setWindowTitle("Yedekle")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(lambda done, total: progress.setValue(min(done * 100 // total, 100))
+                                      if total else None)
+        task.signals.finished.connect(progress.close)
+        task.signals.cancelled.connect(progress.close)
+        task.signals.failed.connect(progress.close)
+        task.signals.failed.connect(lambda message: QMessageBox.critical(parent, "Hata", message))
+        return task
+    
+    def on_backup_progress(self, copied, total):
+        if self.tray_icon is not None and total:
+            self.tray_icon.setToolTip(f"Veresiye Defteri - Yedekleniyor %{copied * 100 // total}")
+    
+    def on_backup_finished(self, filename, created):
+        manual = self.backup_task is not None and self.backup_task.folder is not None
+        self.backup_task = None
+        # Yedeğin kendi yazmaları (last_backup, günlük temizliği) sayılmaz
+        self.backup_write_mark = self.db.connections.write_count
+        self.schedule_backup()
+        if self.tray_icon is not None:
+            self.tray_icon.setToolTip("Veresiye Defteri")
+            # Elle alınan yedeğin sonucunu başlatan pencere gösterir
+            if created and not manual:
+                self.tray_icon.showMessage("Yedekleme", f"Otomatik yedek alındı: {os.path.basename(filename)}",
+                                           QSystemTrayIcon.Information, 3000)
+    
+    def on_backup_failed(self, message):
+        manual = self.backup_task is not None and self.backup_task.folder is not None
+        self.backup_task = None
+        if self.tray_icon is not None:
+            self.tray_icon.setToolTip("Veresiye Defteri")
+        if manual:
+            self.schedule_backup()
+            return
+        self.backup_timer.start(self.BACKUP_RETRY_MS)
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("Yedekleme", message,
+                                       QSystemTrayIcon.Warning, 5000)
+    
+    def on_backup_cancelled(self):
+        self.backup_task = None
+        if self.tray_icon is not None:
+            self.tray_icon.setToolTip("Veresiye Defteri")
+        self.schedule_backup()
+    
+    def cancel_backup(self, timeout_ms=5000):
+        """Çalışan otomatik yedeği iptal et ve iş parçacığının bitmesini bekle"""
+        if self.backup_task is not None:
+            self.backup_task.cancel()
+            self.backup_pool.waitForDone(timeout_ms)
+            self.backup_task = None
+
 class MainWindow(QMainWindow):
-    def __init__(self, minimized=False):
+    SEARCH_DEBOUNCE_MS = 250
+    
+    # Ayar değiştiğinde (anahtar, yeni değer); ayar deposu dinleyicisinden yayılır
+    setting_changed = pyqtSignal(str, str)
+    # İlk sayfa yüklendiğinde; uygulama kritik olmayan açılış işlerini bundan sonra yapar
+    first_page_loaded = pyqtSignal()
+    
+    def __init__(self, db, scheduler, tray_icon=None):
         super().__init__()
-        self.db = Database()
+        self.db = db
+        self.scheduler = scheduler
+        self.tray_icon = tray_icon
+        self.startup_pending = True
         self.undo_stack = []
         self.current_filter = "all"
-        self.current_page = 1
-        self.page_size = 50
+        self.current_theme = None
+        self.setting_changed.connect(self.on_setting_changed)
+        self.db.settings.subscribe(self.setting_changed.emit)
+        
+        # Arama: yazma bitene kadar bekle, yalnızca son sorgunun sonucunu uygula
+        self.search_generation = 0
+        self.search_task = None
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(1)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.start_search)
+        
         self.init_ui()
-        self.init_tray()
-        self.load_customers()
         self.apply_theme(self.db.get_setting('theme') or 'light')
-        
-        # Başlangıçta açılma ayarını uygula
-        startup_enabled = self.db.get_setting('start_with_windows') == '1'
-        if startup_enabled and not is_startup_enabled():
-            set_startup(True)
-        
-        # Otomatik yedekleme kontrolü
-        self.auto_backup_timer = QTimer(self)
-        self.auto_backup_timer.timeout.connect(self.check_auto_backup)
-        self.auto_backup_timer.start(60000)  # Her dakika kontrol
-        
-        # Eğer --minimized argümanı ile başlatıldıysa
-        if minimized:
-            self.hide()
+        mark_startup("arayüz")
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.startup_pending:
+            # İlk sayfa pencere ilk kez çizildikten sonra yüklenir
+            self.startup_pending = False
+            mark_startup("ilk çizim")
+            QTimer.singleShot(0, self.load_first_page)
+    
+    def load_first_page(self):
+        self.load_customers()
+        mark_startup("ilk sayfa")
+        self.first_page_loaded.emit()
     
     def init_ui(self):
         self.setWindowTitle("Veresiye Defteri")
@@ -1119,9 +1428,17 @@ class MainWindow(QMainWindow):
         layout.addLayout(top_layout)
         
         # Müşteri tablosu
-        self.customers_table = QTableWidget()
-        self.customers_table.setColumnCount(6)
-        self.customers_table.setHorizontalHeaderLabels(["ID", "Ad-Soyad", "Telefon", "Borç", "Düzenle", "Sil"])
+        self.customer_model = CustomerTableModel(self.db, self)
+        self.customer_delegate = CustomerActionDelegate(self)
+        self.customer_delegate.editClicked.connect(self.edit_customer)
+        self.customer_delegate.deleteClicked.connect(self.delete_customer)
+        
+        self.customers_table = QTableView()
+        self.customers_table.setModel(self.customer_model)
+        self.customers_table.setItemDelegateForColumn(CustomerTableModel.EDIT_COLUMN, self.customer_delegate)
+        self.customers_table.setItemDelegateForColumn(CustomerTableModel.DELETE_COLUMN, self.customer_delegate)
+        self.customers_table.setMouseTracking(True)
+        self.customers_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.customers_table.horizontalHeader().setStretchLastSection(True)
         self.customers_table.setColumnWidth(0, 50)
         self.customers_table.setColumnWidth(1, 200)
@@ -1132,20 +1449,11 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(self.customers_table)
         
-        # Sayfalama
-        pagination_layout = QHBoxLayout()
-        self.prev_page_btn = QPushButton("Önceki Sayfa")
-        self.prev_page_btn.clicked.connect(self.prev_page)
-        pagination_layout.addWidget(self.prev_page_btn)
+        # Liste kaydırdıkça yüklenir; görünür alan değişince modele bildir
+        self.customers_table.verticalScrollBar().valueChanged.connect(self.update_viewport)
         
-        self.page_label = QLabel("Sayfa 1")
-        pagination_layout.addWidget(self.page_label)
-        
-        self.next_page_btn = QPushButton("Sonraki Sayfa")
-        self.next_page_btn.clicked.connect(self.next_page)
-        pagination_layout.addWidget(self.next_page_btn)
-        
-        layout.addLayout(pagination_layout)
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
         
         # Alt filtre butonları
         filter_layout = QHBoxLayout()
@@ -1175,95 +1483,87 @@ class MainWindow(QMainWindow):
         undo_shortcut = QShortcut(QKeySequence("Ctrl+Z"), self)
         undo_shortcut.activated.connect(self.undo_last_action)
     
-    def init_tray(self):
-        if not QSystemTrayIcon.isSystemTrayAvailable():
-            return
-        
-        # EXE uyumlu ikon yolu
-        icon_path = resource_path("icon.ico")
-        icon = QIcon(icon_path) if os.path.exists(icon_path) else self.style().standardIcon(QStyle.SP_ComputerIcon)
-        self.tray_icon = SystemTrayIcon(icon, self)
-        self.tray_icon.show()
-    
     def apply_theme(self, theme):
-        if theme == 'dark':
-            self.setStyleSheet(StyleManager.get_dark_theme())
-        else:
-            self.setStyleSheet(StyleManager.get_light_theme())
+        # Stil sayfası ve ayar yalnızca tema gerçekten değiştiğinde yazılır
+        if theme != self.current_theme:
+            self.current_theme = theme
+            if theme == 'dark':
+                self.setStyleSheet(StyleManager.get_dark_theme())
+            else:
+                self.setStyleSheet(StyleManager.get_light_theme())
         self.db.set_setting('theme', theme)
     
+    def on_setting_changed(self, key, value):
+        if key == 'theme':
+            self.apply_theme(value)
+    
     def load_customers(self):
-        search_text = self.search_edit.text()
-        
-        if search_text:
-            customers = self.db.search_customers(search_text, self.current_filter, self.current_page, self.page_size)
-        else:
-            customers = self.db.get_customers(self.current_filter, self.current_page, self.page_size)
-        
-        self.customers_table.setRowCount(len(customers))
+        if self.search_edit.text():
+            self.start_search()
+            return
         
-        for i, customer in enumerate(customers):
-            # ID
-            self.customers_table.setItem(i, 0, QTableWidgetItem(str(customer[0])))
-            
-            # Ad-Soyad
-            full_name = f"{customer[1]} {customer[2] or ''}".strip()
-            self.customers_table.setItem(i, 1, QTableWidgetItem(full_name))
-            
-            # Telefon
-            phone = customer[3] or ""
-            self.customers_table.setItem(i, 2, QTableWidgetItem(phone))
-            
-            # Borç
-            debt = customer[5]
-            debt_item = QTableWidgetItem(f"{debt:.2f} TL")
-            
-            # Borç rengini ayarla (Yeşil: <500, Sarı: 500-1000, Kırmızı: >1000)
-            if debt > 1000:
-                debt_item.setForeground(QColor(255, 0, 0))  # Kırmızı (alarm)
-            elif debt > 500:
-                debt_item.setForeground(QColor(255, 165, 0))  # Sarı (riskli)
-            elif debt > 0:
-                debt_item.setForeground(QColor(0, 128, 0))  # Yeşil (normal)
-            else:
-                debt_item.setForeground(QColor(0, 0, 0))  # Siyah
-            
-            self.customers_table.setItem(i, 3, debt_item)
-            
-            # Düzenle butonu
-            edit_btn = QPushButton("✏️ Düzenle")
-            edit_btn.setStyleSheet("background-color: #2196F3; color: white;")
-            edit_btn.clicked.connect(lambda checked, c_id=customer[0]: self.edit_customer(c_id))
-            self.customers_table.setCellWidget(i, 4, edit_btn)
-            
-            # Sil butonu
-            delete_btn = QPushButton("❌ Sil")
-            delete_btn.setStyleSheet("background-color: #f44336; color: white;")
-            delete_btn.clicked.connect(lambda checked, c_id=customer[0]: self.delete_customer(c_id))
-            self.customers_table.setCellWidget(i, 5, delete_btn)
+        self.cancel_search()
+        self.customer_model.reset_query("", self.current_filter)
+        self.show_count(self.db.count_customers("", self.current_filter))
+    
+    def cancel_search(self, wait=False):
+        # Bekleyen ya da çalışan aramanın sonucu artık uygulanmaz
+        self.search_timer.stop()
+        self.search_generation += 1
+        if self.search_task:
+            # Kuyruktan alınmaz: iş bitmişse Qt nesnesi silinmiştir (autoDelete).
+            # Kuyrukta bekleyen iş başlayınca iptal bayrağını görüp hemen döner.
+            self.search_task.cancel()
+            self.search_task = None
+        if wait:
+            # Bağlantılar kapatılmadan önce iş parçacığı okuyucuyu bırakmış olmalı
+            self.search_pool.waitForDone()
+    
+    def start_search(self):
+        self.cancel_search()
+        search_text = self.search_edit.text()
+        if not search_text:
+            self.load_customers()
+            return
         
-        self.page_label.setText(f"Sayfa {self.current_page}")
+        task = SearchTask(self.db.engine, self.search_generation, search_text,
+                          self.current_filter, CustomerTableModel.BLOCK_SIZE)
+        task.signals.finished.connect(self.on_search_finished)
+        task.signals.failed.connect(self.on_search_failed)
+        self.search_task = task
+        self.search_pool.start(task)
     
-    def prev_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_customers()
+    def on_search_finished(self, generation, page, total):
+        if generation != self.search_generation:
+            return
+        self.search_task = None
+        self.customer_model.reset_query(self.search_edit.text(), self.current_filter, page)
+        self.show_count(total)
     
-    def next_page(self):
-        self.current_page += 1
-        self.load_customers()
-        # Eğer sayfa boşsa geri al
-        if self.customers_table.rowCount() == 0:
-            self.current_page -= 1
-            self.load_customers()
+    def on_search_failed(self, generation, message):
+        if generation != self.search_generation:
+            return
+        self.search_task = None
+        QMessageBox.critical(self, "Hata", message)
+    
+    def show_count(self, total):
+        self.count_label.setText(f"{total} müşteri")
+        self.update_viewport()
+    
+    def update_viewport(self):
+        view = self.customers_table
+        first_row = max(0, view.rowAt(0))
+        last_row = view.rowAt(view.viewport().height() - 1)
+        if last_row < 0:
+            last_row = self.customer_model.rowCount() - 1
+        self.customer_model.set_viewport(first_row, last_row)
     
     def filter_customers(self):
-        self.current_page = 1
-        self.load_customers()
+        # Her tuşta sorgu çalıştırma; yazma durunca tek arama başlat
+        self.search_timer.start()
     
     def set_filter(self, filter_type):
         self.current_filter = filter_type
-        self.current_page = 1
         self.load_customers()
         
         # Buton stillerini güncelle
@@ -1299,7 +1599,10 @@ class MainWindow(QMainWindow):
     def edit_customer(self, customer_id):
         dialog = CustomerProfileDialog(customer_id, self.db, self)
         dialog.exec_()
-        self.load_customers()
+        # Sadece düzenlenen satırı yenile
+        customer = self.db.get_customer(customer_id)
+        if customer:
+            self.customer_model.update_customer(customer)
     
     def delete_customer(self, customer_id):
         reply = QMessageBox.question(self, "Onay", "Bu müşteriyi ve tüm işlem geçmişini silmek istediğinizden emin misiniz?")
@@ -1313,12 +1616,11 @@ class MainWindow(QMainWindow):
                 'payments': payments
             })
             self.db.delete_customer(customer_id)
-            self.load_customers()
+            self.customer_model.remove_customer(customer_id)
     
     def show_settings(self):
         dialog = SettingsDialog(self.db, self)
         dialog.exec_()
-        self.apply_theme(self.db.get_setting('theme') or 'light')
     
     def show_account(self):
         dialog = AccountDialog(self.db, self)
@@ -1337,47 +1639,17 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Başarılı", "Müşteri ekleme geri alındı!")
         
         elif last_action['action'] == 'delete_customer':
-            try:
-                conn = sqlite3.connect(self.db.db_name)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO customers (id, name, surname, phone, address, debt, created_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', last_action['customer'])
-                for payment in last_action['payments']:
-                    cursor.execute('''
-                        INSERT INTO payments (id, customer_id, amount, payment_type, note, date)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', payment)
-                conn.commit()
+            if self.db.restore_customer(last_action['customer'], last_action['payments']):
                 self.load_customers()
                 QMessageBox.information(self, "Başarılı", "Müşteri silme geri alındı!")
-            except sqlite3.Error as e:
-                QMessageBox.critical(self, "Hata", f"Geri alma hatası: {str(e)}")
-            finally:
-                conn.close()
         
         elif last_action['action'] == 'transaction':
-            try:
-                conn = sqlite3.connect(self.db.db_name)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM payments WHERE id = ?", (last_action['payment_id'],))
-                customer_id = last_action['customer_id']
-                amount = last_action['amount']
-                if last_action['is_payment']:
-                    cursor.execute("UPDATE customers SET debt = debt + ? WHERE id = ?", (amount, customer_id))
-                else:
-                    cursor.execute("UPDATE customers SET debt = debt - ? WHERE id = ?", (amount, customer_id))
-                conn.commit()
+            if self.db.delete_payment(last_action['payment_id']):
                 self.load_customers()
                 QMessageBox.information(self, "Başarılı", "İşlem geri alındı!")
-            except sqlite3.Error as e:
-                QMessageBox.critical(self, "Hata", f"Geri alma hatası: {str(e)}")
-            finally:
-                conn.close()
     
     def closeEvent(self, event):
-        if hasattr(self, 'tray_icon') and self.tray_icon and self.tray_icon.isVisible():
+        if self.tray_icon is not None and self.tray_icon.isVisible():
             QMessageBox.information(self, "Veresiye Defteri", 
                                   "Uygulama sistem tepsisinde çalışmaya devam edecek.\n"
                                   "Çıkmak için sistem tepsisindeki menüden 'Çık' seçeneğini kullanın.")
@@ -1385,9 +1657,6 @@ class MainWindow(QMainWindow):
             event.ignore()
         else:
             event.accept()
-    
-    def check_auto_backup(self):
-        self.db.auto_backup()
 
 class SettingsDialog(QDialog):
     def __init__(self, db, parent=None):
@@ -1399,7 +1668,7 @@ class SettingsDialog(QDialog):
     
     def init_ui(self):
         self.setWindowTitle("Ayarlar")
-        self.setFixedSize(600, 700)
+        self.setFixedSize(600, 770)
         
         layout = QVBoxLayout()
         
@@ -1485,6 +1754,14 @@ class SettingsDialog(QDialog):
         backup_layout.addWidget(QLabel("Yedekleme Sıklığı:"))
         backup_layout.addWidget(self.backup_combo)
         
+        self.backup_writes_spin = QSpinBox()
+        self.backup_writes_spin.setRange(0, 10000)
+        self.backup_writes_spin.setSingleStep(50)
+        self.backup_writes_spin.setSuffix(" işlem")
+        self.backup_writes_spin.setSpecialValueText("Kapalı")
+        backup_layout.addWidget(QLabel("Şu kadar işlemden sonra da yedekle:"))
+        backup_layout.addWidget(self.backup_writes_spin)
+        
         backup_layout.addWidget(QLabel("Son Yedekleme:"))
         last_backup = self.db.get_setting('last_backup')
         self.last_backup_label = QLabel(last_backup if last_backup else "Henüz yedekleme yapılmadı")
@@ -1497,6 +1774,28 @@ class SettingsDialog(QDialog):
         backup_group.setLayout(backup_layout)
         layout.addWidget(backup_group)
         
+        # Sorgu izleme: yavaşlık şikâyetlerinde açılır, kapalıyken maliyeti yoktur
+        trace_group = QGroupBox("Sorgu İzleme")
+        trace_layout = QHBoxLayout()
+        
+        self.trace_check = QCheckBox("Sorguları izle")
+        trace_layout.addWidget(self.trace_check)
+        
+        self.slow_query_spin = QSpinBox()
+        self.slow_query_spin.setRange(1, 60000)
+        self.slow_query_spin.setSingleStep(50)
+        self.slow_query_spin.setSuffix(" ms")
+        self.slow_query_spin.setToolTip("Bu süreyi aşan sorgular planlarıyla birlikte günlüğe yazılır")
+        trace_layout.addWidget(QLabel("Yavaş sorgu eşiği:"))
+        trace_layout.addWidget(self.slow_query_spin)
+        
+        trace_summary_btn = QPushButton("Özet")
+        trace_summary_btn.clicked.connect(self.show_trace_summary)
+        trace_layout.addWidget(trace_summary_btn)
+        
+        trace_group.setLayout(trace_layout)
+        layout.addWidget(trace_group)
+        
         # Windows ile başlatma
         if sys.platform == "win32":
             startup_group = QGroupBox("Windows Başlangıç Ayarları")
@@ -1532,6 +1831,11 @@ class SettingsDialog(QDialog):
             index_map = {"none": 0, "hourly": 1, "daily": 2, "weekly": 3, "monthly": 4}
             self.backup_combo.setCurrentIndex(index_map.get(auto_backup, 0))
         
+        self.backup_writes_spin.setValue(self.db.settings.get_int('backup_after_writes'))
+        
+        self.trace_check.setChecked(self.db.settings.get_bool('trace_queries'))
+        self.slow_query_spin.setValue(self.db.settings.get_int('slow_query_ms', 100))
+        
         # Tema yükle
         theme = self.db.get_setting('theme') or 'light'
         if theme == 'dark':
@@ -1541,22 +1845,39 @@ class SettingsDialog(QDialog):
         
         # Windows başlangıç ayarını yükle
         if sys.platform == "win32":
-            startup_enabled = self.db.get_setting('start_with_windows') == '1'
-            self.startup_check.setChecked(startup_enabled)
+            self.startup_check.setChecked(self.db.settings.get_bool('start_with_windows'))
     
     def save_settings(self):
         # Otomatik yedekleme ayarını kaydet
+        # Tüm ayarlar tek işlemde kaydedilir; değişenler pencereye bildirilir
         index_map = {0: "none", 1: "hourly", 2: "daily", 3: "weekly", 4: "monthly"}
-        self.db.set_setting('auto_backup', index_map[self.backup_combo.currentIndex()])
+        values = {
+            'auto_backup': index_map[self.backup_combo.currentIndex()],
+            'backup_after_writes': str(self.backup_writes_spin.value()),
+            'trace_queries': '1' if self.trace_check.isChecked() else '0',
+            'slow_query_ms': str(self.slow_query_spin.value()),
+        }
         
         # Windows başlangıç ayarını kaydet
         if sys.platform == "win32":
-            startup_enabled = '1' if self.startup_check.isChecked() else '0'
-            self.db.set_setting('start_with_windows', startup_enabled)
+            values['start_with_windows'] = '1' if self.startup_check.isChecked() else '0'
+        
+        if not self.db.set_settings(values):
+            return
         
         QMessageBox.information(self, "Başarılı", "Ayarlar kaydedildi!")
         self.accept()
     
+    def show_trace_summary(self):
+        summary = self.db.tracing_summary()
+        if summary is None:
+            QMessageBox.information(self, "Sorgu İzleme", "Sorgu izleme kapalı.")
+            return
+        box = QMessageBox(QMessageBox.Information, "Sorgu İzleme",
+                          f"Yavaş sorgular şuraya yazılır:\n{self.db.tracer.log_file}", parent=self)
+        box.setDetailedText(summary)
+        box.exec_()
+    
     def select_logo(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Logo Seç", "", "Image Files (*.png *.jpg *.jpeg *.gif *.bmp)")
         if filename:
@@ -1577,10 +1898,13 @@ class SettingsDialog(QDialog):
             self.parent_widget.apply_theme('light')
     
     def backup_now(self):
-        filename = self.db.do_backup("manual", "csv")  # Varsayılan CSV, ama seçenek eklenebilir
-        if filename:
-            self.last_backup_label.setText(f"Son yedekleme: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
-            QMessageBox.information(self, "Başarılı", f"Yedekleme tamamlandı:\n{filename}")
+        task = self.parent_widget.scheduler.backup_manually(self)
+        if task is not None:
+            task.signals.finished.connect(self.on_backup_finished)
+    
+    def on_backup_finished(self, filename, created):
+        self.last_backup_label.setText(f"Son yedekleme: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+        QMessageBox.information(self, "Başarılı", f"Yedekleme tamamlandı:\n{filename}")
 
 # Ana uygulama çalıştırıcısı
 class VeresiyeDefteri(QApplication):
@@ -1588,6 +1912,8 @@ class VeresiyeDefteri(QApplication):
         super().__init__(args)
         self.setQuitOnLastWindowClosed(False)
         
+        mark_startup("QApplication")
+        
         # Uygulama bilgileri
         self.setApplicationName("Veresiye Defteri")
         self.setApplicationVersion("2.0")  # Geliştirilmiş versiyon
@@ -1601,16 +1927,28 @@ class VeresiyeDefteri(QApplication):
     def run(self):
         # --minimized argümanını kontrol et
         minimized = '--minimized' in sys.argv
+        self.profile_startup = '--profile-startup' in sys.argv
+        self.startup_pending = True
         
-        # Ana pencereyi oluştur ve göster
-        self.main_window = MainWindow(minimized=minimized)
+        # Tepsi, yedek zamanlayıcısı ve veritabanı her zaman; ana pencere ilk gösterildiğinde kurulur
+        self.db = Database()
+        mark_startup("veritabanı")
+        self.tray_icon = self.init_tray()
+        self.scheduler = BackupScheduler(self.db, self.tray_icon)
+        mark_startup("sistem tepsisi")
+        self.main_window = None
+        self.aboutToQuit.connect(self.shutdown)
         
-        if not minimized:
-            self.main_window.show()
+        if minimized:
+            # Çizilecek pencere yok; kritik olmayan işler olay döngüsü başlayınca yapılır
+            QTimer.singleShot(0, self.deferred_init)
+        else:
+            self.show_main_window()
+            mark_startup("pencere gösterildi")
         
         # Splash mesajı
-        if hasattr(self.main_window, 'tray_icon') and self.main_window.tray_icon:
-            self.main_window.tray_icon.showMessage(
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage(
                 "Veresiye Defteri",
                 "Uygulama başlatıldı ve sistem tepsisinde çalışıyor.",
                 QSystemTrayIcon.Information,
@@ -1618,6 +1956,52 @@ class VeresiyeDefteri(QApplication):
             )
         
         return self.exec_()
+    
+    def init_tray(self):
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return None
+        
+        # EXE uyumlu ikon yolu
+        icon_path = resource_path("icon.ico")
+        icon = QIcon(icon_path) if os.path.exists(icon_path) else self.style().standardIcon(QStyle.SP_ComputerIcon)
+        tray_icon = SystemTrayIcon(icon, self)
+        tray_icon.show()
+        return tray_icon
+    
+    def show_main_window(self):
+        if self.main_window is None:
+            self.main_window = MainWindow(self.db, self.scheduler, self.tray_icon)
+            self.main_window.first_page_loaded.connect(self.deferred_init)
+        self.main_window.show()
+        return self.main_window
+    
+    def deferred_init(self):
+        """İlk sayfadan (tepside başlatıldıysa olay döngüsünden) sonra: başlangıç kaydı ve yedek zamanlaması"""
+        if not self.startup_pending:
+            return
+        self.startup_pending = False
+        
+        # Başlangıçta açılma ayarını uygula
+        startup_enabled = self.db.settings.get_bool('start_with_windows')
+        if startup_enabled and not is_startup_enabled():
+            set_startup(True)
+        
+        self.scheduler.start()
+        mark_startup("ertelenmiş başlatma")
+        if self.profile_startup:
+            print_startup_profile()
+    
+    def shutdown(self):
+        # Veritabanı bağlantılarını düzgünce kapat
+        self.scheduler.cancel_backup()
+        self.tray_icon.cancel_export()
+        if self.main_window is not None:
+            self.main_window.cancel_search(wait=True)
+        try:
+            self.db.close()
+        except VeresiyeError:
+            # Kapanmayan bağlantılar süreçle birlikte kapanır; WAL bir sonraki açılışta işlenir
+            pass
 
 def main():
     app = VeresiyeDefteri(sys.argv)
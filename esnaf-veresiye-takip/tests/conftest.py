@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from veresiye import Ledger  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def app_data(tmp_path, monkeypatch):
+    """Uygulama veri klasörü (ve Windows'ta APPDATA) geçici klasöre yönlendirilir"""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("APPDATA", str(home))
+    return home
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = Ledger(str(tmp_path / "defter.db"))
+    yield ledger
+    ledger.close()
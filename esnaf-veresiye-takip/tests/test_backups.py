@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from veresiye import BackupError, BackupRepository, Ledger
+
+def _names(ledger):
+    return [row[1] for row in ledger.get_customers(page_size=100).customers]
+
+def test_backup_chain_and_restore_point(ledger):
+    ledger.add_customer("A0")
+    first, created = ledger.backup_incremental()
+    assert created and first["kind"] == "full"
+    
+    ledger.add_customer("A1")
+    second, _ = ledger.backup_incremental()
+    ledger.update_customer_debt(1, 500, False)
+    third, _ = ledger.backup_incremental()
+    assert (second["kind"], third["kind"]) == ("delta", "delta")
+    # Değişiklik yoksa yeni kayıt yazılmaz
+    assert ledger.backup_incremental() == (third, False)
+    
+    ledger.add_customer("sonradan")
+    assert ledger.restore_point(second)
+    assert _names(ledger) == ["A0", "A1"]
+    assert ledger.get_customer(1)[5] == 0
+    
+    assert ledger.restore_point(third)
+    assert ledger.get_customer(1)[5] == 500
+    assert ledger.get_ledger_stats().total_debt == 500
+    # Geri yüklemeden sonraki ilk yedek tam görüntüdür
+    assert ledger.backup_incremental()[0]["kind"] == "full"
+
+def test_db_backup_restores(ledger, tmp_path):
+    ledger.add_customer("Ayşe", debt=1500)
+    copy = ledger.backup("db", str(tmp_path))
+    ledger.add_customer("Sonradan")
+    assert ledger.restore_from(copy)
+    assert _names(ledger) == ["Ayşe"]
+    assert ledger.get_ledger_stats().total_debt == 1500
+
+def test_restore_rejects_foreign_file(ledger, tmp_path):
+    ledger.add_customer("Ayşe")
+    foreign = str(tmp_path / "yabanci.db")
+    conn = sqlite3.connect(foreign)
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(BackupError):
+        ledger.restore_from(foreign)
+    assert _names(ledger) == ["Ayşe"]
+
+def test_retention_keeps_chains_restorable(tmp_path):
+    repository = BackupRepository(str(tmp_path / "depo"), retention={"hourly": 2, "daily": 2, "weekly": 0,
+                                                                      "monthly": 0})
+    source = tmp_path / "kaynak.db"
+    start = datetime(2024, 1, 1, 9)
+    for day in range(5):
+        source.write_bytes(f"gün {day}".encode())
+        base, _ = repository.add(str(source), created=start + timedelta(days=day), seq=day * 10, database="x")
+        repository.add_delta({"gün": day}, base, day * 10 + 1, created=start + timedelta(days=day, hours=1),
+                             database="x")
+    entries = repository.snapshots()
+    assert {entry["created"][:10] for entry in entries} == {"2024-01-05", "2024-01-04"}
+    for entry in entries:
+        chain = repository.chain_for(entry)
+        assert chain[0]["kind"] == "full"
+        assert all(os.path.exists(os.path.join(repository.folder, e["file"])) for e in chain)
+    assert sorted(os.listdir(repository.folder)) == sorted([e["file"] for e in entries] + ["manifest.json"])
+
+def test_databases_keep_separate_repositories(tmp_path):
+    first = Ledger(str(tmp_path / "a.db"))
+    second = Ledger(str(tmp_path / "b.db"))
+    try:
+        assert first.backup_folder != second.backup_folder
+        assert first.database_id != second.database_id
+        for i in range(3):
+            first.add_customer(f"A{i}")
+            first.backup()
+            second.add_customer(f"B{i}")
+            second.backup()
+        assert first.restore_point(first.backups.snapshots()[0])
+        assert _names(first) == ["A0", "A1", "A2"]
+    finally:
+        first.close()
+        second.close()
+
+def test_shared_repository_does_not_mix_chains(tmp_path):
+    shared = BackupRepository(str(tmp_path / "ortak"))
+    ledgers = [Ledger(str(tmp_path / f"{name}.db")) for name in ("a", "b")]
+    try:
+        for ledger in ledgers:
+            ledger.backups, ledger.backup_folder = shared, shared.folder
+        for i in range(3):
+            for prefix, ledger in zip("AB", ledgers):
+                ledger.add_customer(f"{prefix}{i}")
+                ledger.backup()
+        first = ledgers[0]
+        chain = shared.latest_chain(first.database_id)
+        assert {entry["database"] for entry in chain} == {first.database_id}
+        assert first.restore_point(chain[-1])
+        assert _names(first) == ["A0", "A1", "A2"]
+        
+        other_base = shared.latest_chain(ledgers[1].database_id)[0]
+        with pytest.raises(IOError):
+            shared.add_delta({}, other_base, 99, database=first.database_id)
+    finally:
+        for ledger in ledgers:
+            ledger.close()
+
+def test_restore_from_file_keeps_identity(ledger, tmp_path):
+    other = Ledger(str(tmp_path / "baska.db"))
+    try:
+        other.add_customer("Başka")
+        copy = other.backup("db", str(tmp_path))
+    finally:
+        other.close()
+    identity = ledger.database_id
+    assert ledger.restore_from(copy)
+    assert _names(ledger) == ["Başka"]
+    assert ledger.database_id == identity
+    assert os.path.exists(ledger.db_name + ".onceki")
+
+def test_backup_folder_is_created_on_first_backup(tmp_path):
+    ledger = Ledger(str(tmp_path / "salt_okunur.db"))
+    try:
+        ledger.search_customers("ayşe")
+        ledger.backups.snapshots()
+        assert ledger.backups.remove_legacy() == 0
+        assert not os.path.exists(ledger.backup_folder)
+        ledger.add_customer("Ayşe")
+        ledger.backup()
+        assert len(ledger.backups.snapshots()) == 1
+    finally:
+        ledger.close()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import io
+import math
+
+import pytest
+
+from veresiye import DataFileError, ValidationError, benchmark
+from veresiye.cli import main
+
+def _report(*rows):
+    return {"results": [{"size": size, "operation": operation, "median_ms": median, "p95_ms": median,
+                         "rows": 1} for size, operation, median in rows],
+            "query_plans": {}}
+
+def test_compare_flags_regressions_beyond_tolerance():
+    report = _report((1000, "get_customer", 1.25), (1000, "search", 1.15), (1000, "export_csv", 5.0),
+                     (1000, "new_operation", 9.0), (10000, "get_customer", 0.5))
+    baseline = {(1000, "get_customer"): 1.0, (1000, "search"): 1.0, (1000, "export_csv"): 10.0,
+                (10000, "get_customer"): 0.0}
+    comparisons = {(c.size, c.operation): c for c in benchmark.compare(report, baseline, tolerance=0.2)}
+    # Taban çizgisinde olmayan ölçüm karşılaştırılmaz
+    assert set(comparisons) == set(baseline)
+    assert comparisons[(1000, "get_customer")].regressed
+    assert comparisons[(1000, "get_customer")].ratio == 1.25
+    assert not comparisons[(1000, "search")].regressed
+    assert not comparisons[(1000, "export_csv")].regressed
+    assert comparisons[(1000, "export_csv")].ratio == 0.5
+    assert math.isinf(comparisons[(10000, "get_customer")].ratio)
+    
+    assert not any(c.regressed for c in benchmark.compare(report, baseline, tolerance=0.3)
+                   if c.size == 1000)
+
+def test_baseline_round_trip(tmp_path):
+    report = _report((1000, "get_customer", 1.5))
+    path = str(tmp_path / "taban.json")
+    benchmark.write_json(report, path)
+    assert benchmark.load_baseline(path) == {(1000, "get_customer"): 1.5}
+    
+    (tmp_path / "bozuk.json").write_text("{", encoding="utf-8")
+    with pytest.raises(DataFileError):
+        benchmark.load_baseline(str(tmp_path / "bozuk.json"))
+
+def test_print_report_marks_regressions():
+    report = _report((1000, "get_customer", 2.0))
+    out = io.StringIO()
+    benchmark.print_report(report, benchmark.compare(report, {(1000, "get_customer"): 1.0}), file=out)
+    assert "x2.00 YAVAŞLADI" in out.getvalue()
+
+@pytest.mark.parametrize("text, size", [("500", 500), ("10k", 10_000), ("1.5K", 1_500), ("1M", 1_000_000)])
+def test_parse_size(text, size):
+    assert benchmark.parse_size(text) == size
+
+@pytest.mark.parametrize("text", ["", "k", "abc", "0", "-5"])
+def test_parse_size_rejects(text):
+    with pytest.raises(ValidationError):
+        benchmark.parse_size(text)
+
+def test_bench_command_fails_on_regression(tmp_path, capsys):
+    workdir = str(tmp_path / "bench")
+    report = str(tmp_path / "rapor.json")
+    args = ["bench", "--sizes", "50", "--repeats", "2", "--workdir", workdir]
+    assert main(args + ["--json", report]) == 0
+    # Veri önbellekten kullanılır; aynı rapor taban çizgisiyle karşılaştırılır
+    assert main(args + ["--baseline", report, "--tolerance", "1000"]) == 0
+    
+    baseline = benchmark.load_baseline(report)
+    fast = {key: median / 1e6 for key, median in baseline.items()}
+    benchmark.write_json(_report(*((size, operation, median) for (size, operation), median in fast.items())),
+                         report)
+    assert main(args + ["--baseline", report]) == 1
+    assert "YAVAŞLADI" in capsys.readouterr().out
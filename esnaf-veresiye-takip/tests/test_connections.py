@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+
+import pytest
+
+from veresiye import BackupError
+from veresiye.connections import ConnectionManager
+
+def test_write_count_counts_commits_only(ledger):
+    manager = ledger.connections
+    commits = []
+    manager.commit_hook = commits.append
+    before = manager.write_count
+    
+    with manager.transaction() as cursor:
+        cursor.execute("INSERT INTO customers (name, debt) VALUES ('Ayşe', 0)")
+    assert manager.write_count == before + 1
+    assert commits == [before + 1]
+    
+    with pytest.raises(sqlite3.IntegrityError):
+        with manager.transaction() as cursor:
+            cursor.execute("INSERT INTO customers (name, debt) VALUES ('Ali', 0)")
+            cursor.execute("INSERT INTO customers (name) VALUES (NULL)")
+    assert manager.write_count == before + 1
+    assert commits == [before + 1]
+    assert ledger.count_customers() == 1
+
+def test_nested_transactions_join_outer(ledger):
+    manager = ledger.connections
+    before = manager.write_count
+    with manager.transaction() as cursor:
+        with manager.transaction() as inner:
+            inner.execute("INSERT INTO customers (name, debt) VALUES ('Ayşe', 0)")
+        cursor.execute("INSERT INTO customers (name, debt) VALUES ('Ali', 0)")
+    assert manager.write_count == before + 1
+    assert ledger.count_customers() == 2
+
+def test_reader_cancellation(ledger):
+    ledger.add_customer("Ayşe", "", "", "", 0)
+    with pytest.raises(sqlite3.OperationalError):
+        with ledger.connections.reader(cancelled=lambda: True) as cursor:
+            cursor.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000) "
+                           "SELECT COUNT(*) FROM n")
+            cursor.fetchone()
+    # İptal işleyicisi bağlantı havuza dönerken kaldırılır
+    with ledger.connections.reader() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM customers")
+        assert cursor.fetchone()[0] == 1
+
+def test_reader_does_not_wait_for_busy_pool(ledger):
+    manager = ledger.connections
+    ledger.add_customer("Ayşe", "", "", "", 0)
+    with manager.reader() as first, manager.reader() as second, manager.reader() as third:
+        # Havuz dolu: üçüncü okuyucu beklemeden geçici bağlantı alır
+        assert len({first.connection, second.connection, third.connection}) == 3
+        assert third.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 1
+    assert manager._readers.qsize() == manager.read_pool_size
+
+def test_dedicated_reader_keeps_pool_free(ledger):
+    manager = ledger.connections
+    pooled = manager._reader_count
+    with manager.reader(dedicated=True) as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.connection not in manager._all_connections
+    with pytest.raises(sqlite3.ProgrammingError):
+        cursor.connection.execute("SELECT 1")
+    assert manager._reader_count == pooled
+
+def test_close_waits_for_readers_in_use(ledger):
+    manager = ledger.connections
+    acquired, finished = threading.Event(), []
+    
+    def long_read():
+        try:
+            with manager.reader() as cursor:
+                acquired.set()
+                cursor.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+                               "SELECT COUNT(*) FROM n")
+                cursor.fetchone()
+        except sqlite3.OperationalError as e:
+            finished.append(str(e))
+    
+    thread = threading.Thread(target=long_read)
+    thread.start()
+    acquired.wait(5)
+    # Sonsuz sorgu kesilir, bağlantı bırakıldıktan sonra kapatılır
+    manager.close()
+    thread.join(5)
+    assert finished == ["interrupted"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        with manager.reader():
+            pass
+
+def test_close_refuses_while_reader_is_held(ledger):
+    manager = ledger.connections
+    ledger.add_customer("Ayşe", "", "", "", 0)
+    with manager.reader() as cursor:
+        with pytest.raises(sqlite3.OperationalError):
+            manager.close(timeout=0.1)
+        cursor.execute("SELECT COUNT(*) FROM customers")
+        assert cursor.fetchone()[0] == 1
+    # Reddedilen kapatmadan sonra bağlantılar kullanılmaya devam eder
+    assert ledger.count_customers() == 1
+    ledger.add_customer("Ali", "", "", "", 0)
+
+def test_restore_fails_cleanly_while_reader_is_held(ledger, tmp_path, monkeypatch):
+    ledger.add_customer("Ayşe", "", "", "", 0)
+    copy = ledger.backup("db", str(tmp_path))
+    monkeypatch.setattr(ConnectionManager, "CLOSE_TIMEOUT", 0.1)
+    with ledger.connections.reader():
+        with pytest.raises(BackupError):
+            ledger.restore_from(copy)
+    assert ledger.count_customers() == 1
+    assert ledger.restore_from(copy)
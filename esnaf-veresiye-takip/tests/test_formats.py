@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from veresiye import ValidationError, format_money, parse_date, parse_money
+
+@pytest.mark.parametrize("value, kurus", [
+    ("12,50", 1250), ("1.234,56", 123456), ("1,234.56", 123456), ("12.5", 1250), ("1.234.567", 123456700),
+    ("100 TL", 10000), ("₺7", 700), ("12.340", 1234), ("-5,25", -525),
+    (7, 700), (12.5, 1250), (0.1 + 0.2, 30),
+])
+def test_parse_money(value, kurus):
+    assert parse_money(value) == kurus
+
+@pytest.mark.parametrize("value", ["12.345", "12,345", "0,001", "1E-3", 12.345, "abc", "", "NaN", float("inf")])
+def test_parse_money_rejects_fractional_kurus_and_garbage(value):
+    with pytest.raises(ValidationError):
+        parse_money(value)
+
+def test_format_money_round_trips():
+    for kurus in (0, 5, -5, 123456, -100):
+        assert parse_money(format_money(kurus)) == kurus
+
+def test_parse_date():
+    assert parse_date("05.03.2024") == "2024-03-05 00:00:00"
+    assert parse_date("2024-03-05 10:20:30") == "2024-03-05 10:20:30"
+    with pytest.raises(ValidationError):
+        parse_date("31.02.2024")
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import csv
+
+import pytest
+
+from veresiye import ImportCancelled, Ledger
+
+def _write_csv(path, rows, header=("Müşteri No", "Ad", "Soyad", "Telefon", "Adres", "Borç")):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+def test_import_reports_row_errors_without_aborting(ledger, tmp_path):
+    filename = _write_csv(tmp_path / "musteriler.csv", [
+        (1, "Ayşe", "Yılmaz", "0532", "", "100,50"),
+        (2, "", "Boş", "", "", "10"),
+        (3, "Mehmet", "Kaya", "", "", "abc"),
+        (4, "Fatma", "Demir", "", "", "20"),
+    ])
+    result = ledger.import_csv(filename)
+    assert (result.imported, result.failed) == (2, 2)
+    assert [line for line, _ in result.errors] == [3, 4]
+    assert ledger.get_customer(1)[5] == 10050
+    assert ledger.get_customer(4)[5] == 2000
+    assert ledger.get_ledger_stats().total_debt == 12050
+
+def test_import_reports_repeated_ids(ledger, tmp_path):
+    ledger.IMPORT_CHUNK_ROWS = 2
+    filename = _write_csv(tmp_path / "musteriler.csv", [
+        (1, "Ayşe", "", "", "", "10"),
+        (2, "Ali", "", "", "", "20"),
+        (1, "Ayşe", "Tekrar", "", "", "30"),
+        (3, "Veli", "", "", "", "40"),
+        (2, "Ali", "Tekrar", "", "", "50"),
+    ])
+    result = ledger.import_csv(filename)
+    assert (result.imported, result.failed) == (3, 2)
+    assert [line for line, _ in result.errors] == [4, 6]
+    assert all("Yinelenen" in message for _, message in result.errors)
+    assert ledger.get_customer(1)[5] == 1000
+    assert ledger.get_customer(2)[5] == 2000
+    assert ledger.get_ledger_stats().total_debt == 7000
+
+def test_import_upserts_existing_customers(ledger, tmp_path):
+    customer_id = ledger.add_customer("Ayşe", "", "", "", 500)
+    filename = _write_csv(tmp_path / "musteriler.csv", [(customer_id, "Ayşe", "Yılmaz", "", "", "7,25")])
+    assert ledger.import_csv(filename).imported == 1
+    assert ledger.get_customer(customer_id)[2] == "Yılmaz"
+    assert ledger.get_ledger_stats().total_debt == 725
+
+def test_cancelled_import_writes_nothing(ledger, tmp_path):
+    filename = _write_csv(tmp_path / "musteriler.csv", [(i, f"Müşteri {i}", "", "", "", "1") for i in range(1, 20)])
+    with pytest.raises(ImportCancelled):
+        ledger.import_csv(filename, cancelled=lambda: True)
+    assert ledger.count_customers() == 0
+
+def test_export_import_round_trip(ledger, tmp_path):
+    for i in range(5):
+        ledger.update_customer_debt(ledger.add_customer(f"Müşteri {i}", "", "", "", 0), 100 * (i + 1), False)
+    filename = str(tmp_path / "disa.csv")
+    ledger.export_csv(filename)
+    
+    copy = Ledger(str(tmp_path / "kopya.db"))
+    try:
+        assert copy.import_csv(filename).imported == 5
+        assert copy.get_ledger_stats().total_debt == ledger.get_ledger_stats().total_debt
+    finally:
+        copy.close()
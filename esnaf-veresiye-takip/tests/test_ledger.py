@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from veresiye import NotFoundError, ValidationError
+from veresiye.cli import main
+
+def test_payment_and_charge_update_balance(ledger):
+    customer_id = ledger.add_customer("Ayşe", "Yılmaz", "05321234567", "", 10000)
+    assert ledger.update_customer_debt(customer_id, 2500, True, "nakit").balance == 7500
+    assert ledger.update_customer_debt(customer_id, 1000, False, "ekmek").balance == 8500
+    assert sorted(row[2] for row in ledger.get_payments(customer_id)) == [1000, 2500]
+
+@pytest.mark.parametrize("amount", [0, -5000])
+def test_amount_must_be_positive(ledger, amount):
+    customer_id = ledger.add_customer("Ayşe", "", "", "", 10000)
+    with pytest.raises(ValidationError):
+        ledger.update_customer_debt(customer_id, amount, True)
+    assert ledger.get_customer(customer_id)[5] == 10000
+    assert ledger.get_payments(customer_id) == []
+
+def test_unknown_customer(ledger):
+    with pytest.raises(NotFoundError):
+        ledger.update_customer_debt(999, 100, False)
+
+def test_cli_rejects_negative_payment(tmp_path, capsys):
+    db = str(tmp_path / "cli.db")
+    assert main(["--db", db, "add", "Ayşe", "--debt", "100"]) == 0
+    assert main(["--db", db, "pay", "1", "-50"]) == 1
+    assert "Hata" in capsys.readouterr().err
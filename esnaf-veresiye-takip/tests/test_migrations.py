@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+from veresiye import Ledger
+
+def _legacy_database(path):
+    """İlk sürümün şeması: REAL TL tutarlar, indeks yok, user_version = 0"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            surname TEXT,
+            phone TEXT,
+            address TEXT,
+            debt REAL DEFAULT 0,
+            created_date TEXT
+        );
+        CREATE TABLE payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER,
+            amount REAL,
+            payment_type TEXT,
+            note TEXT,
+            date TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers (id)
+        );
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO customers VALUES (1, 'Ayşe', 'Yılmaz', '05321234567', 'Kadıköy', 150.75, '2023-01-02 10:00:00');
+        INSERT INTO customers VALUES (2, 'Işık', 'Şahin', '', '', 0.1, '2023-01-03 10:00:00');
+        INSERT INTO customers VALUES (5, 'Ali', NULL, NULL, NULL, NULL, '2023-01-04 10:00:00');
+        DELETE FROM customers WHERE id = 5;
+        INSERT INTO payments VALUES (1, 1, 200.5, 'debt', 'ekmek', '2023-01-02 10:00:00');
+        INSERT INTO payments VALUES (2, 1, 49.75, 'payment', '', '2023-01-05 10:00:00');
+        INSERT INTO payments VALUES (3, 2, 0.1, 'debt', '', '2023-01-06 10:00:00');
+        INSERT INTO settings VALUES ('theme', 'dark');
+    ''')
+    conn.commit()
+    conn.close()
+
+def _user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_legacy_database_gets_indexes(tmp_path):
+    path = str(tmp_path / "eski.db")
+    _legacy_database(path)
+    ledger = Ledger(path)
+    try:
+        assert _user_version(path) == Ledger.MIGRATIONS[-1][0]
+        assert ledger.get_setting('theme') == 'dark'
+        assert ledger.check_query_plans() == []
+    finally:
+        ledger.close()
+
+def test_legacy_money_becomes_kurus(tmp_path):
+    path = str(tmp_path / "eski.db")
+    _legacy_database(path)
+    ledger = Ledger(path)
+    try:
+        # REAL TL -> INTEGER kuruş
+        assert ledger.get_customer(1)[5] == 15075
+        assert ledger.get_customer(2)[5] == 10
+        assert sorted(row[2] for row in ledger.get_payments(1)) == [4975, 20050]
+        # Silinmiş en yüksek id yeniden kullanılmaz
+        assert ledger.add_customer("Veli") == 6
+        
+        stats = ledger.get_ledger_stats()
+        assert (stats.total_debt, stats.debtor_count) == (15085, 2)
+        assert ledger.search_customers("isik").customers[0][0] == 2
+    finally:
+        ledger.close()
+
+def test_migrations_run_once(tmp_path):
+    path = str(tmp_path / "defter.db")
+    Ledger(path).close()
+    ledger = Ledger(path)
+    try:
+        ledger.add_customer("Ayşe", debt=1234)
+    finally:
+        ledger.close()
+    
+    ledger = Ledger(path)
+    try:
+        # Geçiş tekrar çalışsaydı tutar yüz katına çıkardı
+        assert ledger.get_customer(1)[5] == 1234
+        assert _user_version(path) == Ledger.MIGRATIONS[-1][0]
+    finally:
+        ledger.close()
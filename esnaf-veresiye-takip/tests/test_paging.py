@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+NAMES = ("Ayşe", "Mehmet", "Zeynep", "Ali", "Fatma")
+
+@pytest.fixture
+def customers(ledger):
+    # Aynı ad ve borç değerleri tekrar eder; sıralama (değer, id) ile kararlı olmalı
+    with ledger.connections.transaction() as cursor:
+        cursor.executemany("INSERT INTO customers (name, debt) VALUES (?, ?)",
+                           [(NAMES[i % len(NAMES)], (i % 7 - 2) * 1000) for i in range(123)])
+        cursor.execute("SELECT * FROM customers")
+        return cursor.fetchall()
+
+def _walk(ledger, page_size, **kwargs):
+    pages = []
+    page = ledger.get_customers(page_size=page_size, **kwargs)
+    while True:
+        pages.append(page)
+        if not page.has_more:
+            return pages
+        page = ledger.get_customers(cursor=page.next_cursor, page_size=page_size, **kwargs)
+
+@pytest.mark.parametrize("sort_key, position", [("id", 0), ("name", 1), ("debt", 5)])
+def test_forward_pages_cover_all_rows_in_order(ledger, customers, sort_key, position):
+    pages = _walk(ledger, 20, sort_key=sort_key)
+    rows = [row for page in pages for row in page.customers]
+    assert rows == sorted(customers, key=lambda row: (row[position], row[0]))
+    assert [len(page.customers) for page in pages] == [20] * 6 + [3]
+    assert not pages[0].has_prev and all(page.has_prev for page in pages[1:])
+
+@pytest.mark.parametrize("sort_key", ["id", "name", "debt"])
+def test_backward_page_returns_previous_page(ledger, customers, sort_key):
+    pages = _walk(ledger, 20, sort_key=sort_key)
+    for previous, page in zip(pages, pages[1:]):
+        back = ledger.get_customers(cursor=page.prev_cursor, backwards=True, page_size=20, sort_key=sort_key)
+        assert back.customers == previous.customers
+        assert back.has_more
+
+@pytest.mark.parametrize("filter_type, keep", [("debt", lambda debt: debt > 0), ("paid", lambda debt: debt <= 0)])
+def test_filters_and_counts(ledger, customers, filter_type, keep):
+    expected = [row for row in customers if keep(row[5])]
+    rows = [row for page in _walk(ledger, 15, filter_type=filter_type) for row in page.customers]
+    assert rows == expected
+    assert ledger.count_customers(filter_type=filter_type) == len(expected)
+    assert ledger.count_customers() == len(customers)
+
+def test_count_cache_follows_writes(ledger, customers):
+    assert ledger.count_customers() == len(customers)
+    ledger.add_customer("Yeni")
+    assert ledger.count_customers() == len(customers) + 1
+
+def test_empty_ledger(ledger):
+    page = ledger.get_customers()
+    assert page.customers == [] and not page.has_more and not page.has_prev
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from veresiye import Ledger
+
+# Her denetimin kullanması gereken indeks
+EXPECTED_INDEXES = {
+    "get_payments": "idx_payments_customer_date",
+    "get_payments_days": "idx_payments_customer_date",
+    "delete_customer_payments": "idx_payments_customer_date",
+    "debt_filter": "idx_customers_debt",
+    "paid_filter": "idx_customers_debt",
+    "ledger_stats_rebuild": "idx_customers_debt",
+    "name_lookup": "idx_customers_name",
+    "phone_lookup": "idx_customers_phone",
+}
+
+def test_every_check_has_an_expected_index():
+    assert {name for name, _, _ in Ledger.QUERY_PLAN_CHECKS} == set(EXPECTED_INDEXES)
+
+@pytest.mark.parametrize("name, query, params", Ledger.QUERY_PLAN_CHECKS,
+                         ids=[check[0] for check in Ledger.QUERY_PLAN_CHECKS])
+def test_plan_uses_its_index(ledger, name, query, params):
+    for i in range(50):
+        ledger.add_customer(f"Müşteri {i}", phone=f"0555{i:07d}")
+        if i % 3:
+            ledger.update_customer_debt(i + 1, 100 * i, False)
+    plan = ledger.explain(query, params)
+    assert not [step for step in plan if step.startswith("SCAN") or "TEMP B-TREE" in step], plan
+    assert any(f"INDEX {EXPECTED_INDEXES[name]} " in step for step in plan), plan
+
+def test_check_query_plans_reports_nothing(ledger):
+    assert ledger.check_query_plans() == []
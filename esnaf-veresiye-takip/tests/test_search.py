@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+@pytest.fixture
+def people(ledger):
+    return {
+        "isik": ledger.add_customer("Işık", "Şahin", "05321112233", "Üsküdar/İstanbul", 1000),
+        "ibrahim": ledger.add_customer("İbrahim", "Yılmaz", "05449998877", "Çankaya/Ankara", 0),
+        "gul": ledger.add_customer("Gülsüm", "Öztürk", "", "Konak/İzmir", 2500),
+    }
+
+def _found(ledger, text, filter_type="all"):
+    return {row[0] for row in ledger.search_customers(text, filter_type).customers}
+
+@pytest.mark.parametrize("text, key", [
+    ("ışık", "isik"), ("IŞIK", "isik"), ("isik", "isik"), ("sahin", "isik"),
+    ("ibrahim", "ibrahim"), ("İBRAHİM", "ibrahim"), ("yılmaz", "ibrahim"), ("yil", "ibrahim"),
+    ("gulsum", "gul"), ("öztürk", "gul"), ("ozt", "gul"), ("izmir", "gul"),
+    ("0544", "ibrahim"), ("uskudar", "isik"),
+])
+def test_turkish_folding_and_prefix(ledger, people, text, key):
+    assert _found(ledger, text) == {people[key]}
+
+def test_terms_are_combined(ledger, people):
+    assert _found(ledger, "ibrahim ankara") == {people["ibrahim"]}
+    assert _found(ledger, "ibrahim izmir") == set()
+
+def test_search_with_filter_and_count(ledger, people):
+    assert _found(ledger, "istanbul") == {people["isik"]}
+    assert _found(ledger, "ist", "paid") == set()
+    assert ledger.count_customers("ist") == 1
+
+def test_index_follows_updates_and_deletes(ledger, people):
+    with ledger.connections.transaction() as cursor:
+        cursor.execute("UPDATE customers SET surname = 'Kaya' WHERE id = ?", (people["isik"],))
+    assert _found(ledger, "sahin") == set()
+    assert _found(ledger, "kaya") == {people["isik"]}
+    ledger.delete_customer(people["gul"])
+    assert _found(ledger, "gulsum") == set()
+
+def test_punctuation_only_search_lists_all(ledger, people):
+    assert _found(ledger, "  ,; ") == set(people.values())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+from veresiye import Ledger
+
+def _stored(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT key, value FROM settings"))
+    finally:
+        conn.close()
+
+def test_write_through_survives_reopen(tmp_path):
+    path = str(tmp_path / "defter.db")
+    ledger = Ledger(path)
+    try:
+        ledger.settings.set('backup_hour', 21)
+        # Yazma işlem bitmeden veritabanına ulaşmış olmalı
+        assert _stored(path)['backup_hour'] == '21'
+    finally:
+        ledger.close()
+    
+    ledger = Ledger(path)
+    try:
+        assert ledger.settings.get('backup_hour') == '21'
+        assert ledger.settings.get_int('backup_hour') == 21
+    finally:
+        ledger.close()
+
+def test_update_writes_only_changed_keys(ledger):
+    store = ledger.settings
+    store.update({'theme': 'light', 'backup_hour': '18'})
+    statements = []
+    ledger.connections.writer.set_trace_callback(statements.append)
+    try:
+        changed = store.update({'theme': 'light', 'backup_hour': 19, 'new_key': 'x'})
+    finally:
+        ledger.connections.writer.set_trace_callback(None)
+    assert changed == {'backup_hour': '19', 'new_key': 'x'}
+    # Tetikleyici alt deyimleri aynı metinle yeniden izlenir; farklı deyimler sayılır
+    inserts = {sql for sql in statements if sql.startswith("INSERT OR REPLACE INTO settings")}
+    assert inserts == {"INSERT OR REPLACE INTO settings (key, value) VALUES ('backup_hour', '19')",
+                       "INSERT OR REPLACE INTO settings (key, value) VALUES ('new_key', 'x')"}
+    
+    # Hiçbir şey değişmediyse işlem açılmaz
+    before = ledger.connections.write_count
+    assert store.update({'theme': 'light'}) == {}
+    assert ledger.connections.write_count == before
+
+def test_listeners_are_notified_of_changes(ledger):
+    store = ledger.settings
+    seen = []
+    store.subscribe(lambda key, value: seen.append((key, value)))
+    store.set('theme', 'dark')
+    store.set('theme', 'dark')
+    store.update({'theme': 'light', 'backup_hour': '7'})
+    assert seen == [('theme', 'dark'), ('theme', 'light'), ('backup_hour', '7')]
+
+def test_reload_reports_values_changed_underneath(ledger):
+    store = ledger.settings
+    store.set('theme', 'dark')
+    seen = []
+    store.subscribe(lambda key, value: seen.append((key, value)))
+    with ledger.connections.transaction() as cursor:
+        cursor.execute("UPDATE settings SET value = 'light' WHERE key = 'theme'")
+    # Önbellek yalnızca reload ile yenilenir
+    assert store.get('theme') == 'dark'
+    store.reload()
+    assert store.get('theme') == 'light'
+    assert seen == [('theme', 'light')]
+
+def test_typed_getters_fall_back_to_defaults(ledger):
+    store = ledger.settings
+    store.update({'broken_int': 'abc', 'flag': '1'})
+    assert store.get('missing', 'x') == 'x'
+    assert store.get_int('broken_int', 5) == 5
+    assert store.get_bool('flag') is True
+    assert store.get_bool('missing', True) is True
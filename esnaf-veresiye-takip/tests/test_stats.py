@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+import pytest
+
+def _rebuilt(ledger):
+    with ledger.connections.transaction() as cursor:
+        ledger._rebuild_ledger_stats(cursor)
+    return ledger.get_ledger_stats()
+
+def test_stats_follow_writes(ledger):
+    first = ledger.add_customer("Ayşe", "", "", "", 0)
+    second = ledger.add_customer("Ali", "", "", "", 5000)
+    ledger.update_customer_debt(first, 2000, False)
+    payment = ledger.update_customer_debt(second, 1500, True).payment_id
+    stats = ledger.get_ledger_stats()
+    assert (stats.total_debt, stats.debtor_count, stats.average_debt) == (5500, 2, 2750)
+    assert (stats.day_debits, stats.day_credits) == (2000, 1500)
+    
+    ledger.delete_payment(payment)
+    assert ledger.get_ledger_stats() == _rebuilt(ledger)
+
+def test_updated_payment_moves_day_totals(ledger):
+    customer_id = ledger.add_customer("Ayşe", "", "", "", 0)
+    payment_id = ledger.update_customer_debt(customer_id, 2000, False).payment_id
+    with ledger.connections.transaction() as cursor:
+        cursor.execute("UPDATE payments SET amount = 3500 WHERE id = ?", (payment_id,))
+    assert ledger.get_ledger_stats().day_debits == 3500
+    
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    with ledger.connections.transaction() as cursor:
+        cursor.execute("UPDATE payments SET date = ? WHERE id = ?", (yesterday, payment_id))
+    assert ledger.get_ledger_stats().day_debits == 0
+    assert ledger.get_ledger_stats() == _rebuilt(ledger)
+
+def test_excel_upsert_of_existing_payment_keeps_day_totals(ledger, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    customer_id = ledger.add_customer("Ayşe", "", "", "", 0)
+    ledger.update_customer_debt(customer_id, 2000, False)
+    filename = str(tmp_path / "defter.xlsx")
+    ledger.export_excel(filename)
+    
+    workbook = openpyxl.load_workbook(filename)
+    payments = workbook.worksheets[1]
+    header = [cell.value for cell in payments[1]]
+    payments.cell(row=2, column=header.index("Tutar") + 1, value="45,00")
+    workbook.save(filename)
+    
+    ledger.import_excel(filename)
+    assert ledger.get_ledger_stats().day_debits == 4500
+    assert ledger.get_ledger_stats() == _rebuilt(ledger)
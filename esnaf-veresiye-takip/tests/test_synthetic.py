@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+import pytest
+
+from veresiye import Ledger, ValidationError
+from veresiye.synthetic import SyntheticProfile, generate_ledger
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return (conn.execute("SELECT * FROM customers ORDER BY id").fetchall(),
+                conn.execute("SELECT * FROM payments ORDER BY id").fetchall())
+    finally:
+        conn.close()
+
+def _generate(path, customers, seed, profile=SyntheticProfile()):
+    ledger = Ledger(str(path))
+    try:
+        return generate_ledger(ledger, customers, profile, seed)
+    finally:
+        ledger.close()
+
+def test_same_seed_gives_identical_database(tmp_path):
+    assert _generate(tmp_path / "a.db", 300, seed=7) == _generate(tmp_path / "b.db", 300, seed=7)
+    assert _dump(str(tmp_path / "a.db")) == _dump(str(tmp_path / "b.db"))
+    
+    _generate(tmp_path / "c.db", 300, seed=8)
+    assert _dump(str(tmp_path / "c.db")) != _dump(str(tmp_path / "a.db"))
+
+@pytest.mark.parametrize("distribution", ["geometric", "poisson", "uniform"])
+def test_balances_match_history(tmp_path, distribution):
+    ledger = Ledger(str(tmp_path / "defter.db"))
+    try:
+        customers, payments = generate_ledger(ledger, 200, SyntheticProfile(count_distribution=distribution), 3)
+        assert customers == ledger.count_customers() == 200
+        with ledger.connections.reader() as cursor:
+            cursor.execute('''
+                SELECT COUNT(*) FROM customers c WHERE c.debt != (
+                    SELECT COALESCE(SUM(CASE WHEN payment_type = 'debt' THEN amount ELSE -amount END), 0)
+                    FROM payments p WHERE p.customer_id = c.id)
+            ''')
+            assert cursor.fetchone()[0] == 0
+            cursor.execute("SELECT COUNT(*), MIN(debt) FROM customers")
+            assert cursor.fetchone()[1] >= 0
+            cursor.execute("SELECT COUNT(*) FROM payments")
+            assert cursor.fetchone()[0] == payments
+        # Tetikleyiciler yerine sonda kurulan özet ve arama indeksi güncel olmalı
+        stats = ledger.get_ledger_stats()
+        with ledger.connections.reader() as cursor:
+            cursor.execute("SELECT COALESCE(SUM(debt), 0), COUNT(*) FROM customers WHERE debt > 0")
+            assert (stats.total_debt, stats.debtor_count) == cursor.fetchone()
+        name = ledger.get_customer(1)[1]
+        assert 1 in {row[0] for row in ledger.search_customers(name, page_size=1000).customers}
+    finally:
+        ledger.close()
+
+def test_rejects_non_empty_ledger_and_bad_profile(ledger):
+    with pytest.raises(ValidationError):
+        generate_ledger(ledger, 10, SyntheticProfile(count_distribution="normal"))
+    ledger.add_customer("Ayşe")
+    with pytest.raises(ValidationError):
+        generate_ledger(ledger, 10)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from veresiye.tracing import LatencyHistogram, normalize_sql
+
+def _samples(tracer, prefix):
+    return sum(row["count"] for key, row in tracer.snapshot()["statements"].items() if key.startswith(prefix))
+
+def test_normalize_sql_groups_values():
+    assert normalize_sql("SELECT * FROM t WHERE a = 5 AND b = 'x''y'") == "SELECT * FROM t WHERE a = ? AND b = ?"
+    assert normalize_sql("INSERT INTO t VALUES (?, ?,\n ?)") == "INSERT INTO t VALUES (?...)"
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in (0.2, 0.3, 3, 400):
+        histogram.add(ms)
+    assert histogram.count == 4
+    assert histogram.percentile(0.5) == 0.5
+    assert histogram.percentile(1.0) == 400
+
+def test_update_with_triggers_is_one_sample(ledger):
+    customer_id = ledger.add_customer("Ayşe", "Yılmaz", "", "", 0)
+    tracer = ledger.enable_tracing(slow_ms=60000)
+    ledger.update_customer_debt(customer_id, 1000, False, "ekmek")
+    assert _samples(tracer, "UPDATE customers SET debt") == 1
+    assert _samples(tracer, "INSERT INTO payments") == 1
+    
+    # Arama indeksini (FTS5) güncelleyen tetikleyiciler de aynı deyime sayılır
+    with ledger.connections.transaction() as cursor:
+        cursor.execute("UPDATE customers SET name = ? WHERE id = ?", ("Fatma", customer_id))
+    assert _samples(tracer, "UPDATE customers SET name") == 1
+    assert not [key for key in tracer.snapshot()["statements"] if "_fts_" in key or key.startswith("--")]
+    assert tracer.snapshot()["methods"]["update_customer_debt"]["count"] == 1
+
+def test_disable_tracing_detaches(ledger):
+    ledger.enable_tracing()
+    assert "get_customers" in vars(ledger)
+    ledger.disable_tracing()
+    assert ledger.tracer is None
+    assert "get_customers" not in vars(ledger)
+    ledger.get_customers(page_size=10)
+    assert all(step is None for _, step in ledger.connections._traced.values())
+
+def test_slow_query_log_has_plan_and_releases_file(ledger, tmp_path):
+    customer_id = ledger.add_customer("Ayşe", "Yılmaz", "", "", 0)
+    ledger.backup()
+    tracer = ledger.enable_tracing(slow_ms=0)
+    ledger.get_payments(customer_id)
+    ledger.disable_tracing()
+    with open(tracer.log_file, encoding="utf-8") as file:
+        log = file.read()
+    assert "get_payments" in log
+    assert "PLAN: SEARCH payments USING INDEX idx_payments_customer_date" in log
+    # Geri yükleme veritabanı dosyasını değiştirebilmeli
+    ledger.enable_tracing(slow_ms=0)
+    assert ledger.restore_point(ledger.backups.snapshots()[0])
+    assert ledger.count_customers() == 1
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Veresiye defteri motoru.
+
+Qt'den bağımsız depolama ve defter mantığı: masaüstü uygulaması, komut
+satırı (python -m veresiye) ve arka plan işleri bu paketi kullanır.
+"""
+
+from .backups import BackupRepository
+from .connections import ConnectionManager
+from .errors import (BackupCancelled, BackupError, DataFileError, ImportCancelled, NotFoundError,
+                     StorageError, ValidationError, VeresiyeError)
+from .formats import format_money, parse_date, parse_money
+from .ledger import (EMPTY_PAGE, EMPTY_STATS, CustomerPage, ImportResult, Ledger, LedgerEntry,
+                     LedgerStats)
+from .settings import SettingsStore
+from .system import get_app_data_folder, is_startup_enabled, set_startup
+from .tracing import LatencyHistogram, QueryTracer
+
+__all__ = [
+    "BackupRepository", "ConnectionManager", "SettingsStore", "Ledger", "QueryTracer", "LatencyHistogram",
+    "CustomerPage", "ImportResult", "LedgerEntry", "LedgerStats", "EMPTY_PAGE", "EMPTY_STATS",
+    "VeresiyeError", "StorageError", "NotFoundError", "ValidationError", "DataFileError",
+    "BackupError", "BackupCancelled", "ImportCancelled",
+    "parse_money", "format_money", "parse_date",
+    "get_app_data_folder", "set_startup", "is_startup_enabled",
+]
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""python -m veresiye: komut satırı arayüzü"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
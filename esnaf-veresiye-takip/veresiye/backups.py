@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""Sıkıştırılmış, tekrarsız yedek deposu ve saklama kuralları"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+try:
+    import zstandard as zstd  # İsteğe bağlı: yedekleri daha iyi sıkıştırır
+except ImportError:
+    zstd = None
+
+class BackupRepository:
+    """Sıkıştırılmış, içerik karması ile tekrarı önlenen yedek deposu.
+
+    Depoda iki tür kayıt vardır: tam görüntüler ("full") ve bir tam görüntünün
+    üzerine sırayla uygulanan artımlı değişiklikler ("delta"). Kayıtlar
+    manifest.json'da listelenir; saklama kuralları dosya adlarına değil
+    manifestteki zamana göre uygulanır.
+
+    Her kayıt, alındığı veritabanının kimliğini ("database") taşır. Deltalar
+    yalnızca aynı veritabanının tam görüntüsüne zincirlenir ve saklama
+    kuralları her veritabanının kayıtlarına ayrı uygulanır.
+    """
+
+    MANIFEST = "manifest.json"
+    # Sıklık başına saklanacak en yeni geri yükleme noktası sayısı (dede-baba-oğul)
+    RETENTION = {"hourly": 24, "daily": 7, "weekly": 4, "monthly": 12}
+    PERIODS = {
+        "hourly": lambda t: t.strftime("%Y-%m-%d %H"),
+        "daily": lambda t: t.strftime("%Y-%m-%d"),
+        "weekly": lambda t: t.isocalendar()[:2],
+        "monthly": lambda t: t.strftime("%Y-%m"),
+    }
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, folder, retention=None):
+        self.folder = folder
+        self.retention = dict(self.RETENTION, **(retention or {}))
+        self.manifest_path = os.path.join(folder, self.MANIFEST)
+        self._lock = threading.Lock()
+        # Klasör ilk yazmada oluşturulur; yalnızca okuyan kullanımlar (arama, benchmark) klasör açmaz
+
+    def ensure_folder(self):
+        """Depo klasörünü (yoksa) oluştur ve yolunu döndür"""
+        os.makedirs(self.folder, exist_ok=True)
+        return self.folder
+
+    @staticmethod
+    def compression():
+        """Kullanılabilir en iyi sıkıştırma: zstandard kuruluysa zstd, değilse gzip"""
+        return "zst" if zstd is not None else "gz"
+
+    @staticmethod
+    def _sort_key(entry):
+        return entry["created"], entry.get("seq") or 0
+
+    def snapshots(self):
+        """Manifestteki kayıtlar, en yeniden eskiye"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                entries = json.load(file).get("snapshots", [])
+        except (IOError, ValueError):
+            return []
+        for entry in entries:
+            # Artımlı yedek öncesi manifestlerde tür alanı yoktu
+            entry.setdefault("kind", "full")
+        return sorted(entries, key=self._sort_key, reverse=True)
+
+    def _save(self, entries):
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": 2, "snapshots": entries}, file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.manifest_path)
+
+    def _hash(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _store(self, entries, entry):
+        entries.insert(0, entry)
+        self._save(self._prune(entries))
+        return entry
+
+    def add(self, path, created=None, sha256=None, seq=None, database=None):
+        """Ham veritabanı kopyasını tam görüntü olarak ekle; (kayıt, yeni_mi) döndürür.
+
+        İçerik karması (verilmezse dosyanın karması) aynı veritabanının en son
+        kaydıyla aynıysa yeni dosya yazılmaz. seq, görüntünün içerdiği son
+        değişiklik günlüğü sırasıdır; artımlı yedekler buradan devam eder.
+        """
+        created = created or datetime.now()
+        sha256 = sha256 or self._hash(path)
+        with self._lock:
+            entries = self.snapshots()
+            latest = next((e for e in entries if e.get("database") == database), None)
+            if latest is not None and latest["sha256"] == sha256:
+                # İçerik aynı; günlük sırası ilerlemiş olabilir, zincir buradan devam etsin
+                if seq is not None and latest.get("seq") != seq:
+                    latest["seq"] = seq
+                    self._save(entries)
+                return latest, False
+
+            extension = self.compression()
+            name = f"veresiye_{created.strftime('%Y%m%d_%H%M%S')}_{sha256[:12]}.db.{extension}"
+            target = os.path.join(self.ensure_folder(), name)
+            with open(path, 'rb') as source, open(target + ".tmp", 'wb') as raw:
+                if extension == "zst":
+                    zstd.ZstdCompressor(level=10).copy_stream(source, raw)
+                else:
+                    with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as packed:
+                        shutil.copyfileobj(source, packed, self.CHUNK_SIZE)
+            os.replace(target + ".tmp", target)
+
+            return self._store(entries, {
+                "file": name,
+                "kind": "full",
+                "database": database,
+                "sha256": sha256,
+                "seq": seq,
+                "created": created.strftime(self.DATE_FORMAT),
+                "size": os.path.getsize(path),
+                "stored_size": os.path.getsize(target),
+            }), True
+
+    def add_delta(self, changes, base, seq, created=None, database=None):
+        """base tam görüntüsünün zincirine değişiklikleri (JSON) ekle.
+
+        base başka bir veritabanına aitse IOError verilir.
+        """
+        if base.get("kind") != "full" or base.get("database") != database:
+            raise IOError(f"Artımlı yedek başka bir veritabanının görüntüsüne eklenemez: {base['file']}")
+        created = created or datetime.now()
+        data = json.dumps(changes, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        extension = self.compression()
+        if extension == "zst":
+            packed = zstd.ZstdCompressor(level=10).compress(data)
+        else:
+            packed = gzip.compress(data, compresslevel=6)
+        with self._lock:
+            # Aynı klasördeki başka bir veritabanının deltasıyla aynı adı almasın
+            owner = f"_{database[:8]}" if database else ""
+            name = f"veresiye_{created.strftime('%Y%m%d_%H%M%S')}_d{seq}{owner}.json.{extension}"
+            target = os.path.join(self.ensure_folder(), name)
+            with open(target + ".tmp", 'wb') as file:
+                file.write(packed)
+            os.replace(target + ".tmp", target)
+
+            return self._store(self.snapshots(), {
+                "file": name,
+                "kind": "delta",
+                "database": database,
+                "base": base["file"],
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "seq": seq,
+                "created": created.strftime(self.DATE_FORMAT),
+                "size": len(data),
+                "stored_size": len(packed),
+            })
+
+    def read_delta(self, entry):
+        with open(os.path.join(self.folder, entry["file"]), 'rb') as file:
+            packed = file.read()
+        if entry["file"].endswith(".zst"):
+            if zstd is None:
+                raise IOError("zstd yedeğini açmak için 'zstandard' paketi gerekli")
+            data = zstd.ZstdDecompressor().decompress(packed)
+        else:
+            data = gzip.decompress(packed)
+        return json.loads(data.decode("utf-8"))
+
+    @staticmethod
+    def _chain(entries, entry):
+        """entry'yi geri yüklemek için gereken kayıtlar: tam görüntü + sıradaki deltalar"""
+        if entry["kind"] == "full":
+            return [entry]
+        base = next((e for e in entries if e["file"] == entry["base"]), None)
+        if base is None:
+            raise IOError(f"Artımlı yedeğin tam görüntüsü bulunamadı: {entry['base']}")
+        database = entry.get("database")
+        if base.get("database") != database:
+            raise IOError(f"Artımlı yedeğin tam görüntüsü başka bir veritabanına ait: {entry['base']}")
+        deltas = [e for e in entries if e["kind"] == "delta" and e["base"] == entry["base"]
+                  and e.get("database") == database and e["seq"] <= entry["seq"]]
+        return [base] + sorted(deltas, key=lambda e: e["seq"])
+
+    def chain_for(self, entry):
+        return self._chain(self.snapshots(), entry)
+
+    def latest_chain(self, database=None):
+        """Veritabanının en son geri yükleme noktasının zinciri; kaydı yoksa boş liste"""
+        entries = self.snapshots()
+        latest = next((e for e in entries if e.get("database") == database), None)
+        return self._chain(entries, latest) if latest is not None else []
+
+    def _prune(self, entries):
+        """Saklama kurallarına uymayan kayıtları sil, kalanları döndür.
+
+        Korunan her delta, geri yüklenebilmesi için tam görüntüsünü ve
+        kendinden önceki deltaları da korur.
+        """
+        keep = set()
+        # Dönemler her veritabanı için ayrı sayılır
+        for database in {entry.get("database") for entry in entries}:
+            own = [entry for entry in entries if entry.get("database") == database]
+            for period, count in self.retention.items():
+                bucket_of = self.PERIODS[period]
+                buckets = []
+                for entry in own:
+                    bucket = bucket_of(datetime.strptime(entry["created"], self.DATE_FORMAT))
+                    # Her dönemin en yeni kaydı o dönemi temsil eder
+                    if bucket in buckets:
+                        continue
+                    if len(buckets) >= count:
+                        break
+                    buckets.append(bucket)
+                    try:
+                        keep.update(e["file"] for e in self._chain(entries, entry))
+                    except IOError:
+                        # Tam görüntüsü kaybolmuş delta geri yüklenemez
+                        pass
+
+        kept = []
+        for entry in entries:
+            if entry["file"] in keep:
+                kept.append(entry)
+                continue
+            try:
+                os.remove(os.path.join(self.folder, entry["file"]))
+            except FileNotFoundError:
+                pass
+        return kept
+
+    def prune(self):
+        """Saklama kurallarını şimdi uygula; silinen kayıt sayısını döndür"""
+        with self._lock:
+            entries = self.snapshots()
+            kept = self._prune(entries)
+            self._save(kept)
+            return len(entries) - len(kept)
+
+    @staticmethod
+    def extract(path, target):
+        """Sıkıştırılmış görüntüyü (ya da düz .db dosyasını) target'a aç"""
+        with open(target, 'wb') as out:
+            if path.endswith(".zst"):
+                if zstd is None:
+                    raise IOError("zstd yedeğini açmak için 'zstandard' paketi gerekli")
+                with open(path, 'rb') as source:
+                    zstd.ZstdDecompressor().copy_stream(source, out)
+            elif path.endswith(".gz"):
+                with gzip.open(path, 'rb') as source:
+                    shutil.copyfileobj(source, out, BackupRepository.CHUNK_SIZE)
+            else:
+                with open(path, 'rb') as source:
+                    shutil.copyfileobj(source, out, BackupRepository.CHUNK_SIZE)
+
+    def remove_legacy(self, days=30):
+        """Depo öncesi veresiye_yedek_* dosyalarından days günden eskileri sil"""
+        limit = time.time() - days * 86400
+        deleted = 0
+        if not os.path.isdir(self.folder):
+            return deleted
+        for filename in os.listdir(self.folder):
+            filepath = os.path.join(self.folder, filename)
+            if (filename.startswith("veresiye_yedek_") and os.path.isfile(filepath)
+                    and os.path.getmtime(filepath) < limit):
+                os.remove(filepath)
+                deleted += 1
+        return deleted
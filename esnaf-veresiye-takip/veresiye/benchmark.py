@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Tekrarlanabilir performans ölçümü: sentetik defterler üzerinde motor işlemlerinin süreleri.
+
+Her boyut için tohumlu veri üretilir (çalışma klasöründe önbelleğe alınır),
+kopyası üzerinde işlemler ölçülür. Sonuçlar JSON/CSV yazılır ve kayıtlı bir
+taban çizgisiyle karşılaştırılabilir.
+"""
+
+import csv
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from .errors import DataFileError, ValidationError
+from .ledger import Ledger
+from .synthetic import DEFAULT_PROFILE, generate_ledger
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Bir işlemin ölçümü: süreler milisaniye, rows işlemin döndürdüğü/yazdığı satır sayısı
+BenchmarkResult = namedtuple("BenchmarkResult", "size operation repeats rows min_ms median_ms p95_ms")
+
+# Taban çizgisiyle karşılaştırma: oran = şimdiki medyan / taban medyanı
+Comparison = namedtuple("Comparison", "size operation baseline_ms median_ms ratio regressed")
+
+# Aramada sırayla kullanılan terimler: ad, soyad, ilçe, telefon parçası, iki kelime
+SEARCH_TERMS = ("yılmaz", "ayşe", "kadıköy", "0532", "mehmet kaya", "öz")
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000"""
+    text = text.strip().lower()
+    multiplier = SIZE_SUFFIXES.get(text[-1:], 1)
+    digits = text[:-1] if text[-1:] in SIZE_SUFFIXES else text
+    try:
+        size = int(float(digits) * multiplier)
+    except ValueError:
+        raise ValidationError(f"Geçersiz boyut: {text}")
+    if size <= 0:
+        raise ValidationError(f"Geçersiz boyut: {text}")
+    return size
+
+def _summary(size, operation, timings, rows):
+    timings = sorted(timings)
+    p95 = timings[max(0, math.ceil(len(timings) * 0.95) - 1)]
+    return BenchmarkResult(size, operation, len(timings), rows, round(timings[0] * 1000, 3),
+                           round(statistics.median(timings) * 1000, 3), round(p95 * 1000, 3))
+
+def _measure(size, operation, repeats, work):
+    """work(i) fonksiyonunu repeats kez çalıştır; son çağrının döndürdüğü satır sayısıyla özetle"""
+    timings = []
+    rows = 0
+    for i in range(repeats):
+        started = time.perf_counter()
+        rows = work(i)
+        timings.append(time.perf_counter() - started)
+    return _summary(size, operation, timings, rows)
+
+def _profile_key(profile, seed):
+    return hashlib.sha1(repr((tuple(profile), seed)).encode("utf-8")).hexdigest()[:10]
+
+def prepare_ledger(workdir, size, profile=DEFAULT_PROFILE, seed=0, log=None):
+    """Önbellekteki sentetik veritabanının ölçüm için yeni bir kopyasını aç.
+
+    Veri ilk kez üretiliyorsa üretim süresi de döndürülür: (Ledger, saniye ya da None).
+    """
+    cached = os.path.join(workdir, f"synthetic_{size}_{_profile_key(profile, seed)}.db")
+    elapsed = None
+    if not os.path.exists(cached):
+        if log:
+            log(f"{size} müşterilik sentetik veri üretiliyor...")
+        partial = cached + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        started = time.perf_counter()
+        ledger = Ledger(partial)
+        try:
+            generate_ledger(ledger, size, profile, seed)
+            ledger.connections.checkpoint("TRUNCATE")
+        finally:
+            ledger.close()
+        elapsed = time.perf_counter() - started
+        os.replace(partial, cached)
+    
+    # Ölçümler veriyi değiştirir; her çalıştırma önbelleğin temiz kopyasıyla başlar
+    working = os.path.join(workdir, f"run_{size}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    shutil.copyfile(cached, working)
+    return Ledger(working), elapsed
+
+def benchmark_ledger(ledger, size, workdir, repeats=20, file_repeats=1, seed=0):
+    """Tek bir defter üzerinde işlemleri ölç; BenchmarkResult listesi döndürür"""
+    rng = random.Random(seed)
+    ids = [rng.randint(1, size) for _ in range(repeats)]
+    results = []
+    
+    # Okuma işlemleri önce: yazmalar sayım önbelleğini ve sayfaları değiştirir
+    results.append(_measure(size, "get_customers", repeats,
+                            lambda i: len(ledger.get_customers(page_size=50).customers)))
+    results.append(_measure(size, "get_customers_debt", repeats,
+                            lambda i: len(ledger.get_customers("debt", page_size=50).customers)))
+    
+    with ledger.connections.reader() as cursor:
+        cursor.execute("SELECT name, id FROM customers ORDER BY name, id LIMIT 1 OFFSET ?", (size // 2,))
+        middle = tuple(cursor.fetchone())
+    results.append(_measure(size, "get_customers_deep", repeats,
+                            lambda i: len(ledger.get_customers(cursor=middle, page_size=50,
+                                                               sort_key="name").customers)))
+    results.append(_measure(size, "search_customers", repeats,
+                            lambda i: len(ledger.search_customers(SEARCH_TERMS[i % len(SEARCH_TERMS)],
+                                                                  page_size=50).customers)))
+    results.append(_measure(size, "get_payments", repeats, lambda i: len(ledger.get_payments(ids[i]))))
+    results.append(_measure(size, "update_customer_debt", repeats,
+                            lambda i: ledger.update_customer_debt(ids[i], 100, i % 2 == 0, "ölçüm") and 1))
+    
+    export_file = os.path.join(workdir, f"export_{size}.csv")
+    
+    def export(i):
+        ledger.export_csv(export_file)
+        with ledger.connections.reader() as cursor:
+            cursor.execute("SELECT (SELECT COUNT(*) FROM customers) + (SELECT COUNT(*) FROM payments)")
+            return cursor.fetchone()[0]
+    results.append(_measure(size, "export_csv", file_repeats, export))
+    
+    def import_into_empty(i):
+        target = os.path.join(workdir, f"import_{size}.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(target + suffix):
+                os.remove(target + suffix)
+        empty = Ledger(target)
+        try:
+            return empty.import_csv(export_file).imported
+        finally:
+            empty.close()
+    results.append(_measure(size, "import_csv", file_repeats, import_into_empty))
+    return results
+
+def run_benchmarks(sizes=DEFAULT_SIZES, profile=DEFAULT_PROFILE, seed=0, repeats=20, file_repeats=1,
+                   workdir=None, log=None):
+    """Her boyut için veriyi hazırla ve ölç; JSON'a yazılabilir rapor sözlüğü döndürür"""
+    temporary = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="veresiye_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        "meta": {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "seed": seed,
+            "repeats": repeats,
+            "file_repeats": file_repeats,
+            "profile": profile._asdict(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "generate_seconds": {},
+        "query_plans": {},
+        "results": [],
+    }
+    try:
+        for size in sizes:
+            ledger, elapsed = prepare_ledger(workdir, size, profile, seed, log)
+            try:
+                if elapsed is not None:
+                    report["generate_seconds"][str(size)] = round(elapsed, 3)
+                if log:
+                    log(f"{size} müşteri ölçülüyor...")
+                # Tablo taramasına düşen sorgular da gerilemedir
+                report["query_plans"][str(size)] = [name for name, plan in ledger.check_query_plans()]
+                results = benchmark_ledger(ledger, size, workdir, repeats, file_repeats, seed)
+                report["results"].extend(result._asdict() for result in results)
+            finally:
+                ledger.close()
+    finally:
+        if temporary:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+def write_json(report, filename):
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+def write_csv(report, filename):
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=BenchmarkResult._fields)
+        writer.writeheader()
+        writer.writerows(report["results"])
+
+def load_baseline(filename):
+    """Kayıtlı JSON raporunu oku; {(boyut, işlem): medyan_ms} döndürür"""
+    try:
+        with open(filename, encoding="utf-8") as file:
+            report = json.load(file)
+        return {(row["size"], row["operation"]): row["median_ms"] for row in report["results"]}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise DataFileError(f"Taban çizgisi okunamadı: {e}") from e
+
+def compare(report, baseline, tolerance=0.2):
+    """Rapordaki her ölçümü taban çizgisiyle karşılaştır; Comparison listesi döndürür.
+
+    Medyan, taban medyanının (1 + tolerance) katını aşarsa gerileme sayılır.
+    Taban çizgisinde olmayan ölçümler atlanır.
+    """
+    comparisons = []
+    for row in report["results"]:
+        base = baseline.get((row["size"], row["operation"]))
+        if base is None:
+            continue
+        ratio = row["median_ms"] / base if base else math.inf
+        comparisons.append(Comparison(row["size"], row["operation"], base, row["median_ms"], round(ratio, 3),
+                                      ratio > 1 + tolerance))
+    return comparisons
+
+def print_report(report, comparisons=(), file=None):
+    """Sonuçları (ve varsa karşılaştırmayı) tablo olarak yazdır"""
+    # Varsayılan çağrı anındaki sys.stdout'tur (yönlendirilmiş olabilir)
+    file = file or sys.stdout
+    by_key = {(c.size, c.operation): c for c in comparisons}
+    print(f"{'boyut':>9}  {'işlem':<22}{'medyan ms':>11}{'p95 ms':>10}{'satır':>10}  taban", file=file)
+    for row in report["results"]:
+        line = (f"{row['size']:>9}  {row['operation']:<22}{row['median_ms']:>11.3f}{row['p95_ms']:>10.3f}"
+                f"{row['rows']:>10}")
+        comparison = by_key.get((row["size"], row["operation"]))
+        if comparison is not None:
+            line += f"  x{comparison.ratio:.2f}{' YAVAŞLADI' if comparison.regressed else ''}"
+        print(line, file=file)
+    for size, names in report["query_plans"].items():
+        if names:
+            print(f"{size}: tablo taraması yapan sorgular: {', '.join(names)}", file=file)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Komut satırı arayüzü: arayüz açmadan müşteri, kayıt, arama, dışa aktarma ve yedek"""
+
+import argparse
+import os
+import sys
+
+from . import benchmark
+from .errors import ValidationError, VeresiyeError
+from .formats import format_money, parse_money
+from .ledger import Ledger
+from .synthetic import COUNT_DISTRIBUTIONS, DEFAULT_PROFILE, SyntheticProfile, generate_ledger
+
+# Dosya uzantısı -> dışa aktarma biçimi
+EXPORT_FORMATS = {".csv": "csv", ".xlsx": "excel"}
+
+def cmd_add(ledger, args):
+    customer_id = ledger.add_customer(args.name, args.surname, args.phone, args.address,
+                                      parse_money(args.debt))
+    print(customer_id)
+
+def _record(ledger, args, is_payment):
+    entry = ledger.update_customer_debt(args.id, parse_money(args.amount), is_payment, args.note)
+    print(f"Kayıt {entry.payment_id}, bakiye: {format_money(entry.balance)}")
+
+def cmd_pay(ledger, args):
+    _record(ledger, args, True)
+
+def cmd_charge(ledger, args):
+    _record(ledger, args, False)
+
+def cmd_search(ledger, args):
+    page = ledger.search_customers(args.text, args.filter, page_size=args.limit)
+    for customer in page.customers:
+        name = f"{customer[1]} {customer[2] or ''}".strip()
+        print(f"{customer[0]}\t{name}\t{customer[3] or ''}\t{format_money(customer[5])}")
+    if page.has_more:
+        print(f"... (ilk {args.limit} kayıt)", file=sys.stderr)
+
+def cmd_export(ledger, args):
+    export_format = args.format or EXPORT_FORMATS.get(os.path.splitext(args.file)[1].lower())
+    if export_format is None:
+        raise ValidationError("Biçim dosya uzantısından anlaşılamadı; --format ile belirtin")
+    exporter = ledger.export_csv if export_format == "csv" else ledger.export_excel
+    exporter(args.file)
+    print(args.file)
+
+def cmd_backup(ledger, args):
+    print(ledger.backup(args.format, args.folder))
+
+def _profile(args):
+    return SyntheticProfile(args.payments_per_customer, args.distribution, parse_money(args.amount_median),
+                            args.amount_sigma, args.payment_share, args.settle_share, args.days)
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+def cmd_generate(ledger, args):
+    customers, payments = generate_ledger(ledger, benchmark.parse_size(args.customers), _profile(args), args.seed)
+    print(f"{customers} müşteri, {payments} kayıt yazıldı")
+
+def cmd_bench(ledger, args):
+    sizes = [benchmark.parse_size(size) for size in args.sizes.split(",")]
+    report = benchmark.run_benchmarks(sizes, _profile(args), args.seed, args.repeats, args.file_repeats,
+                                      args.workdir, log=_log)
+    if args.json:
+        benchmark.write_json(report, args.json)
+    if args.csv:
+        benchmark.write_csv(report, args.csv)
+    
+    comparisons = []
+    if args.baseline:
+        comparisons = benchmark.compare(report, benchmark.load_baseline(args.baseline), args.tolerance)
+    benchmark.print_report(report, comparisons)
+    # Yavaşlama ya da tablo taraması varsa sürekli entegrasyonda hata kodu dönülür
+    if any(c.regressed for c in comparisons) or any(report["query_plans"].values()):
+        return 1
+    return 0
+
+def _add_profile_arguments(parser):
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--payments-per-customer", type=float, default=DEFAULT_PROFILE.payments_per_customer,
+                        help="müşteri başına ortalama borç/ödeme kaydı")
+    parser.add_argument("--distribution", choices=COUNT_DISTRIBUTIONS, default=DEFAULT_PROFILE.count_distribution,
+                        help="müşteri başına kayıt sayısının dağılımı")
+    parser.add_argument("--amount-median", default=str(DEFAULT_PROFILE.amount_median / 100),
+                        help="kayıt tutarlarının ortancası (TL, log-normal)")
+    parser.add_argument("--amount-sigma", type=float, default=DEFAULT_PROFILE.amount_sigma)
+    parser.add_argument("--payment-share", type=float, default=DEFAULT_PROFILE.payment_share,
+                        help="kayıtların ödeme olma olasılığı")
+    parser.add_argument("--settle-share", type=float, default=DEFAULT_PROFILE.settle_share,
+                        help="ödemelerin borcu tamamen kapatma olasılığı")
+    parser.add_argument("--days", type=int, default=DEFAULT_PROFILE.days, help="geçmişin uzunluğu (gün)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="veresiye", description="Veresiye defteri komut satırı")
+    parser.add_argument("--db", help="veritabanı dosyası (varsayılan: uygulama veri klasörü)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    add = commands.add_parser("add", help="müşteri ekle")
+    add.add_argument("name")
+    add.add_argument("--surname", default="")
+    add.add_argument("--phone", default="")
+    add.add_argument("--address", default="")
+    add.add_argument("--debt", default="0", help="açılış borcu (TL)")
+    add.set_defaults(handler=cmd_add)
+    
+    for name, handler, help_text in (("pay", cmd_pay, "ödeme al"), ("charge", cmd_charge, "borç ekle")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("id", type=int, help="müşteri no")
+        command.add_argument("amount", help="tutar (TL)")
+        command.add_argument("--note", default="")
+        command.set_defaults(handler=handler)
+    
+    search = commands.add_parser("search", help="müşteri ara")
+    search.add_argument("text")
+    search.add_argument("--filter", choices=("all", "debt", "paid"), default="all")
+    search.add_argument("--limit", type=int, default=50)
+    search.set_defaults(handler=cmd_search)
+    
+    export = commands.add_parser("export", help="CSV veya Excel dosyasına aktar")
+    export.add_argument("file")
+    export.add_argument("--format", choices=("csv", "excel"))
+    export.set_defaults(handler=cmd_export)
+    
+    backup = commands.add_parser("backup", help="yedek al")
+    backup.add_argument("--folder", help="yedeğin yazılacağı klasör (varsayılan: yedek deposu)")
+    backup.add_argument("--format", choices=("db", "csv", "excel"), default="db")
+    backup.set_defaults(handler=cmd_backup)
+    
+    generate = commands.add_parser("generate", help="boş veritabanına tohumlu sentetik veri yaz")
+    generate.add_argument("customers", help="müşteri sayısı (ör. 10k, 1M)")
+    _add_profile_arguments(generate)
+    generate.set_defaults(handler=cmd_generate)
+    
+    bench = commands.add_parser("bench", help="sentetik verilerle performans ölçümü")
+    bench.add_argument("--sizes", default=",".join(str(size) for size in benchmark.DEFAULT_SIZES),
+                       help="virgülle ayrılmış müşteri sayıları (ör. 1k,10k,100k,1M)")
+    bench.add_argument("--repeats", type=int, default=20, help="her okuma/yazma işleminin tekrar sayısı")
+    bench.add_argument("--file-repeats", type=int, default=1, help="dışa/içe aktarmanın tekrar sayısı")
+    bench.add_argument("--workdir", help="üretilen verilerin saklandığı klasör (yeniden kullanılır)")
+    bench.add_argument("--json", help="sonuçların yazılacağı JSON dosyası (taban çizgisi olarak da kullanılır)")
+    bench.add_argument("--csv", help="sonuçların yazılacağı CSV dosyası")
+    bench.add_argument("--baseline", help="karşılaştırılacak JSON raporu")
+    bench.add_argument("--tolerance", type=float, default=0.2, help="izin verilen yavaşlama oranı")
+    _add_profile_arguments(bench)
+    # Uygulamanın veritabanını açmaz
+    bench.set_defaults(handler=cmd_bench, ledger=False)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if not getattr(args, "ledger", True):
+            return args.handler(None, args) or 0
+        ledger = Ledger(args.db)
+        try:
+            return args.handler(ledger, args) or 0
+        finally:
+            ledger.close()
+    except VeresiyeError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
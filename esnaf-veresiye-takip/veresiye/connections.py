@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""SQLite bağlantı yönetimi: tek yazıcı bağlantı ve okuma havuzu"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .tracing import PROGRESS_STEPS
+
+class ConnectionManager:
+    """Veritabanı bağlantılarını yönetir: tek yazıcı bağlantı + okuma havuzu"""
+
+    # WAL modunda her commit ana dosyayı fsync etmez, okuyucular yazıcıyı beklemez
+    JOURNAL_MODE = "wal"
+    SYNCHRONOUS = "NORMAL"
+    CACHE_SIZE_KB = 16 * 1024
+    MMAP_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, db_name, read_pool_size=2, busy_timeout=5000, journal_mode=JOURNAL_MODE):
+        self.db_name = db_name
+        self.read_pool_size = read_pool_size
+        self.busy_timeout = busy_timeout
+        self.journal_mode = journal_mode
+
+        # Son yazma zamanı ve checkpoint bekleyen yazma olup olmadığı
+        self.last_write = 0.0
+        self.pending_checkpoint = False
+        # Her commit'te artar; önbellekler geçerliliğini bununla kontrol eder
+        self.write_count = 0
+        # commit_hook(write_count) her commit'ten sonra, commit eden iş parçacığında çağrılır
+        self.commit_hook = None
+        # Sorgu izleyici (tracing.QueryTracer); None ise bağlantılara geri çağrı bağlanmaz
+        self.tracer = None
+        # İzleyici her değiştiğinde artar; bağlantılar bir sonraki kullanımda güncellenir
+        self._trace_generation = 0
+        self._traced = {}
+
+        # Yazma işlemleri tek bağlantı üzerinden ve kilitle sıralı yapılır
+        self._write_lock = threading.RLock()
+        self._writer = None
+
+        # Okuma bağlantıları ihtiyaç oldukça açılır ve havuzda tutulur
+        self._readers = queue.Queue()
+        self._reader_count = 0
+        self._pool_lock = threading.Lock()
+        self._all_connections = []
+        self._closed = False
+        # Kullanımdaki okuma bağlantıları; close() bunların bırakılmasını bekler
+        self._in_use = set()
+        self._released = threading.Condition(self._pool_lock)
+        self._closing = False
+
+    def _connect(self, pooled=True):
+        # isolation_level=None: işlemler transaction() ile açıkça yönetilir
+        conn = sqlite3.connect(self.db_name, timeout=self.busy_timeout / 1000,
+                               isolation_level=None, check_same_thread=False)
+        self._configure(conn)
+        if pooled:
+            self._all_connections.append(conn)
+        return conn
+
+    def _configure(self, conn):
+        """Bağlantı başına PRAGMA ayarları (yalnızca bağlantı açılırken bir kez)"""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA synchronous = {self.SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.MMAP_SIZE)}")
+        # INSERT OR REPLACE'in sildiği satırlar için de DELETE tetikleyicileri çalışsın
+        conn.execute("PRAGMA recursive_triggers = ON")
+
+    def set_tracer(self, tracer):
+        """Sorgu izleyicisini değiştir (None: kapat).
+
+        Kullanımdaki bir bağlantının geri çağrıları değiştirilmez; her bağlantı
+        havuzdan alınırken ya da yazma işlemi başlarken güncellenir.
+        """
+        self.tracer = tracer
+        self._trace_generation += 1
+
+    def _sync_tracer(self, conn):
+        """Bağlantının izleyicisini güncelle; adım sayacını (ya da None) döndür"""
+        generation, step = self._traced.get(conn, (0, None))
+        if generation != self._trace_generation:
+            tracer = self.tracer
+            if tracer is not None:
+                step = tracer.attach(conn)
+            else:
+                conn.set_trace_callback(None)
+                step = None
+            self._traced[conn] = (self._trace_generation, step)
+        return step
+
+    def _set_progress(self, conn, step, cancelled):
+        """İptal denetimi ve izleyicinin adım sayacını tek progress işleyicisinde birleştir"""
+        if step is None and cancelled is None:
+            conn.set_progress_handler(None, 0)
+        elif cancelled is None:
+            conn.set_progress_handler(step, PROGRESS_STEPS)
+        elif step is None:
+            conn.set_progress_handler(lambda: 1 if cancelled() else 0, PROGRESS_STEPS)
+        else:
+            def progress():
+                step()
+                return 1 if cancelled() else 0
+            conn.set_progress_handler(progress, PROGRESS_STEPS)
+
+    def _release_traced(self, conn):
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.release(conn)
+
+    @property
+    def writer(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Veritabanı bağlantıları kapatıldı")
+        if self._writer is None:
+            with self._write_lock:
+                if self._writer is None:
+                    conn = self._connect()
+                    # journal_mode dosyaya kalıcı yazılır; yazıcı açılırken bir kez ayarlanır
+                    conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+                    self._writer = conn
+        return self._writer
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Yazıcı bağlantı üzerinde işlem aç; hata olursa geri al.
+
+        İç içe çağrılar dıştaki işleme katılır.
+        """
+        with self._write_lock:
+            conn = self.writer
+            if conn.in_transaction:
+                yield conn.cursor()
+                return
+            step = self._sync_tracer(conn)
+            if step is not None:
+                self._set_progress(conn, step, None)
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn.cursor()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                # Dış kütüphaneler kendi commit'ini yapmış olabilir
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
+                self.last_write = time.monotonic()
+                self.pending_checkpoint = True
+                self.write_count += 1
+                if self.commit_hook is not None:
+                    self.commit_hook(self.write_count)
+            finally:
+                if step is not None:
+                    self._release_traced(conn)
+                    conn.set_progress_handler(None, 0)
+
+    # Toplu yüklemede kullanılan geçici önbellek boyutu
+    BULK_CACHE_SIZE_KB = 64 * 1024
+
+    @contextmanager
+    def bulk_write(self):
+        """Toplu yükleme için gevşetilmiş ayarlarla tek bir yazma işlemi.
+
+        synchronous=OFF ve büyük önbellek yalnızca bu işlem süresince geçerlidir;
+        işlem bitince (hata olsa da) normal ayarlara dönülür.
+        """
+        with self._write_lock:
+            conn = self.writer
+            # synchronous işlem dışında değiştirilmeli
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(f"PRAGMA cache_size = -{int(self.BULK_CACHE_SIZE_KB)}")
+            try:
+                with self.transaction(immediate=True) as cursor:
+                    yield cursor
+            finally:
+                conn.execute(f"PRAGMA synchronous = {self.SYNCHRONOUS}")
+                conn.execute(f"PRAGMA cache_size = -{int(self.CACHE_SIZE_KB)}")
+
+    def write(self, work, retries=5, base_delay=0.05):
+        """work(cursor) fonksiyonunu BEGIN IMMEDIATE işlemi içinde çalıştır.
+
+        Yazma kilidi başka bir süreçte (ikinci pencere, içe aktarma) ise
+        SQLITE_BUSY alınır; bu durumda artan beklemeyle yeniden denenir.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.transaction(immediate=True) as cursor:
+                    return work(cursor)
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                busy = "locked" in message or "busy" in message
+                if not busy or attempt >= retries or self.writer.in_transaction:
+                    raise
+                time.sleep(base_delay * (2 ** attempt))
+                attempt += 1
+
+    @contextmanager
+    def reader(self, cancelled=None, dedicated=False):
+        """Havuzdan bir okuma bağlantısı al, iş bitince geri bırak.
+
+        Havuzdaki bağlantıların hepsi kullanımdaysa beklenmez; iş bitince
+        kapatılan geçici bir bağlantı açılır. dedicated=True uzun süren işler
+        (yedekleme, dışa aktarma) içindir: havuzu meşgul etmemek için her
+        zaman geçici bağlantı kullanılır.
+
+        cancelled verilirse sorgu çalışırken düzenli aralıklarla çağrılır;
+        True dönerse sorgu sqlite3.OperationalError ('interrupted') ile kesilir.
+        """
+        if self._closed or self._closing:
+            raise sqlite3.ProgrammingError("Veritabanı bağlantıları kapatıldı")
+        conn = None
+        pooled = not dedicated
+        if pooled:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                with self._pool_lock:
+                    pooled = self._reader_count < self.read_pool_size
+                    if pooled:
+                        self._reader_count += 1
+        if conn is None:
+            conn = self._connect(pooled)
+        with self._pool_lock:
+            self._in_use.add(conn)
+        try:
+            step = self._sync_tracer(conn)
+            if cancelled is not None or step is not None:
+                self._set_progress(conn, step, cancelled)
+            try:
+                yield conn.cursor()
+            finally:
+                if step is not None:
+                    self._release_traced(conn)
+                if pooled:
+                    if cancelled is not None or step is not None:
+                        conn.set_progress_handler(None, 0)
+                    self._readers.put(conn)
+                else:
+                    if self._traced.pop(conn, None) is not None and self.tracer is not None:
+                        self.tracer.forget(conn)
+                    conn.close()
+        finally:
+            with self._pool_lock:
+                self._in_use.discard(conn)
+                self._released.notify_all()
+
+    def checkpoint(self, mode="PASSIVE", blocking=True):
+        """WAL dosyasındaki değişiklikleri ana veritabanı dosyasına aktar.
+
+        PASSIVE okuyucuları ve yazıcıyı beklemez; TRUNCATE kapanışta WAL'ı sıfırlar.
+        blocking=False ise yazıcı meşgulken (ör. içe aktarma) beklemeden False döner.
+        """
+        if not self._write_lock.acquire(blocking=blocking):
+            return False
+        try:
+            busy, _, _ = self.writer.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            self._release_traced(self.writer)
+            if not busy:
+                self.pending_checkpoint = False
+            return not busy
+        finally:
+            self._write_lock.release()
+
+    # close() kullanımdaki okuma bağlantılarını en çok bu kadar saniye bekler
+    CLOSE_TIMEOUT = 30
+
+    def close(self, timeout=None):
+        """Tüm bağlantıları kapat (uygulama kapanırken ve geri yüklemede çağrılır).
+
+        Yeni okuma bağlantısı verilmez; kullanımdaki bağlantıların sorguları
+        kesilir (interrupt) ve bırakılmaları beklenir. timeout (varsayılan
+        CLOSE_TIMEOUT) saniye içinde bırakılmazlarsa hiçbir bağlantı kapatılmaz ve sqlite3.OperationalError
+        yükseltilir.
+        """
+        with self._pool_lock:
+            if self._closed:
+                return
+            self._closing = True
+            deadline = time.monotonic() + (self.CLOSE_TIMEOUT if timeout is None else timeout)
+            while self._in_use:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._closing = False
+                    raise sqlite3.OperationalError("Okuma bağlantıları hâlâ kullanımda")
+                # interrupt yalnızca o an çalışan sorguyu keser; sonraki sorgular için yinelenir
+                for conn in self._in_use:
+                    conn.interrupt()
+                self._released.wait(min(remaining, 0.1))
+        with self._write_lock:
+            if self._writer is not None and not self._closed:
+                try:
+                    self.checkpoint("TRUNCATE")
+                except sqlite3.Error:
+                    pass
+            self._closed = True
+            for conn in self._all_connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all_connections = []
+            self._traced = {}
+            self._writer = None
+            self._readers = queue.Queue()
+            self._reader_count = 0
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Motorun hata türleri.
+
+Motor arayüz göstermez; bütün hatalar VeresiyeError altında toplanır.
+Arayüz ve komut satırı bu hataları yakalayıp kullanıcıya gösterir.
+"""
+
+
+class VeresiyeError(Exception):
+    """Veresiye motorunun bütün hatalarının tabanı"""
+
+
+class StorageError(VeresiyeError):
+    """Veritabanı okunamadı ya da yazılamadı (sqlite3.Error sarılır)"""
+
+
+class NotFoundError(VeresiyeError, LookupError):
+    """İstenen müşteri ya da kayıt bulunamadı"""
+
+
+class ValidationError(VeresiyeError, ValueError):
+    """Geçersiz tutar, tarih, numara ya da dosya içeriği"""
+
+
+class DataFileError(VeresiyeError):
+    """İçe/dışa aktarma dosyası okunamadı ya da yazılamadı"""
+
+
+class BackupError(VeresiyeError):
+    """Yedek alınamadı ya da geri yüklenemedi"""
+
+
+class BackupCancelled(VeresiyeError):
+    """Çalışan yedekleme iptal edildi (uygulamadan çıkılırken)"""
+
+
+class ImportCancelled(VeresiyeError):
+    """İçe aktarma kullanıcı tarafından iptal edildi; işlem geri alındı"""
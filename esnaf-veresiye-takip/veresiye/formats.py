@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Para ve tarih değerlerinin ayrıştırılması ve gösterimi"""
+
+import math
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from .errors import ValidationError
+
+# Para tutarları veritabanında ve kodda tam sayı kuruş olarak tutulur (1 TL = 100 kuruş)
+def parse_money(value):
+    """TL tutarını kuruşa çevir: '12,50', '1.234,56', '12.5', 12.5 -> int kuruş.
+
+    İkiden fazla ondalık basamaklı tutarlar ('12.345') ValidationError verir.
+    """
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float):
+        # Excel hücrelerindeki ikili kayan nokta gürültüsü (0.1 + 0.2) kuruşa yuvarlanır;
+        # gerçekten kuruştan küçük basamağı olan değerler aşağıda reddedilir
+        if math.isfinite(value) and abs(value * 100 - round(value * 100)) < 1e-6:
+            value = round(value, 2)
+        value = repr(value)
+    text = str(value).strip().upper().replace("TL", "").replace("₺", "").replace(" ", "")
+    if "," in text and "." in text:
+        # Sonda olan ayraç ondalık ayracıdır, diğeri binlik
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValidationError(f"Geçersiz tutar: {value}")
+    if not amount.is_finite():
+        raise ValidationError(f"Geçersiz tutar: {value}")
+    kurus = amount * 100
+    if kurus != kurus.to_integral_value():
+        # Tutarlar tam kuruş saklanır; sessizce yuvarlanmaz
+        raise ValidationError(f"Geçersiz tutar (en çok iki ondalık basamak): {value}")
+    return int(kurus)
+
+def format_money(kurus, currency=True):
+    """Kuruşu gösterim metnine çevir: 123456 -> '1234.56 TL'"""
+    sign = "-" if kurus < 0 else ""
+    lira, rest = divmod(abs(int(kurus)), 100)
+    text = f"{sign}{lira}.{rest:02d}"
+    return f"{text} TL" if currency else text
+
+# Dosya başlıklarını karşılaştırmak için Türkçe harfler sadeleştirilir
+HEADER_TRANSLATION = str.maketrans("çğıöşü", "cgiosu")
+
+# İçe aktarmada kabul edilen tarih biçimleri; veritabanına hep ilki ile yazılır
+IMPORT_DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+    "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y",
+)
+
+def parse_date(value):
+    """Tarihi veritabanı biçimine çevir: '05.03.2024' -> '2024-03-05 00:00:00'"""
+    if isinstance(value, datetime):
+        return value.strftime(IMPORT_DATE_FORMATS[0])
+    text = str(value).strip()
+    try:
+        # ISO biçimi (veritabanının kendi biçimi) strptime'dan çok daha hızlı ayrıştırılır
+        return datetime.fromisoformat(text).strftime(IMPORT_DATE_FORMATS[0])
+    except ValueError:
+        pass
+    for date_format in IMPORT_DATE_FORMATS[3:]:
+        try:
+            return datetime.strptime(text, date_format).strftime(IMPORT_DATE_FORMATS[0])
+        except ValueError:
+            continue
+    raise ValidationError(f"Geçersiz tarih: {value}")
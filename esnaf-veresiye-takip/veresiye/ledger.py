@@ -0,0 +1,1752 @@
+# -*- coding: utf-8 -*-
+"""Veresiye defteri motoru: müşteriler, borç/ödeme kayıtları, içe/dışa aktarma ve yedekler.
+
+Arayüzden bağımsızdır; hatalar errors modülündeki türlerle bildirilir.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import time
+import uuid
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+
+from .backups import BackupRepository
+from .connections import ConnectionManager
+from .errors import (BackupCancelled, BackupError, DataFileError, ImportCancelled, NotFoundError,
+                     StorageError, ValidationError)
+from .formats import HEADER_TRANSLATION, format_money, parse_date, parse_money
+from .settings import SettingsStore
+from .system import get_app_data_folder, set_startup
+from .tracing import QueryTracer
+
+# Kasadaki borç/ödeme kaydının sonucu: yeni ödeme kaydı ve müşterinin güncel bakiyesi
+LedgerEntry = namedtuple("LedgerEntry", "payment_id balance")
+
+# UPDATE ... RETURNING SQLite 3.35 ile geldi; eski sürümlerde aynı işlem içinde ayrı SELECT yapılır
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Hesap özeti: ledger_stats satırından okunan toplamlar (kuruş)
+LedgerStats = namedtuple("LedgerStats", "total_debt debtor_count average_debt day_debits day_credits")
+EMPTY_STATS = LedgerStats(0, 0, 0, 0, 0)
+
+# İçe aktarma sonucu: yazılan ve atlanan satır sayısı, (satır no, hata) listesi,
+# yazılan ödeme kaydı sayısı (yalnızca Excel)
+ImportResult = namedtuple("ImportResult", "imported failed errors payments", defaults=(0,))
+
+# Bir müşteri sayfası: imleçler (sıralama değeri, id) çiftidir
+CustomerPage = namedtuple("CustomerPage", "customers next_cursor prev_cursor has_more has_prev")
+EMPTY_PAGE = CustomerPage([], None, None, False, False)
+
+@contextmanager
+def _file_errors(message):
+    """İçe/dışa aktarmada dosya ve veritabanı hatalarını motor hatalarına çevir"""
+    try:
+        yield
+    except sqlite3.Error as e:
+        raise StorageError(f"{message}: {e}") from e
+    except (OSError, csv.Error, UnicodeDecodeError, KeyError, zipfile.BadZipFile) as e:
+        raise DataFileError(f"{message}: {e}") from e
+
+@contextmanager
+def _backup_errors(message):
+    """Yedeklemede dosya ve veritabanı hatalarını BackupError'a çevir"""
+    try:
+        yield
+    except (sqlite3.Error, OSError) as e:
+        raise BackupError(f"{message}: {e}") from e
+
+class Ledger:
+    """Veresiye defteri motoru.
+
+    Arayüz göstermez; hatalar VeresiyeError türleriyle bildirilir. Qt
+    arayüzü, komut satırı ve arka plan işleri aynı motoru kullanır.
+    """
+    
+    # Sayfalama sıralama anahtarları: ad -> (sütun, satırdaki sıra)
+    SORT_KEYS = {
+        "id": ("id", 0),
+        "name": ("name", 1),
+        "debt": ("debt", 5),
+    }
+    
+    def __init__(self, db_name=None, initialize=True):
+        # Veritabanını kullanıcının appdata klasörüne kaydet
+        self.db_name = db_name or os.path.join(get_app_data_folder(), "veresiye.db")
+        self.connections = ConnectionManager(self.db_name)
+        self.settings = SettingsStore(self.connections)
+        self.fts_enabled = False
+        self._count_cache = {}
+        self._count_cache_version = -1
+        self.tracer = None
+        self.settings.subscribe(self._on_setting_changed)
+        if initialize:
+            self.init_db()
+        self.backup_folder = self.backup_folder_for(self.db_name)
+        self.backups = BackupRepository(self.backup_folder)
+    
+    @staticmethod
+    def backup_folder_for(db_name):
+        """Veritabanının yedek deposu: dosyanın yanında, adından türetilen klasör.
+
+        Uygulamanın veritabanı (veresiye.db) önceki sürümlerdeki 'backups'
+        klasörünü kullanmaya devam eder.
+        """
+        folder, name = os.path.split(os.path.abspath(db_name))
+        stem = os.path.splitext(name)[0]
+        return os.path.join(folder, "backups" if stem == "veresiye" else f"{stem}_backups")
+    
+    @property
+    def database_id(self):
+        """Veritabanının kalıcı kimliği; yedek deposundaki kayıtlar bununla eşleştirilir"""
+        return self.settings.get('database_id')
+
+    def close(self):
+        """Bağlantıları kapat; kullanımdaki okuma bağlantıları bırakılana kadar beklenir"""
+        self.disable_tracing()
+        try:
+            self.connections.close()
+        except sqlite3.Error as e:
+            raise StorageError(f"Veritabanı kapatılamadı: {e}") from e
+    
+    # Sorgu izleme açıkken süresi ölçülen motor metotları
+    TRACED_METHODS = (
+        "get_ledger_stats", "add_customer", "get_customers", "search_customers", "count_customers",
+        "update_customer_debt", "get_customer", "get_payments", "delete_customer", "delete_payment",
+        "restore_customer", "export_csv", "export_excel", "import_csv", "import_excel", "backup_to",
+        "backup_incremental", "restore_point", "restore_from", "set_settings", "run_auto_backup",
+        "export_backup", "backup", "checkpoint_if_idle",
+    )
+    
+    def enable_tracing(self, slow_ms=None):
+        """Sorgu izlemeyi aç: deyim/metot gecikme histogramları ve yavaş sorgu günlüğü.
+
+        Kapalıyken bağlantılara geri çağrı bağlanmaz ve metotlar sarılmaz.
+        """
+        if slow_ms is None:
+            slow_ms = self.settings.get_int('slow_query_ms', 100)
+        if self.tracer is not None:
+            self.tracer.slow_ms = slow_ms
+            return self.tracer
+        log_folder = os.path.join(get_app_data_folder(), "logs")
+        os.makedirs(log_folder, exist_ok=True)
+        tracer = QueryTracer(self.db_name, os.path.join(log_folder, "slow_queries.log"), slow_ms)
+        # Örnek özniteliği sınıftaki metodu gölgeler; kapatınca silinerek asıl metoda dönülür
+        for name in self.TRACED_METHODS:
+            setattr(self, name, tracer.wrap(name, getattr(type(self), name).__get__(self)))
+        self.tracer = tracer
+        self.connections.set_tracer(tracer)
+        return tracer
+    
+    def disable_tracing(self):
+        if self.tracer is None:
+            return
+        tracer, self.tracer = self.tracer, None
+        self.connections.set_tracer(None)
+        for name in self.TRACED_METHODS:
+            self.__dict__.pop(name, None)
+        tracer.close()
+    
+    def tracing_summary(self, limit=10):
+        """İzleme açıksa en pahalı metot ve deyimlerin özeti, kapalıysa None"""
+        tracer = self.tracer
+        return tracer.summary(limit) if tracer is not None else None
+    
+    def _apply_trace_settings(self):
+        if self.settings.get_bool('trace_queries'):
+            self.enable_tracing()
+        else:
+            self.disable_tracing()
+    
+    def _on_setting_changed(self, key, value):
+        if key in ('trace_queries', 'slow_query_ms'):
+            self._apply_trace_settings()
+    
+    def checkpoint_if_idle(self, idle_seconds=30):
+        """Son yazmadan bu yana yeterli süre geçtiyse WAL checkpoint yap"""
+        manager = self.connections
+        if not manager.pending_checkpoint:
+            return False
+        if time.monotonic() - manager.last_write < idle_seconds:
+            return False
+        try:
+            # Arayüz iş parçacığından çağrılır; süren bir yazmayı beklemez
+            return manager.checkpoint("PASSIVE", blocking=False)
+        except sqlite3.Error:
+            # Checkpoint kritik değil; bir sonraki boşta denemede tekrar yapılır
+            return False
+
+    def init_db(self):
+        try:
+            with self.connections.transaction() as cursor:
+                # Müşteriler tablosu
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS customers (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        surname TEXT,
+                        phone TEXT,
+                        address TEXT,
+                        debt REAL DEFAULT 0,
+                        created_date TEXT
+                    )
+                ''')
+                
+                # Ödemeler tablosu
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS payments (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        customer_id INTEGER,
+                        amount REAL,
+                        payment_type TEXT,
+                        note TEXT,
+                        date TEXT,
+                        FOREIGN KEY (customer_id) REFERENCES customers (id)
+                    )
+                ''')
+                
+                # Ayarlar tablosu
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT
+                    )
+                ''')
+                
+                # Otomatik yedekleme ayarları
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('auto_backup', 'daily')
+                ''')
+                
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('last_backup', '')
+                ''')
+                
+                # Bu kadar yazmadan sonra da yedek al (0 = kapalı)
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('backup_after_writes', '0')
+                ''')
+                
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('theme', 'light')
+                ''')
+                
+                # Başlangıçta açılma ayarı
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('start_with_windows', '0')
+                ''')
+                
+                # Yedek deposunda bu veritabanının kayıtlarını ayırt eden kimlik
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('database_id', ?)
+                ''', (uuid.uuid4().hex,))
+                
+                # Sorgu izleme ve yavaş sorgu eşiği (ms)
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('trace_queries', '0')
+                ''')
+                
+                cursor.execute('''
+                    INSERT OR IGNORE INTO settings (key, value) 
+                    VALUES ('slow_query_ms', '100')
+                ''')
+            
+            # Bekleyen şema geçişlerini uygula
+            self.migrate()
+            self._ensure_derived()
+            self._apply_trace_settings()
+        except sqlite3.Error as e:
+            raise StorageError(f"Veritabanı başlatılamadı: {e}") from e
+    
+    def _ensure_derived(self):
+        """Tetikleyicilerle beslenen arama indeksini, hesap özetini ve değişiklik günlüğünü hazırla"""
+        self.fts_enabled = self._ensure_search_index()
+        self._ensure_ledger_stats()
+        self._ensure_change_log()
+    
+    def migrate(self):
+        """PRAGMA user_version ile takip edilen şema geçişlerini sırayla uygula.
+
+        Her geçiş kendi işleminde çalışır; yarıda kalan geçiş geri alınır ve
+        bir sonraki açılışta yeniden denenir.
+        """
+        for version, migration in self.MIGRATIONS:
+            with self.connections.transaction(immediate=True) as cursor:
+                # Başka bir örnek aynı anda geçişi yapmış olabilir, işlem içinde tekrar oku
+                cursor.execute("PRAGMA user_version")
+                if cursor.fetchone()[0] >= version:
+                    continue
+                migration(self, cursor)
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+    
+    def _migration_indexes(self, cursor):
+        # Ödeme geçmişi (WHERE customer_id = ? ORDER BY date) ve müşteri silme
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_customer_date ON payments (customer_id, date)")
+        # Borçlu/ödeyen filtreleri ve toplam/ortalama borç
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_debt ON customers (debt)")
+        # Ad ve telefon ile arama/sıralama
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers (name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers (phone)")
+    
+    def _migration_integer_money(self, cursor):
+        # Borç ve tutarlar REAL TL yerine INTEGER kuruş. SQLite sütun tipini
+        # değiştiremediği için tablolar yeniden oluşturulur; tetikleyiciler
+        # tabloyla birlikte silinir ve açılışta yeniden kurulur.
+        cursor.execute('''
+            CREATE TABLE customers_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                surname TEXT,
+                phone TEXT,
+                address TEXT,
+                debt INTEGER NOT NULL DEFAULT 0,
+                created_date TEXT
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO customers_new (id, name, surname, phone, address, debt, created_date)
+            SELECT id, name, surname, phone, address, CAST(ROUND(COALESCE(debt, 0) * 100) AS INTEGER), created_date
+            FROM customers
+        ''')
+        self._replace_table(cursor, "customers", "customers_new")
+        
+        cursor.execute('''
+            CREATE TABLE payments_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                customer_id INTEGER,
+                amount INTEGER NOT NULL DEFAULT 0,
+                payment_type TEXT,
+                note TEXT,
+                date TEXT,
+                FOREIGN KEY (customer_id) REFERENCES customers (id)
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO payments_new (id, customer_id, amount, payment_type, note, date)
+            SELECT id, customer_id, CAST(ROUND(COALESCE(amount, 0) * 100) AS INTEGER), payment_type, note, date
+            FROM payments
+        ''')
+        self._replace_table(cursor, "payments", "payments_new")
+        
+        self._migration_indexes(cursor)
+    
+    def _replace_table(self, cursor, table, new_table):
+        """Eski tabloyu sil, yenisini onun adıyla değiştir; AUTOINCREMENT sayacını koru"""
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+        row = cursor.fetchone()
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        if row:
+            # Silinmiş en yüksek id tekrar kullanılmasın
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, row[0]))
+    
+    # (sürüm, geçiş) çiftleri; yeni geçişler listenin sonuna eklenir.
+    # init_db sürüm 0 şemasını kurar, sonraki her değişiklik buradan yapılır.
+    MIGRATIONS = [
+        (1, _migration_indexes),
+        (2, _migration_integer_money),
+    ]
+    
+    # İndeks kullanması gereken sorgular: (ad, SQL, parametreler)
+    QUERY_PLAN_CHECKS = [
+        ("get_payments", "SELECT * FROM payments WHERE customer_id = ? ORDER BY date DESC", (1,)),
+        ("get_payments_days", "SELECT * FROM payments WHERE customer_id = ? AND date >= ? ORDER BY date DESC", (1, "2000-01-01")),
+        ("delete_customer_payments", "DELETE FROM payments WHERE customer_id = ?", (1,)),
+        ("debt_filter", "SELECT * FROM customers WHERE debt > 0", ()),
+        ("paid_filter", "SELECT * FROM customers WHERE debt <= 0", ()),
+        ("ledger_stats_rebuild", "SELECT coalesce(SUM(debt), 0), COUNT(*) FROM customers WHERE debt > 0", ()),
+        ("name_lookup", "SELECT * FROM customers WHERE name = ?", ("",)),
+        ("phone_lookup", "SELECT * FROM customers WHERE phone = ?", ("",)),
+    ]
+    
+    def explain(self, query, params=()):
+        """EXPLAIN QUERY PLAN çıktısının açıklama satırlarını döndür"""
+        with self.connections.reader() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            return [row[3] for row in cursor.fetchall()]
+    
+    def check_query_plans(self):
+        """Tablo taramasına düşen sorguları (ad, plan) listesi olarak döndür"""
+        failures = []
+        for name, query, params in self.QUERY_PLAN_CHECKS:
+            plan = self.explain(query, params)
+            if any(step.startswith("SCAN") or "TEMP B-TREE" in step for step in plan):
+                failures.append((name, plan))
+        return failures
+    
+    # Arama indeksi: unicode61 büyük/küçük harf ve aksanları (ş→s, ğ→g, İ→i) katlar;
+    # noktasız ı'nın karşılığı olmadığı için hem indekste hem sorguda i'ye çevrilir.
+    SEARCH_COLUMNS = ("name", "surname", "phone", "address")
+    SEARCH_TRIGGERS = ("customers_fts_ai", "customers_fts_ad", "customers_fts_au")
+    
+    @classmethod
+    def _search_values(cls, prefix):
+        return ", ".join(f"replace(coalesce({prefix}.{col}, ''), 'ı', 'i')" for col in cls.SEARCH_COLUMNS)
+    
+    def _ensure_search_index(self):
+        """FTS5 arama indeksini ve senkron tetikleyicilerini hazırla.
+
+        Tetikleyiciler yoksa (ilk kurulum, tablo yeniden oluşturma) indeks
+        baştan doldurulur. FTS5 yoksa tetikleyiciler kaldırılır ve arama
+        LIKE ile yapılır.
+        """
+        columns = ", ".join(self.SEARCH_COLUMNS)
+        try:
+            with self.connections.transaction(immediate=True) as cursor:
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5 (
+                        {columns},
+                        content='',
+                        prefix='2 3',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                ''')
+                placeholders = ", ".join("?" * len(self.SEARCH_TRIGGERS))
+                cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                               self.SEARCH_TRIGGERS)
+                if cursor.fetchone()[0] == len(self.SEARCH_TRIGGERS):
+                    return True
+                
+                insert_new = f"INSERT INTO customers_fts (rowid, {columns}) VALUES (new.id, {self._search_values('new')});"
+                delete_old = (f"INSERT INTO customers_fts (customers_fts, rowid, {columns}) "
+                              f"VALUES ('delete', old.id, {self._search_values('old')});")
+                self._drop_search_triggers(cursor)
+                cursor.execute(f"CREATE TRIGGER customers_fts_ai AFTER INSERT ON customers BEGIN {insert_new} END")
+                cursor.execute(f"CREATE TRIGGER customers_fts_ad AFTER DELETE ON customers BEGIN {delete_old} END")
+                cursor.execute(f"CREATE TRIGGER customers_fts_au AFTER UPDATE OF {columns} ON customers "
+                               f"BEGIN {delete_old} {insert_new} END")
+                
+                # İndeksi müşteri tablosundan yeniden doldur
+                cursor.execute("INSERT INTO customers_fts (customers_fts) VALUES ('delete-all')")
+                cursor.execute(f"INSERT INTO customers_fts (rowid, {columns}) "
+                               f"SELECT id, {self._search_values('customers')} FROM customers")
+            return True
+        except sqlite3.OperationalError:
+            # FTS5 derlenmemiş SQLite: tetikleyiciler müşteri yazmalarını bozmasın
+            with self.connections.transaction() as cursor:
+                self._drop_search_triggers(cursor)
+            return False
+    
+    def _drop_search_triggers(self, cursor):
+        for trigger in self.SEARCH_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    
+    @staticmethod
+    def _fts_match(search_text):
+        """Kullanıcı metnini FTS5 önek sorgusuna çevir: 'meh yıl' -> '"meh"* "yil"*'"""
+        terms = re.findall(r"[^\W_]+", search_text.replace("ı", "i"))
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    # Hesap özeti: tek satırlık ledger_stats tablosu tetikleyicilerle güncel tutulur,
+    # özet ekranı müşteri sayısından bağımsız olarak tek satır okur.
+    # Günlük toplamlar 'day' gününe aittir; gün değişince o günün ilk kaydında sıfırlanır.
+    LEDGER_TRIGGERS = {
+        "ledger_stats_customers_ai": '''
+            AFTER INSERT ON customers WHEN new.debt > 0 BEGIN
+                UPDATE ledger_stats SET total_debt = total_debt + new.debt,
+                                        debtor_count = debtor_count + 1 WHERE id = 1;
+            END''',
+        "ledger_stats_customers_ad": '''
+            AFTER DELETE ON customers WHEN old.debt > 0 BEGIN
+                UPDATE ledger_stats SET total_debt = total_debt - old.debt,
+                                        debtor_count = debtor_count - 1 WHERE id = 1;
+            END''',
+        "ledger_stats_customers_au": '''
+            AFTER UPDATE OF debt ON customers WHEN old.debt > 0 OR new.debt > 0 BEGIN
+                UPDATE ledger_stats
+                SET total_debt = total_debt - max(old.debt, 0) + max(new.debt, 0),
+                    debtor_count = debtor_count - (old.debt > 0) + (new.debt > 0)
+                WHERE id = 1;
+            END''',
+        "ledger_stats_payments_ai": '''
+            AFTER INSERT ON payments BEGIN
+                UPDATE ledger_stats SET day = substr(new.date, 1, 10), day_debits = 0, day_credits = 0
+                WHERE id = 1 AND day < substr(new.date, 1, 10);
+                UPDATE ledger_stats
+                SET day_debits = day_debits + (CASE WHEN new.payment_type = 'debt' THEN new.amount ELSE 0 END),
+                    day_credits = day_credits + (CASE WHEN new.payment_type = 'payment' THEN new.amount ELSE 0 END)
+                WHERE id = 1 AND day = substr(new.date, 1, 10);
+            END''',
+        "ledger_stats_payments_ad": '''
+            AFTER DELETE ON payments BEGIN
+                UPDATE ledger_stats
+                SET day_debits = day_debits - (CASE WHEN old.payment_type = 'debt' THEN old.amount ELSE 0 END),
+                    day_credits = day_credits - (CASE WHEN old.payment_type = 'payment' THEN old.amount ELSE 0 END)
+                WHERE id = 1 AND day = substr(old.date, 1, 10);
+            END''',
+        # İçe aktarmada var olan işlem numarası güncellenir (ON CONFLICT DO UPDATE):
+        # eski satır gününden düşülür, yeni satır gününe eklenir
+        "ledger_stats_payments_au": '''
+            AFTER UPDATE OF amount, payment_type, date ON payments BEGIN
+                UPDATE ledger_stats
+                SET day_debits = day_debits - (CASE WHEN old.payment_type = 'debt' THEN old.amount ELSE 0 END),
+                    day_credits = day_credits - (CASE WHEN old.payment_type = 'payment' THEN old.amount ELSE 0 END)
+                WHERE id = 1 AND day = substr(old.date, 1, 10);
+                UPDATE ledger_stats SET day = substr(new.date, 1, 10), day_debits = 0, day_credits = 0
+                WHERE id = 1 AND day < substr(new.date, 1, 10);
+                UPDATE ledger_stats
+                SET day_debits = day_debits + (CASE WHEN new.payment_type = 'debt' THEN new.amount ELSE 0 END),
+                    day_credits = day_credits + (CASE WHEN new.payment_type = 'payment' THEN new.amount ELSE 0 END)
+                WHERE id = 1 AND day = substr(new.date, 1, 10);
+            END''',
+    }
+    
+    def _ensure_ledger_stats(self):
+        """Özet tablosunu ve tetikleyicilerini hazırla.
+
+        Tetikleyicilerden biri eksikse (ilk kurulum, tablo yeniden oluşturma,
+        içe aktarma) özet satırı tablolardan baştan hesaplanır.
+        """
+        with self.connections.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ledger_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_debt INTEGER NOT NULL DEFAULT 0,
+                    debtor_count INTEGER NOT NULL DEFAULT 0,
+                    day TEXT NOT NULL DEFAULT '',
+                    day_debits INTEGER NOT NULL DEFAULT 0,
+                    day_credits INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            names = tuple(self.LEDGER_TRIGGERS)
+            placeholders = ", ".join("?" * len(names))
+            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                           names)
+            if cursor.fetchone()[0] == len(names):
+                cursor.execute("SELECT 1 FROM ledger_stats WHERE id = 1")
+                if cursor.fetchone():
+                    return
+            
+            for name, body in self.LEDGER_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"CREATE TRIGGER {name} {body}")
+            self._rebuild_ledger_stats(cursor)
+    
+    def _rebuild_ledger_stats(self, cursor):
+        """Özet satırını customers/payments tablolarından baştan hesapla"""
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        cursor.execute("SELECT coalesce(SUM(debt), 0), COUNT(*) FROM customers WHERE debt > 0")
+        total_debt, debtor_count = cursor.fetchone()
+        cursor.execute('''
+            SELECT coalesce(SUM(CASE WHEN payment_type = 'debt' THEN amount ELSE 0 END), 0),
+                   coalesce(SUM(CASE WHEN payment_type = 'payment' THEN amount ELSE 0 END), 0)
+            FROM payments WHERE date >= ? AND date < ?
+        ''', (today, tomorrow))
+        day_debits, day_credits = cursor.fetchone()
+        cursor.execute('''
+            INSERT OR REPLACE INTO ledger_stats (id, total_debt, debtor_count, day, day_debits, day_credits)
+            VALUES (1, ?, ?, ?, ?, ?)
+        ''', (total_debt, debtor_count, today, day_debits, day_credits))
+    
+    # Değişiklik günlüğü: artımlı yedekler son yedekten beri değişen satırları
+    # buradan bulur. Satır değerleri değil yalnızca (tablo, id) yazılır; değerler
+    # yedek anında tablodan okunur. tbl = '*' kaydı bir sonraki yedeğin tam
+    # olmasını ister (tetikleyiciler yeniden kurulduğunda, geri yüklemeden sonra).
+    CHANGE_LOG_TRIGGERS = {
+        "change_log_customers_ai": "AFTER INSERT ON customers BEGIN "
+                                   "INSERT INTO change_log (tbl, row_id) VALUES ('customers', new.id); END",
+        "change_log_customers_au": "AFTER UPDATE ON customers BEGIN "
+                                   "INSERT INTO change_log (tbl, row_id) VALUES ('customers', new.id); END",
+        "change_log_customers_ad": "AFTER DELETE ON customers BEGIN "
+                                   "INSERT INTO change_log (tbl, row_id) VALUES ('customers', old.id); END",
+        "change_log_payments_ai": "AFTER INSERT ON payments BEGIN "
+                                  "INSERT INTO change_log (tbl, row_id) VALUES ('payments', new.id); END",
+        "change_log_payments_au": "AFTER UPDATE ON payments BEGIN "
+                                  "INSERT INTO change_log (tbl, row_id) VALUES ('payments', new.id); END",
+        "change_log_payments_ad": "AFTER DELETE ON payments BEGIN "
+                                  "INSERT INTO change_log (tbl, row_id) VALUES ('payments', old.id); END",
+        # Ayarlar küçük olduğu için deltaya bütün olarak yazılır; her yedekte değişen last_backup sayılmaz
+        "change_log_settings_ai": "AFTER INSERT ON settings WHEN new.key != 'last_backup' BEGIN "
+                                  "INSERT INTO change_log (tbl) VALUES ('settings'); END",
+        "change_log_settings_au": "AFTER UPDATE ON settings WHEN new.key != 'last_backup' BEGIN "
+                                  "INSERT INTO change_log (tbl) VALUES ('settings'); END",
+        "change_log_settings_ad": "AFTER DELETE ON settings WHEN old.key != 'last_backup' BEGIN "
+                                  "INSERT INTO change_log (tbl) VALUES ('settings'); END",
+    }
+    
+    def _ensure_change_log(self):
+        """Değişiklik günlüğünü ve tetikleyicilerini hazırla.
+
+        Tetikleyicilerden biri eksikse aradaki değişiklikler kaydedilmemiş
+        olabilir; bu durumda bir sonraki otomatik yedek tam alınır.
+        """
+        with self.connections.transaction(immediate=True) as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tbl TEXT NOT NULL,
+                    row_id INTEGER
+                )
+            ''')
+            names = tuple(self.CHANGE_LOG_TRIGGERS)
+            placeholders = ", ".join("?" * len(names))
+            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                           names)
+            if cursor.fetchone()[0] == len(names):
+                return
+            
+            for name, body in self.CHANGE_LOG_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"CREATE TRIGGER {name} {body}")
+            self._request_full_backup(cursor)
+    
+    @staticmethod
+    def _request_full_backup(cursor):
+        cursor.execute("INSERT INTO change_log (tbl) VALUES ('*')")
+    
+    def get_ledger_stats(self):
+        """Hesap özetini tek satırdan oku; LedgerStats döndürür"""
+        try:
+            with self.connections.reader() as cursor:
+                cursor.execute("SELECT total_debt, debtor_count, day, day_debits, day_credits FROM ledger_stats WHERE id = 1")
+                row = cursor.fetchone()
+        except sqlite3.Error as e:
+            raise StorageError(f"Hesap özeti alınamadı: {e}") from e
+        if not row:
+            return EMPTY_STATS
+        
+        total_debt, debtor_count, day, day_debits, day_credits = row
+        # Bugün henüz kayıt yoksa satırdaki günlük toplamlar eski güne aittir
+        if day != datetime.now().strftime("%Y-%m-%d"):
+            day_debits = day_credits = 0
+        # Tam sayı kuruş üzerinden, en yakın kuruşa yuvarlanmış ortalama
+        average = (total_debt + debtor_count // 2) // debtor_count if debtor_count else 0
+        return LedgerStats(total_debt, debtor_count, average, day_debits, day_credits)
+    
+    def add_customer(self, name, surname="", phone="", address="", debt=0):
+        try:
+            with self.connections.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO customers (name, surname, phone, address, debt, created_date)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, surname, phone, address, debt, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            raise StorageError(f"Müşteri eklenemedi: {e}") from e
+    
+    def get_customers(self, filter_type="all", cursor=None, backwards=False, page_size=50, sort_key="id",
+                      cancelled=None):
+        try:
+            return self._customer_page("", filter_type, cursor, backwards, page_size, sort_key, cancelled)
+        except sqlite3.Error as e:
+            raise StorageError(f"Müşteriler yüklenemedi: {e}") from e
+    
+    def search_customers(self, search_text, filter_type="all", cursor=None, backwards=False, page_size=50,
+                         sort_key="id", cancelled=None):
+        try:
+            return self._customer_page(search_text, filter_type, cursor, backwards, page_size, sort_key, cancelled)
+        except sqlite3.Error as e:
+            raise StorageError(f"Arama hatası: {e}") from e
+    
+    def _customer_conditions(self, search_text, filter_type):
+        """Arama metni ve filtre için WHERE koşulları ve parametreleri"""
+        conditions = []
+        params = []
+        
+        if search_text:
+            if self.fts_enabled:
+                match = self._fts_match(search_text)
+                if match:
+                    conditions.append("id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)")
+                    params.append(match)
+            else:
+                search_query = f"%{search_text}%"
+                conditions.append("(name LIKE ? OR surname LIKE ? OR phone LIKE ? OR address LIKE ?)")
+                params.extend([search_query] * 4)
+        
+        if filter_type == "debt":
+            conditions.append("debt > 0")
+        elif filter_type == "paid":
+            conditions.append("debt <= 0")
+        
+        return conditions, params
+    
+    def _customer_page(self, search_text="", filter_type="all", cursor=None, backwards=False,
+                       page_size=50, sort_key="id", cancelled=None):
+        """İmleç (keyset) tabanlı sayfa; OFFSET kullanmadığı için her derinlikte aynı maliyet.
+
+        cursor, önceki sayfanın next_cursor/prev_cursor değeridir; backwards=True
+        imleçten önceki sayfayı getirir. Hatayı arayana bırakır.
+        """
+        column, position = self.SORT_KEYS[sort_key]
+        conditions, params = self._customer_conditions(search_text, filter_type)
+        op = "<" if backwards else ">"
+        direction = "DESC" if backwards else "ASC"
+        order = f"id {direction}" if column == "id" else f"{column} {direction}, id {direction}"
+        # Bir fazla satır: sonraki sayfa olup olmadığını ayrı sorgu olmadan anlamak için
+        limit = page_size + 1
+        
+        def select(extra_conditions, branch_order):
+            where = " AND ".join(conditions + extra_conditions)
+            return f"SELECT * FROM customers {'WHERE ' + where if where else ''} ORDER BY {branch_order} LIMIT ?"
+        
+        if cursor is None:
+            query = select([], order)
+            params = params + [limit]
+        elif column == "id":
+            query = select([f"id {op} ?"], order)
+            params = params + [cursor[1], limit]
+        else:
+            # (sütun, id) > (?, ?) indekste tam konumlanmaz; aynı değerli kayıtlar ve
+            # sonraki değerler iki ayrı indeks aramasıyla birleştirilir
+            same_value = select([f"{column} = ?", f"id {op} ?"], f"id {direction}")
+            next_values = select([f"{column} {op} ?"], order)
+            query = f"SELECT * FROM ({same_value}) UNION ALL SELECT * FROM ({next_values}) ORDER BY {order} LIMIT ?"
+            params = params + [cursor[0], cursor[1], limit] + params + [cursor[0], limit, limit]
+        
+        with self.connections.reader(cancelled) as db_cursor:
+            db_cursor.execute(query, params)
+            customers = db_cursor.fetchall()
+        
+        has_extra = len(customers) > page_size
+        customers = customers[:page_size]
+        if backwards:
+            customers.reverse()
+            has_more, has_prev = True, has_extra
+        else:
+            has_more, has_prev = has_extra, cursor is not None
+        
+        if not customers:
+            return EMPTY_PAGE
+        next_cursor = (customers[-1][position], customers[-1][0])
+        prev_cursor = (customers[0][position], customers[0][0])
+        return CustomerPage(customers, next_cursor, prev_cursor, has_more, has_prev)
+    
+    def count_customers(self, search_text="", filter_type="all"):
+        """Sayfa sayısı için toplam kayıt; yazma olmadıkça önbellekten döner"""
+        version = self.connections.write_count
+        if version != self._count_cache_version:
+            self._count_cache = {}
+            self._count_cache_version = version
+        
+        key = (search_text, filter_type)
+        if key not in self._count_cache:
+            conditions, params = self._customer_conditions(search_text, filter_type)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            try:
+                with self.connections.reader() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM customers {where}", params)
+                    self._count_cache[key] = cursor.fetchone()[0]
+            except sqlite3.Error as e:
+                raise StorageError(f"Müşteri sayısı alınamadı: {e}") from e
+        return self._count_cache[key]
+    
+    def update_customer_debt(self, customer_id, amount, is_payment=True, note=""):
+        """Borç/ödeme kaydını ve bakiye değişikliğini tek işlemde yaz; LedgerEntry döndürür.
+
+        Tutar (kuruş) sıfırdan büyük olmalı; yön is_payment ile belirlenir.
+        """
+        if amount <= 0:
+            raise ValidationError("Tutar sıfırdan büyük olmalı")
+        try:
+            return self.connections.write(
+                lambda cursor: self._record_transaction(cursor, customer_id, amount, is_payment, note))
+        except sqlite3.Error as e:
+            raise StorageError(f"Borç güncellenemedi: {e}") from e
+    
+    def _record_transaction(self, cursor, customer_id, amount, is_payment, note):
+        # Bakiye okunup yazılmaz; debt = debt ± ? ile veritabanında güncellenir
+        delta = -amount if is_payment else amount
+        payment_type = "payment" if is_payment else "debt"
+        
+        if SQLITE_HAS_RETURNING:
+            cursor.execute("UPDATE customers SET debt = debt + ? WHERE id = ? RETURNING debt", (delta, customer_id))
+            row = cursor.fetchone()
+        else:
+            cursor.execute("UPDATE customers SET debt = debt + ? WHERE id = ?", (delta, customer_id))
+            row = cursor.execute("SELECT debt FROM customers WHERE id = ?", (customer_id,)).fetchone() \
+                if cursor.rowcount else None
+        if row is None:
+            raise NotFoundError(f"Müşteri bulunamadı (id={customer_id})")
+        
+        # Ödeme kaydını ekle
+        cursor.execute('''
+            INSERT INTO payments (customer_id, amount, payment_type, date, note)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (customer_id, amount, payment_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), note))
+        return LedgerEntry(cursor.lastrowid, row[0])
+    
+    def get_customer(self, customer_id):
+        try:
+            with self.connections.reader() as cursor:
+                cursor.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
+                return cursor.fetchone()
+        except sqlite3.Error as e:
+            raise StorageError(f"Müşteri bilgisi alınamadı: {e}") from e
+    
+    def get_payments(self, customer_id, days=None):
+        try:
+            with self.connections.reader() as cursor:
+                if days:
+                    date_limit = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                    cursor.execute('''
+                        SELECT * FROM payments WHERE customer_id = ? AND date >= ?
+                        ORDER BY date DESC
+                    ''', (customer_id, date_limit))
+                else:
+                    cursor.execute('''
+                        SELECT * FROM payments WHERE customer_id = ?
+                        ORDER BY date DESC
+                    ''', (customer_id,))
+                
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"Ödemeler yüklenemedi: {e}") from e
+    
+    def delete_customer(self, customer_id):
+        try:
+            with self.connections.transaction() as cursor:
+                cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+                cursor.execute("DELETE FROM payments WHERE customer_id = ?", (customer_id,))
+        except sqlite3.Error as e:
+            raise StorageError(f"Müşteri silinemedi: {e}") from e
+    
+    def delete_payment(self, payment_id):
+        """Ödeme kaydını sil ve müşterinin borcunu tersine çevir"""
+        try:
+            self.connections.write(lambda cursor: self._reverse_payment(cursor, payment_id))
+            return True
+        except sqlite3.Error as e:
+            raise StorageError(f"İşlem silinemedi: {e}") from e
+    
+    def _reverse_payment(self, cursor, payment_id):
+        # Ödeme bilgilerini al
+        cursor.execute("SELECT customer_id, amount, payment_type FROM payments WHERE id = ?", (payment_id,))
+        payment = cursor.fetchone()
+        if not payment:
+            return
+        
+        # Borcu tersine çevir ve ödemeyi sil
+        customer_id, amount, payment_type = payment
+        delta = amount if payment_type == "payment" else -amount
+        cursor.execute("UPDATE customers SET debt = debt + ? WHERE id = ?", (delta, customer_id))
+        cursor.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
+    
+    def restore_customer(self, customer, payments):
+        """Silinen müşteriyi ödeme geçmişiyle birlikte geri yükle (geri alma için)"""
+        try:
+            with self.connections.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO customers (id, name, surname, phone, address, debt, created_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', customer)
+                cursor.executemany('''
+                    INSERT INTO payments (id, customer_id, amount, payment_type, note, date)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', payments)
+            return True
+        except sqlite3.Error as e:
+            raise StorageError(f"Geri alma hatası: {e}") from e
+    
+    # Dışa aktarmada imleçten her seferde okunan satır sayısı; bellek tablo boyutundan bağımsız kalır
+    EXPORT_FETCH_ROWS = 1000
+    # Dışa aktarılan başlıklar içe aktarmada aynı sütunlara eşlenir
+    CUSTOMER_EXPORT_HEADER = ['ID', 'Ad', 'Soyad', 'Telefon', 'Adres', 'Borç', 'Kayıt Tarihi']
+    PAYMENT_EXPORT_HEADER = ['No', 'Müşteri No', 'Tutar', 'Tür', 'Not', 'Tarih']
+    STATEMENT_EXPORT_HEADER = ['Müşteri No', 'Müşteri', 'Tarih', 'Açıklama', 'Borç', 'Ödeme', 'Bakiye']
+    PAYMENT_TYPE_NAMES = {"debt": "Borç", "payment": "Ödeme"}
+    
+    # Hesap ekstresi: her hareketten sonraki bakiye, güncel borçtan sonraki
+    # hareketlerin etkisi çıkarılarak bulunur. Pencere yalnızca bir müşterinin
+    # hareketlerini tutar; sıra idx_payments_customer_date'den gelir, sıralama yapılmaz.
+    STATEMENT_QUERY = '''
+        SELECT c.id, c.name, c.surname, c.debt, p.date, p.payment_type, p.note, p.amount,
+               c.debt - COALESCE(SUM(CASE WHEN p.payment_type = 'debt' THEN p.amount ELSE -p.amount END)
+                   OVER (PARTITION BY c.id ORDER BY p.date, p.id
+                         ROWS BETWEEN 1 FOLLOWING AND UNBOUNDED FOLLOWING), 0)
+        FROM customers c
+        LEFT JOIN payments p ON p.customer_id = c.id
+        ORDER BY c.id, p.date, p.id
+    '''
+    
+    @contextmanager
+    def _export_snapshot(self):
+        """Okuma işlemi açık tutulur: bütün sayfalar aynı anlık görüntüden yazılır.
+
+        Dışa aktarma uzun sürebilir; arayüzün okuma havuzunu meşgul etmemek
+        için ayrı bir bağlantı kullanılır.
+        """
+        with self.connections.reader(dedicated=True) as cursor:
+            cursor.execute("BEGIN")
+            try:
+                yield cursor
+            finally:
+                cursor.execute("ROLLBACK")
+    
+    def _fetch_chunks(self, cursor, sql, cancelled=None):
+        """Sorgu sonucunu EXPORT_FETCH_ROWS satırlık parçalar halinde üret"""
+        cursor.execute(sql)
+        while True:
+            rows = cursor.fetchmany(self.EXPORT_FETCH_ROWS)
+            if not rows:
+                return
+            if cancelled is not None and cancelled():
+                raise BackupCancelled()
+            yield rows
+    
+    @staticmethod
+    @contextmanager
+    def _atomic_file(filename):
+        """Geçici dosyaya yaz, başarıyla bitince asıl adla değiştir"""
+        temp_name = filename + ".tmp"
+        try:
+            yield temp_name
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+        os.replace(temp_name, filename)
+    
+    def _statement_rows(self, rows):
+        """Ekstre satırları: her müşteri için devreden bakiye ve ardından hareketleri"""
+        current = None
+        for customer_id, name, surname, debt, date, payment_type, note, amount, balance in rows:
+            if customer_id != current:
+                current = customer_id
+                customer = f"{name} {surname or ''}".strip()
+                # Hareket yoksa devreden bakiye güncel borçtur
+                net = 0 if amount is None else (amount if payment_type == "debt" else -amount)
+                yield (customer_id, customer, None, "Devreden bakiye", None, None, (balance - net) / 100)
+            if amount is None:
+                continue
+            description = self.PAYMENT_TYPE_NAMES.get(payment_type, payment_type)
+            if note:
+                description += f" - {note}"
+            yield (customer_id, customer, date, description,
+                   amount / 100 if payment_type == "debt" else None,
+                   amount / 100 if payment_type == "payment" else None,
+                   balance / 100)
+    
+    def _export_total(self, cursor, sheets):
+        cursor.execute("SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM payments)")
+        customers, payments = cursor.fetchone()
+        return (customers + payments) * sheets
+    
+    @staticmethod
+    def payments_filename(filename):
+        """CSV dışa aktarmada ödemelerin yazıldığı dosya: yedek.csv -> yedek_odemeler.csv"""
+        base, ext = os.path.splitext(filename)
+        return f"{base}_odemeler{ext}"
+    
+    @_file_errors("CSV dışa aktarma hatası")
+    def export_csv(self, filename, progress=None, cancelled=None):
+        """Müşterileri CSV dosyasına, ödemeleri yanındaki _odemeler dosyasına satır satır yaz.
+
+        progress(yazılan_satır, toplam_satır) her parçadan sonra çağrılır.
+        Arayüz göstermez; hatalar çağırana bırakılır.
+        """
+        done = 0
+        with self._export_snapshot() as cursor:
+            total = self._export_total(cursor, 1)
+            with self._atomic_file(filename) as customers_name, \
+                    self._atomic_file(self.payments_filename(filename)) as payments_name:
+                with open(customers_name, 'w', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(self.CUSTOMER_EXPORT_HEADER)
+                    for rows in self._fetch_chunks(cursor, '''
+                        SELECT id, name, surname, phone, address, debt, created_date FROM customers
+                    ''', cancelled):
+                        # Borç dosyada TL olarak yazılır
+                        writer.writerows(row[:5] + (format_money(row[5], currency=False),) + row[6:]
+                                         for row in rows)
+                        done += len(rows)
+                        if progress is not None:
+                            progress(done, total)
+                
+                with open(payments_name, 'w', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(self.PAYMENT_EXPORT_HEADER)
+                    for rows in self._fetch_chunks(cursor, '''
+                        SELECT id, customer_id, amount, payment_type, note, date FROM payments
+                    ''', cancelled):
+                        writer.writerows((row[0], row[1], format_money(row[2], currency=False),
+                                          self.PAYMENT_TYPE_NAMES.get(row[3], row[3])) + row[4:]
+                                         for row in rows)
+                        done += len(rows)
+                        if progress is not None:
+                            progress(done, total)
+        return filename
+    
+    @_file_errors("Excel dışa aktarma hatası")
+    def export_excel(self, filename, progress=None, cancelled=None):
+        """Müşteriler, Ödemeler ve Hesap Ekstresi sayfalarını sabit bellekle Excel'e yaz.
+
+        openpyxl write-only çalışma kitabı satırları diske akıtır; bellek
+        kullanımı satır sayısına bağlı değildir.
+        """
+        import openpyxl  # Açılışı yavaşlatmasın diye ilk kullanımda yüklenir
+        
+        done = 0
+        
+        def write(sheet, chunks, convert):
+            nonlocal done
+            for rows in chunks:
+                for row in rows:
+                    sheet.append(convert(row))
+                done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+        
+        workbook = openpyxl.Workbook(write_only=True)
+        try:
+            with self._export_snapshot() as cursor:
+                total = self._export_total(cursor, 2)
+                
+                sheet = workbook.create_sheet('Müşteriler')
+                sheet.append(self.CUSTOMER_EXPORT_HEADER)
+                write(sheet, self._fetch_chunks(cursor, '''
+                    SELECT id, name, surname, phone, address, debt, created_date FROM customers
+                ''', cancelled), lambda row: row[:5] + (row[5] / 100,) + row[6:])
+                
+                sheet = workbook.create_sheet('Ödemeler')
+                sheet.append(self.PAYMENT_EXPORT_HEADER)
+                write(sheet, self._fetch_chunks(cursor, '''
+                    SELECT id, customer_id, amount, payment_type, note, date FROM payments
+                ''', cancelled), lambda row: (row[0], row[1], row[2] / 100,
+                                              self.PAYMENT_TYPE_NAMES.get(row[3], row[3])) + row[4:])
+                
+                sheet = workbook.create_sheet('Hesap Ekstresi')
+                sheet.append(self.STATEMENT_EXPORT_HEADER)
+                statement = self._statement_rows(
+                    row for rows in self._fetch_chunks(cursor, self.STATEMENT_QUERY, cancelled) for row in rows)
+                # Ekstre müşteri başına bir devreden satırı ve hareket başına bir satırdır
+                for row in statement:
+                    sheet.append(row)
+                    done += 1
+                    if progress is not None and done % self.EXPORT_FETCH_ROWS == 0:
+                        progress(done, total)
+        except BaseException:
+            # Yarım kalan sayfaların akışları kapatılır; geçici dosyaları openpyxl siler
+            for sheet in workbook.worksheets:
+                if not sheet.closed:
+                    sheet.close()
+            raise
+        
+        with self._atomic_file(filename) as temp_name:
+            workbook.save(temp_name)
+        if progress is not None:
+            progress(total, total)
+        return filename
+    
+    # İçe aktarılan dosya başlıkları -> tablo sütunları.
+    # Başlıklar karşılaştırılmadan önce _normalize_header ile sadeleştirilir.
+    IMPORT_COLUMNS = {
+        "id": ("id", "no", "musteri no"),
+        "name": ("ad", "adi", "name", "isim"),
+        "surname": ("soyad", "soyadi", "surname"),
+        "phone": ("telefon", "tel", "phone", "gsm"),
+        "address": ("adres", "address"),
+        "debt": ("borc", "debt", "bakiye"),
+        "created_date": ("kayit tarihi", "created_date", "tarih"),
+    }
+    PAYMENT_IMPORT_COLUMNS = {
+        "id": ("id", "no", "islem no"),
+        "customer_id": ("musteri no", "musteri id", "customer_id"),
+        "amount": ("tutar", "miktar", "amount"),
+        "payment_type": ("tur", "islem turu", "tip", "type", "payment_type"),
+        "note": ("not", "aciklama", "note"),
+        "date": ("tarih", "date"),
+    }
+    PAYMENT_TYPES = {"borc": "debt", "debt": "debt", "odeme": "payment", "payment": "payment"}
+    # Excel sayfa adları; müşteri sayfası bulunamazsa ilk sayfa kullanılır
+    CUSTOMER_SHEETS = ("musteriler", "customers")
+    PAYMENT_SHEETS = ("odemeler", "payments", "hareketler")
+    
+    # Tablo başına doğrulama adı, toplanan tutar sütunu ve UPSERT sorgusu.
+    # id boşsa yeni kayıt eklenir, varsa mevcut kayıt güncellenir; şema korunur.
+    IMPORT_UPSERTS = {
+        "customers": ("Müşteri borçları", "debt", '''
+            INSERT INTO customers (id, name, surname, phone, address, debt, created_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = excluded.name, surname = excluded.surname, phone = excluded.phone,
+                address = excluded.address, debt = excluded.debt, created_date = excluded.created_date
+        '''),
+        "payments": ("Ödeme tutarları", "amount", '''
+            INSERT INTO payments (id, customer_id, amount, payment_type, note, date)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                customer_id = excluded.customer_id, amount = excluded.amount,
+                payment_type = excluded.payment_type, note = excluded.note, date = excluded.date
+        '''),
+    }
+    IMPORT_CHUNK_ROWS = 5000
+    # Bu boyuttan büyük dosyalarda tetikleyiciler askıya alınır; arama indeksi,
+    # özet ve değişiklik günlüğü aktarımın sonunda toplu olarak yeniden kurulur
+    BULK_IMPORT_BYTES = 2 * 1024 * 1024
+    MAX_IMPORT_ERRORS = 100
+    
+    @staticmethod
+    def _normalize_header(cell):
+        # 'Borç', 'BORÇ', 'Kayıt Tarihi', 'ADI' -> 'borc', 'borc', 'kayit tarihi', 'adi'
+        # 'İ'.lower() 'i' + birleşik nokta (U+0307) verir; nokta atılır
+        text = str(cell or "").strip().lower().replace("\u0307", "")
+        return text.translate(HEADER_TRANSLATION)
+    
+    @classmethod
+    def _map_header(cls, header, columns=None, required=("name",)):
+        """Başlık satırını {sütun: indeks} eşlemesine çevir"""
+        cells = [cls._normalize_header(cell) for cell in header]
+        mapping = {}
+        for column, aliases in (columns or cls.IMPORT_COLUMNS).items():
+            for index, cell in enumerate(cells):
+                if cell in aliases:
+                    mapping[column] = index
+                    break
+        missing = [column for column in required if column not in mapping]
+        if missing:
+            raise ValidationError(f"Başlık satırında eksik sütun: {', '.join(missing)}")
+        return mapping
+    
+    @staticmethod
+    def _parse_id(value, label="müşteri no"):
+        if isinstance(value, int):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        text = str(value).strip()
+        if not text.isdigit():
+            raise ValidationError(f"Geçersiz {label}: {value}")
+        return int(text)
+    
+    @staticmethod
+    def _row_reader(row, mapping):
+        """Satırdan sütun adıyla hücre okuyan fonksiyon; boş hücre None döner"""
+        def cell(column):
+            index = mapping.get(column)
+            if index is None or index >= len(row) or row[index] is None:
+                return None
+            value = row[index]
+            if isinstance(value, str):
+                value = value.strip()
+            elif isinstance(value, float) and value.is_integer():
+                # Excel sayıları float okunur: 5551234.0 -> 5551234
+                value = int(value)
+            return None if value == "" else value
+        return cell
+    
+    @classmethod
+    def _coerce_customer(cls, row, mapping, now):
+        """Dosya satırını customers satırına çevir; geçersizse ValidationError"""
+        cell = cls._row_reader(row, mapping)
+        name = cell("name")
+        if name is None:
+            raise ValidationError("Ad boş")
+        customer_id = cell("id")
+        debt = cell("debt")
+        created = cell("created_date")
+        return (
+            cls._parse_id(customer_id) if customer_id is not None else None,
+            str(name),
+            str(cell("surname") or ""),
+            str(cell("phone") or ""),
+            str(cell("address") or ""),
+            parse_money(debt) if debt is not None else 0,
+            parse_date(created) if created is not None else now,
+        )
+    
+    @classmethod
+    def _coerce_payment(cls, row, mapping, now):
+        """Dosya satırını payments satırına çevir; geçersizse ValidationError"""
+        cell = cls._row_reader(row, mapping)
+        payment_id = cell("id")
+        customer_id = cell("customer_id")
+        amount = cell("amount")
+        if customer_id is None:
+            raise ValidationError("Müşteri no boş")
+        if amount is None:
+            raise ValidationError("Tutar boş")
+        payment_type = cls.PAYMENT_TYPES.get(cls._normalize_header(cell("payment_type")))
+        if payment_type is None:
+            raise ValidationError(f"Geçersiz işlem türü: {cell('payment_type')}")
+        date = cell("date")
+        return (
+            cls._parse_id(payment_id, "işlem no") if payment_id is not None else None,
+            cls._parse_id(customer_id),
+            parse_money(amount),
+            payment_type,
+            str(cell("note") or ""),
+            parse_date(date) if date is not None else now,
+        )
+    
+    def _drop_derived_triggers(self, cursor):
+        self._drop_search_triggers(cursor)
+        for name in list(self.LEDGER_TRIGGERS) + list(self.CHANGE_LOG_TRIGGERS):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    
+    @contextmanager
+    def _bulk_import(self, bulk=False):
+        """İçe aktarma işlemi: hepsi tek işlemde yazılır, hata ya da iptalde hiçbir satır kalmaz.
+
+        bulk=True ise tetikleyiciler kaldırılır ve türetilmiş veriler sonda
+        yeniden kurulur. Sonunda hesap özeti tablolarla karşılaştırılır.
+        """
+        with self.connections.bulk_write() as cursor:
+            if bulk:
+                self._drop_derived_triggers(cursor)
+            yield cursor
+            if bulk:
+                # Eksik tetikleyiciler kurulur, indeks ve özet tablodan yeniden hesaplanır
+                self._ensure_derived()
+            
+            cursor.execute("SELECT total_debt, debtor_count FROM ledger_stats WHERE id = 1")
+            stats = cursor.fetchone()
+            cursor.execute("SELECT COALESCE(SUM(debt), 0), COUNT(*) FROM customers WHERE debt > 0")
+            if stats != cursor.fetchone():
+                raise ValidationError("Hesap özeti içe aktarılan verilerle tutmuyor")
+    
+    def _upsert_rows(self, cursor, table, rows, coerce, mapping, errors, progress=None, cancelled=None):
+        """(satır no, satır) çiftlerini coerce ile çevirip parça parça UPSERT et.
+
+        Geçersiz satırlar atlanır, ilk MAX_IMPORT_ERRORS tanesi errors'a eklenir.
+        Dosyada daha önce geçmiş bir numarayı taşıyan satır da hatalı sayılır
+        (ilki yazılır). Sonda yazılan satırların tutar toplamı tablodan okunup
+        dosyayla karşılaştırılır. (yazılan, atlanan) döndürür.
+        """
+        label, column, sql = self.IMPORT_UPSERTS[table]
+        value_index = 5 if table == "customers" else 2
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Doğrulama için yazılan satırlar: yeni eklenenler (id > son id) ve numarası verilenler
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        last_id = cursor.fetchone()[0]
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS import_ids (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.import_ids")
+        
+        imported = failed = expected = 0
+        # Dosyada geçen numaralar; temp.import_ids'e her parçada topluca yazılır
+        seen_ids = set()
+        
+        def reject(line, message):
+            nonlocal failed
+            failed += 1
+            if len(errors) < self.MAX_IMPORT_ERRORS:
+                errors.append((line, message))
+        
+        def flush(chunk, line):
+            if table == "payments":
+                # Olmayan müşteriye ait hareketler yazılmaz
+                customer_ids = {values[1] for _, values in chunk}
+                placeholders = ", ".join("?" * len(customer_ids))
+                cursor.execute(f"SELECT id FROM customers WHERE id IN ({placeholders})", tuple(customer_ids))
+                existing = {row[0] for row in cursor.fetchall()}
+                for row_line, values in chunk:
+                    if values[1] not in existing:
+                        reject(row_line, f"Müşteri bulunamadı: {values[1]}")
+                chunk = [item for item in chunk if item[1][1] in existing]
+            
+            # Numarası dosyada daha önce geçen satır öncekinin üzerine yazılmaz, hata olarak bildirilir
+            values = []
+            new_ids = []
+            for row_line, row in chunk:
+                if row[0] is not None:
+                    if row[0] in seen_ids:
+                        reject(row_line, f"Yinelenen numara: {row[0]}")
+                        continue
+                    seen_ids.add(row[0])
+                    new_ids.append((row[0],))
+                values.append(row)
+            cursor.executemany("INSERT INTO temp.import_ids (id) VALUES (?)", new_ids)
+            cursor.executemany(sql, values)
+            if cancelled is not None and cancelled():
+                raise ImportCancelled()
+            if progress is not None:
+                progress(line)
+            return len(values), sum(row[value_index] for row in values)
+        
+        chunk = []
+        line = 0
+        for line, row in rows:
+            if not any(cell not in (None, "") for cell in row):
+                continue
+            try:
+                chunk.append((line, coerce(row, mapping, now)))
+            except ValueError as e:
+                reject(line, str(e))
+                continue
+            if len(chunk) >= self.IMPORT_CHUNK_ROWS:
+                count, total = flush(chunk, line)
+                imported += count
+                expected += total
+                chunk = []
+        if chunk:
+            count, total = flush(chunk, line)
+            imported += count
+            expected += total
+        
+        cursor.execute(f"SELECT COALESCE(SUM({column}), 0) FROM {table} WHERE id > ? OR id IN temp.import_ids",
+                       (last_id,))
+        actual = cursor.fetchone()[0]
+        cursor.execute("DROP TABLE temp.import_ids")
+        if actual != expected:
+            # Yinelenen numaralar ayıklandığı için fark ancak yazma hatasından kaynaklanır
+            raise ValidationError(f"{label} doğrulanamadı: dosyada {format_money(expected)}, "
+                                  f"kaydedilen {format_money(actual)}")
+        return imported, failed
+    
+    @_file_errors("CSV içe aktarma hatası")
+    def import_csv(self, filename, progress=None, cancelled=None):
+        """CSV dosyasını akış halinde müşteri tablosuna aktar; ImportResult döndürür.
+
+        Sütunlar başlıktan eşlenir, ayraç (',' ';' sekme) başlıktan seçilir.
+        progress(okunan_bayt, toplam_bayt) her parçadan sonra çağrılır.
+        Arayüz göstermez; hatalar çağırana bırakılır.
+        """
+        total = os.path.getsize(filename)
+        errors = []
+        with open(filename, 'rb') as raw:
+            header_line = raw.readline().decode('utf-8-sig', errors='ignore')
+            raw.seek(0)
+            delimiter = max(",;\t", key=header_line.count)
+            file = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            reader = csv.reader(file, delimiter=delimiter)
+            mapping = self._map_header(next(reader, []))
+            rows = ((reader.line_num, row) for row in reader)
+            with self._bulk_import(bulk=total >= self.BULK_IMPORT_BYTES) as cursor:
+                imported, failed = self._upsert_rows(
+                    cursor, "customers", rows, self._coerce_customer, mapping, errors,
+                    progress=(lambda line: progress(raw.tell(), total)) if progress else None,
+                    cancelled=cancelled)
+        return ImportResult(imported, failed, errors)
+    
+    @_file_errors("Excel içe aktarma hatası")
+    def import_excel(self, filename, progress=None, cancelled=None):
+        """Excel çalışma kitabını salt okunur modda satır satır aktar; ImportResult döndürür.
+
+        Müşteri sayfası ('Müşteriler' ya da ilk sayfa) ve varsa 'Ödemeler'
+        sayfası mevcut tablolara UPSERT edilir. progress(okunan_satır,
+        toplam_satır) her parçadan sonra çağrılır. Ödemeler bakiyeyi
+        değiştirmez; bakiye müşteri sayfasındaki borçtur.
+        """
+        # Açılışı yavaşlatmasın diye ilk kullanımda yüklenir
+        import openpyxl
+        from openpyxl.utils.exceptions import InvalidFileException
+        
+        errors = []
+        try:
+            workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        except InvalidFileException as e:
+            raise DataFileError(f"Excel dosyası açılamadı: {e}") from e
+        try:
+            sheets = {self._normalize_header(name): workbook[name] for name in workbook.sheetnames}
+            customers = next((sheets[name] for name in self.CUSTOMER_SHEETS if name in sheets),
+                             workbook.worksheets[0])
+            payments = next((sheets[name] for name in self.PAYMENT_SHEETS if name in sheets), None)
+            
+            total = sum(sheet.max_row or 0 for sheet in (customers, payments) if sheet is not None)
+            done = 0
+            
+            def sheet_rows(sheet):
+                rows = sheet.iter_rows(values_only=True)
+                return next(rows, ()), enumerate(rows, start=2)
+            
+            def report(offset):
+                return (lambda line: progress(offset + line, total)) if progress else None
+            
+            bulk = os.path.getsize(filename) >= self.BULK_IMPORT_BYTES
+            with self._bulk_import(bulk=bulk) as cursor:
+                header, rows = sheet_rows(customers)
+                mapping = self._map_header(header)
+                imported, failed = self._upsert_rows(cursor, "customers", rows, self._coerce_customer,
+                                                     mapping, errors, report(done), cancelled)
+                done += customers.max_row or 0
+                
+                payment_count = 0
+                if payments is not None:
+                    header, rows = sheet_rows(payments)
+                    mapping = self._map_header(header, self.PAYMENT_IMPORT_COLUMNS,
+                                               required=("customer_id", "amount", "payment_type"))
+                    payment_errors = []
+                    payment_count, payment_failed = self._upsert_rows(
+                        cursor, "payments", rows, self._coerce_payment, mapping, payment_errors,
+                        report(done), cancelled)
+                    failed += payment_failed
+                    room = self.MAX_IMPORT_ERRORS - len(errors)
+                    errors.extend((f"{line} ({payments.title})", message) for line, message in payment_errors[:room])
+        finally:
+            workbook.close()
+        return ImportResult(imported, failed, errors, payment_count)
+    
+    # Çevrimiçi yedekleme her adımda bu kadar sayfa kopyalar; adımlar arasında
+    # yazıcı bağlantı çalışmaya devam eder
+    BACKUP_PAGES_PER_STEP = 256
+    
+    @_backup_errors("Yedekleme hatası")
+    def backup_to(self, filename, progress=None, verify=False, cancelled=None):
+        """Veritabanının tamamını SQLite çevrimiçi yedekleme API'siyle dosyaya kopyala.
+
+        Kopya ayrı bir okuma bağlantısında açık tutulan tek bir işlem içinde alınır; araya
+        giren yazmalar kopyayı bozmaz ya da yeniden başlatmaz. progress(kopyalanan,
+        toplam) her adımdan sonra çağrılır; cancelled() True dönerse kopya
+        BackupCancelled ile yarıda bırakılır. verify=True ise kopya üzerinde
+        PRAGMA integrity_check çalıştırılır.
+        """
+        def step(status, remaining, total):
+            if cancelled is not None and cancelled():
+                raise BackupCancelled()
+            if progress is not None:
+                progress(total - remaining, total)
+        
+        temp_name = filename + ".tmp"
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        target = sqlite3.connect(temp_name)
+        try:
+            with self.connections.reader(dedicated=True) as cursor:
+                source = cursor.connection
+                # WAL anlık görüntüsünü sabitle: okuma işlemi ilk sorguda başlar
+                source.execute("BEGIN")
+                try:
+                    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                    source.backup(target, pages=self.BACKUP_PAGES_PER_STEP, progress=step)
+                finally:
+                    source.execute("ROLLBACK")
+            if verify:
+                self._check_integrity(target)
+        except BaseException:
+            target.close()
+            os.remove(temp_name)
+            raise
+        target.close()
+        # Yarım kalan kopya hiçbir zaman yedek adıyla görünmesin
+        os.replace(temp_name, filename)
+        return filename
+    
+    @staticmethod
+    def _check_integrity(conn):
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise BackupError(f"Bütünlük kontrolü başarısız: {result}")
+    
+    # Bu kadar artımlı yedekten sonra zincir yeni bir tam görüntüyle başlar
+    FULL_BACKUP_EVERY = 24
+    
+    def backup_incremental(self, progress=None, cancelled=None):
+        """Otomatik yedek: son yedekten beri değişen satırları delta olarak depoya yaz.
+
+        Depoda zincir yoksa, zincir FULL_BACKUP_EVERY deltaya ulaştıysa ya da
+        değişiklik günlüğü kesintiye uğradıysa tam görüntü alınır. Hiç
+        değişiklik yoksa dosya yazılmaz. (kayıt, yeni_mi) döndürür.
+        """
+        chain = self.backups.latest_chain(self.database_id)
+        if cancelled is not None and cancelled():
+            raise BackupCancelled()
+        if chain and chain[-1].get("seq") is not None and len(chain) <= self.FULL_BACKUP_EVERY:
+            changes = self._collect_changes(chain[-1]["seq"])
+            if changes is not None:
+                seq, payload = changes
+                if payload is None:
+                    return chain[-1], False
+                if cancelled is not None and cancelled():
+                    raise BackupCancelled()
+                entry = self.backups.add_delta(payload, chain[0], seq, database=self.database_id)
+                self._trim_change_log(seq)
+                return entry, True
+        return self._backup_full(progress, cancelled)
+    
+    def _backup_full(self, progress=None, cancelled=None):
+        snapshot = os.path.join(self.backups.ensure_folder(), ".snapshot.db")
+        self.backup_to(snapshot, progress=progress, verify=True, cancelled=cancelled)
+        try:
+            # Görüntünün içerdiği son günlük sırası: sonraki deltalar buradan başlar
+            conn = sqlite3.connect(snapshot)
+            try:
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+            finally:
+                conn.close()
+            seq = row[0] if row else 0
+            sha256 = self._content_hash(snapshot, cancelled)
+            if cancelled is not None and cancelled():
+                raise BackupCancelled()
+            entry, created = self.backups.add(snapshot, sha256=sha256, seq=seq,
+                                              database=self.database_id)
+        finally:
+            os.remove(snapshot)
+        self._trim_change_log(seq)
+        return entry, created
+    
+    def _collect_changes(self, since_seq):
+        """since_seq sonrası değişen satırları tek bir okuma işleminde topla.
+
+        Tam yedek gerekiyorsa None, değişiklik yoksa (seq, None), varsa
+        (seq, delta) döndürür. Delta JSON'a yazılabilir bir sözlüktür.
+        """
+        with self.connections.reader(dedicated=True) as cursor:
+            conn = cursor.connection
+            conn.execute("BEGIN")
+            try:
+                cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+                row = cursor.fetchone()
+                last_seq = row[0] if row else 0
+                if last_seq < since_seq:
+                    # Veritabanı depodaki zincirden daha eski (başka dosya geri yüklendi)
+                    return None
+                
+                cursor.execute("SELECT DISTINCT tbl, row_id FROM change_log WHERE seq > ?", (since_seq,))
+                changed = cursor.fetchall()
+                if any(table == "*" for table, _ in changed):
+                    return None
+                if not changed:
+                    return last_seq, None
+                
+                delta = {"since": since_seq, "seq": last_seq}
+                for table in ("customers", "payments"):
+                    cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+                    columns = [column[0] for column in cursor.description]
+                    ids = sorted({row_id for name, row_id in changed if name == table})
+                    rows = []
+                    for start in range(0, len(ids), 500):
+                        chunk = ids[start:start + 500]
+                        cursor.execute(f"SELECT * FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                        rows.extend(cursor.fetchall())
+                    found = {row[0] for row in rows}
+                    # Günlükte olup tabloda olmayan satırlar silinmiştir
+                    delta[table] = {
+                        "columns": columns,
+                        "upsert": rows,
+                        "delete": [row_id for row_id in ids if row_id not in found],
+                    }
+                if any(table == "settings" for table, _ in changed):
+                    cursor.execute("SELECT key, value FROM settings WHERE key != 'last_backup'")
+                    delta["settings"] = cursor.fetchall()
+                return last_seq, delta
+            finally:
+                conn.execute("ROLLBACK")
+    
+    def _trim_change_log(self, seq):
+        # Yedeğe girmiş kayıtlar artık gerekmez
+        self.connections.write(lambda cursor: cursor.execute("DELETE FROM change_log WHERE seq <= ?", (seq,)))
+    
+    @staticmethod
+    def _apply_deltas(conn, deltas):
+        """Deltaları sırayla geri yüklenen kopyaya uygula"""
+        # REPLACE'in sildiği satırlar için de tetikleyiciler (arama indeksi, özet) çalışsın
+        conn.execute("PRAGMA recursive_triggers = ON")
+        conn.execute("BEGIN")
+        try:
+            for delta in deltas:
+                for table in ("customers", "payments"):
+                    part = delta[table]
+                    columns = ", ".join(part["columns"])
+                    placeholders = ", ".join("?" * len(part["columns"]))
+                    conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in part["delete"]])
+                    conn.executemany(f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})",
+                                     part["upsert"])
+                if "settings" in delta:
+                    conn.execute("DELETE FROM settings WHERE key != 'last_backup'")
+                    conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", delta["settings"])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def restore_point(self, entry):
+        """Depodaki bir geri yükleme noktasını (tam görüntü + deltaları) geri yükle"""
+        try:
+            chain = self.backups.chain_for(entry)
+            deltas = [self.backups.read_delta(delta) for delta in chain[1:]]
+        except (IOError, ValueError) as e:
+            raise BackupError(f"Geri yükleme hatası: {e}") from e
+        return self.restore_from(os.path.join(self.backups.folder, chain[0]["file"]), deltas)
+    
+    def restore_from(self, filename, deltas=()):
+        """Veritabanı yedeğini doğrulayıp mevcut dosyanın yerine koy.
+
+        Verilen deltalar kopyaya sırayla uygulanır. Mevcut dosya '.onceki'
+        uzantısıyla saklanır. Bağlantılar kapatılıp yeniden açılır; eski
+        sürümden alınmış yedeklere geçişler uygulanır.
+        """
+        staged = self.db_name + ".restore"
+        try:
+            # Depodaki sıkıştırılmış görüntüler açılarak, düz .db dosyaları kopyalanarak alınır
+            BackupRepository.extract(filename, staged)
+            conn = sqlite3.connect(staged, isolation_level=None)
+            try:
+                if deltas:
+                    self._apply_deltas(conn, deltas)
+                self._check_integrity(conn)
+                # Veresiye veritabanı olmayan dosyaları reddet
+                conn.execute("SELECT COUNT(*) FROM customers").fetchone()
+                conn.execute("SELECT COUNT(*) FROM payments").fetchone()
+            finally:
+                conn.close()
+            
+            commit_hook = self.connections.commit_hook
+            # Geri yüklenen dosya başka bir veritabanından gelmiş olabilir; kimlik bu dosyanınki kalır
+            database_id = self.database_id
+            self.connections.close()
+            # Yavaş sorgu günlüğünün plan bağlantısı da dosyayı açık tutmamalı
+            paused = self.tracer.paused() if self.tracer is not None else nullcontext()
+            try:
+                with paused:
+                    for suffix in ("-wal", "-shm"):
+                        if os.path.exists(self.db_name + suffix):
+                            os.remove(self.db_name + suffix)
+                    os.replace(self.db_name, self.db_name + ".onceki")
+                    os.replace(staged, self.db_name)
+            finally:
+                # Dosya değişse de değişmese de bağlantılar yeniden açılır
+                self.connections = ConnectionManager(self.db_name)
+                self.connections.commit_hook = commit_hook
+                self.connections.set_tracer(self.tracer)
+                self.settings.connections = self.connections
+                self._count_cache_version = -1
+            self.init_db()
+            self.settings.reload()
+            if database_id:
+                self.settings.set('database_id', database_id)
+            # Geri yüklenen dosyanın günlüğü depodaki zincirle uyuşmaz
+            self.connections.write(self._request_full_backup)
+            return True
+        except (sqlite3.Error, OSError, BackupError) as e:
+            if os.path.exists(staged):
+                os.remove(staged)
+            if isinstance(e, BackupError):
+                raise
+            raise BackupError(f"Geri yükleme hatası: {e}") from e
+    
+    # Yedeğin içerik karmasına giren sorgular. Sayfa baytları aynı veride bile
+    # değişebildiği için karma satırlardan üretilir; her yedekte değişen
+    # last_backup ve tablolardan türetilen indeks/özet dışarıda bırakılır.
+    CONTENT_HASH_QUERIES = (
+        "PRAGMA user_version",
+        "SELECT * FROM customers ORDER BY id",
+        "SELECT * FROM payments ORDER BY id",
+        "SELECT * FROM settings WHERE key != 'last_backup' ORDER BY key",
+    )
+    
+    @classmethod
+    def _content_hash(cls, filename, cancelled=None):
+        digest = hashlib.sha256()
+        conn = sqlite3.connect(filename)
+        if cancelled is not None:
+            conn.set_progress_handler(lambda: 1 if cancelled() else 0, 10000)
+        try:
+            for query in cls.CONTENT_HASH_QUERIES:
+                digest.update(query.encode("utf-8"))
+                for row in conn.execute(query):
+                    digest.update(repr(row).encode("utf-8"))
+        except sqlite3.OperationalError:
+            if cancelled is not None and cancelled():
+                raise BackupCancelled()
+            raise
+        finally:
+            conn.close()
+        return digest.hexdigest()
+    
+    def get_setting(self, key):
+        try:
+            return self.settings.get(key)
+        except sqlite3.Error as e:
+            raise StorageError(f"Ayar alınamadı: {e}") from e
+    
+    def set_setting(self, key, value):
+        return self.set_settings({key: value})
+    
+    def set_settings(self, values):
+        """Birden çok ayarı tek işlemde kaydet"""
+        try:
+            changed = self.settings.update(values)
+            
+            # Windows başlangıç ayarını güncelle
+            if 'start_with_windows' in changed:
+                set_startup(changed['start_with_windows'] == '1')
+            
+            return True
+        except sqlite3.Error as e:
+            raise StorageError(f"Ayar kaydedilemedi: {e}") from e
+    
+    # Otomatik yedekleme sıklığı -> son yedekten sonraki yedek zamanı
+    BACKUP_INTERVALS = {
+        "hourly": lambda last: last + timedelta(hours=1),
+        "daily": lambda last: last + timedelta(days=1),
+        "weekly": lambda last: last + timedelta(days=7),
+        # Aylık yedek, son yedeğin ayından sonraki ayın başında alınır
+        "monthly": lambda last: (last.replace(day=1) + timedelta(days=32)).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0),
+    }
+    
+    def next_backup_time(self):
+        """Bir sonraki otomatik yedeğin zamanı; otomatik yedek kapalıysa None"""
+        interval = self.BACKUP_INTERVALS.get(self.get_setting('auto_backup'))
+        if interval is None:
+            return None
+        
+        last_backup = self.get_setting('last_backup')
+        try:
+            last_date = datetime.strptime(last_backup, "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            # Hiç yedek alınmamış: hemen
+            return datetime.now()
+        return interval(last_date)
+    
+    def backup_due(self):
+        """Otomatik yedekleme sıklığına göre yedek zamanı geldi mi"""
+        due = self.next_backup_time()
+        return due is not None and due <= datetime.now()
+    
+    def auto_backup(self):
+        if self.backup_due():
+            self.backup()
+    
+    @_backup_errors("Otomatik yedekleme hatası")
+    def run_auto_backup(self, progress=None, cancelled=None):
+        """Otomatik yedeği arayüz göstermeden al; (dosya, yeni_mi) döndürür.
+
+        Arka plan iş parçacığında çalışır; hatalar çağırana bırakılır.
+        """
+        entry, created = self.backup_incremental(progress, cancelled)
+        self.settings.set('last_backup', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return os.path.join(self.backup_folder, entry["file"]), created
+    
+    EXPORT_EXTENSIONS = {"csv": "csv", "excel": "xlsx"}
+    
+    def backup_filename(self, folder, format):
+        timestamp = datetime.now().strftime('%d-%m-%Y_%H%M')
+        extension = self.EXPORT_EXTENSIONS.get(format, format)
+        return os.path.join(folder, f"veresiye_yedek_{timestamp}.{extension}")
+    
+    def export_backup(self, filename, format, progress=None, cancelled=None):
+        """CSV/Excel yedeğini yaz ve son yedek zamanını kaydet.
+
+        Arka plan iş parçacığında çalışabilir; hatalar çağırana bırakılır.
+        """
+        exporter = self.export_csv if format == "csv" else self.export_excel
+        exporter(filename, progress, cancelled)
+        self.settings.set('last_backup', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return filename
+    
+    @_backup_errors("Yedekleme hatası")
+    def backup(self, format="db", folder=None, progress=None, cancelled=None):
+        """Yedek al; yazılan dosyanın yolunu döndürür.
+
+        folder verilmezse veritabanı yedeği depoya (değişen satırlar delta
+        olarak) yazılır, CSV/Excel yedekleri yedek klasörüne. folder
+        verilirse o klasöre tek dosya yazılır.
+        """
+        if format == "db" and folder is None:
+            return self.run_auto_backup(progress, cancelled)[0]
+        filename = self.backup_filename(folder or self.backups.ensure_folder(), format)
+        if format == "db":
+            self.backup_to(filename, progress, verify=True, cancelled=cancelled)
+            self.settings.set('last_backup', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            return filename
+        if format in self.EXPORT_EXTENSIONS:
+            return self.export_backup(filename, format, progress, cancelled)
+        raise ValidationError(f"Bilinmeyen yedek biçimi: {format}")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""settings tablosunun bellekteki, yazarken veritabanına da yazan kopyası"""
+
+import threading
+
+class SettingsStore:
+    """settings tablosunun bellekteki kopyası.
+
+    Tablo ilk okumada bir kez yüklenir, okumalar sözlükten yapılır. Yazmalar
+    aynı anda veritabanına da yazılır (write-through); birden çok anahtar tek
+    işlemde kaydedilir. Değişen her anahtar için dinleyiciler listener(key,
+    value) ile, yazan iş parçacığında çağrılır.
+    """
+
+    def __init__(self, connections):
+        self.connections = connections
+        self._values = None
+        self._lock = threading.RLock()
+        self._listeners = []
+
+    def _load(self):
+        with self._lock:
+            if self._values is None:
+                with self.connections.reader() as cursor:
+                    cursor.execute("SELECT key, value FROM settings")
+                    self._values = dict(cursor.fetchall())
+            return self._values
+
+    def get(self, key, default=None):
+        value = self._load().get(key)
+        return default if value is None else value
+
+    def get_int(self, key, default=0):
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        return default if value is None else value == '1'
+
+    def update(self, values):
+        """Anahtarları tek işlemde kaydet; yalnızca gerçekten değişenler yazılır.
+
+        Değişen anahtarları sözlük olarak döndürür.
+        """
+        with self._lock:
+            current = self._load()
+            changed = {key: str(value) for key, value in values.items() if current.get(key) != str(value)}
+            if not changed:
+                return {}
+            with self.connections.transaction() as cursor:
+                cursor.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", changed.items())
+            current.update(changed)
+        self._notify(changed)
+        return changed
+
+    def set(self, key, value):
+        return self.update({key: value})
+
+    def reload(self):
+        """Tabloyu yeniden oku (geri yükleme sonrası) ve değişenleri bildir"""
+        with self._lock:
+            old = self._values or {}
+            self._values = None
+            new = self._load()
+            changed = {key: value for key, value in new.items() if old.get(key) != value}
+        self._notify(changed)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, changed):
+        for key, value in changed.items():
+            for listener in list(self._listeners):
+                listener(key, value)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""Tohumlu sentetik defter üreticisi: gerçekçi müşteriler ve borç/ödeme geçmişi.
+
+Aynı tohum ve profil her zaman aynı veritabanını üretir; performans
+ölçümleri (benchmark modülü) bu verilerle karşılaştırılabilir olur.
+"""
+
+import math
+import random
+import sqlite3
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from .errors import StorageError, ValidationError
+
+FIRST_NAMES = (
+    "Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "İsmail", "Osman", "Yusuf",
+    "Murat", "Ömer", "Ramazan", "Halil", "Süleyman", "Abdullah", "Mahmut", "Recep", "Salih", "Fatih",
+    "Kadir", "Emre", "Hakan", "Adem", "Kemal", "Yaşar", "Bekir", "Musa", "Metin", "Serkan",
+    "Burak", "Uğur", "Erkan", "Gökhan", "Cemal", "Şükrü", "Çetin", "Doğan", "Tuncay", "Oğuz",
+    "Fatma", "Ayşe", "Emine", "Hatice", "Zeynep", "Elif", "Meryem", "Şerife", "Zehra", "Sultan",
+    "Hanife", "Merve", "Havva", "Zeliha", "Esra", "Fadime", "Özlem", "Hacer", "Melek", "Yasemin",
+    "Hülya", "Leyla", "Gülsüm", "Songül", "Büşra", "Derya", "Kübra", "Gül", "Sevgi", "İlknur",
+)
+
+SURNAMES = (
+    "Yılmaz", "Kaya", "Demir", "Çelik", "Şahin", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Özcan", "Korkmaz", "Çakır", "Erdoğan", "Yavuz", "Can", "Acar", "Şen", "Aktaş",
+    "Güler", "Yalçın", "Güneş", "Bozkurt", "Bulut", "Keskin", "Ünal", "Turan", "Gül", "Özer",
+    "Işık", "Kaplan", "Avcı", "Sarı", "Tekin", "Taş", "Köse", "Yüksel", "Ateş", "Aksoy",
+    "Ekinci", "Bayram", "Uçar", "Tunç", "Güven", "Karataş", "Sönmez", "Erdem", "Altun", "Çiftçi",
+)
+
+# (il, ilçeler)
+DISTRICTS = (
+    ("İstanbul", ("Üsküdar", "Kadıköy", "Bağcılar", "Esenyurt", "Fatih", "Pendik", "Ümraniye")),
+    ("Ankara", ("Çankaya", "Keçiören", "Yenimahalle", "Mamak", "Etimesgut")),
+    ("İzmir", ("Karşıyaka", "Bornova", "Buca", "Konak", "Çiğli")),
+    ("Bursa", ("Osmangazi", "Nilüfer", "Yıldırım", "İnegöl")),
+    ("Konya", ("Selçuklu", "Meram", "Karatay", "Ereğli")),
+    ("Gaziantep", ("Şahinbey", "Şehitkamil", "Nizip")),
+    ("Trabzon", ("Ortahisar", "Akçaabat", "Of")),
+    ("Diyarbakır", ("Bağlar", "Kayapınar", "Yenişehir")),
+)
+
+NEIGHBOURHOODS = (
+    "Atatürk", "Cumhuriyet", "Yeni", "Fatih", "Hürriyet", "İstiklal", "Gazi", "Merkez", "Yavuz Selim",
+    "Bahçelievler", "Çamlık", "Esentepe", "Karşıyaka", "Kocatepe", "Mimar Sinan", "Zafer", "Barbaros",
+)
+
+STREETS = (
+    "Lale", "Menekşe", "Gül", "Papatya", "Karanfil", "Çınar", "Ihlamur", "Söğüt", "Kavak", "Zambak",
+    "Şehitler", "Okul", "Cami", "Pazar", "Değirmen", "Fırın", "Çeşme", "Bahar", "Güneş", "Yıldız",
+)
+
+DEBIT_NOTES = ("", "", "", "Market alışverişi", "Ekmek", "Süt ve yumurta", "Sigara", "Temizlik malzemesi",
+               "Sebze meyve", "Haftalık alışveriş", "Tüp", "Kırtasiye")
+CREDIT_NOTES = ("", "", "Nakit", "Havale", "EFT", "Kredi kartı", "Maaş günü ödemesi", "Kısmi ödeme")
+
+# Mobil hat ön ekleri (05XX)
+PHONE_PREFIXES = tuple(range(530, 556)) + (501, 505, 506, 507, 551, 552, 553, 554, 555, 559)
+
+# Üretim profili: müşteri başına ortalama kayıt ve dağılımı, tutar dağılımı (kuruş),
+# kayıtların ödeme olma ve ödemelerin borcu kapatma oranı, geçmişin uzunluğu ve bitişi
+SyntheticProfile = namedtuple(
+    "SyntheticProfile",
+    "payments_per_customer count_distribution amount_median amount_sigma payment_share settle_share days until",
+    defaults=(10.0, "geometric", 15000, 0.9, 0.4, 0.3, 730, "2024-12-31"),
+)
+DEFAULT_PROFILE = SyntheticProfile()
+
+COUNT_DISTRIBUTIONS = ("geometric", "poisson", "uniform")
+
+# Dükkân açık saatleri (saniye): kayıtlar 08:00-21:00 arasına düşer
+SHOP_OPEN = 8 * 3600
+SHOP_HOURS = 13 * 3600
+
+# Bu kadar satırda bir yazılır ve ilerleme bildirilir
+GENERATE_CHUNK_ROWS = 10000
+
+def _count_sampler(rng, distribution, mean):
+    """Müşteri başına kayıt sayısı üreten fonksiyon (ortalaması mean)"""
+    if mean <= 0:
+        return lambda: 0
+    if distribution == "geometric":
+        # Uzun kuyruk: çoğu müşterinin az, birkaç müdavimin çok kaydı olur
+        log_q = math.log(mean / (mean + 1))
+        return lambda: int(math.log(1.0 - rng.random()) / log_q)
+    if distribution == "poisson":
+        if mean < 30:
+            limit = math.exp(-mean)
+            
+            def poisson():
+                count, product = 0, rng.random()
+                while product > limit:
+                    count += 1
+                    product *= rng.random()
+                return count
+            return poisson
+        deviation = math.sqrt(mean)
+        return lambda: max(0, int(rng.gauss(mean, deviation) + 0.5))
+    if distribution == "uniform":
+        high = int(2 * mean)
+        return lambda: rng.randint(0, high)
+    raise ValidationError(f"Bilinmeyen dağılım: {distribution}")
+
+def _phone(rng):
+    return f"0{rng.choice(PHONE_PREFIXES)}{rng.randrange(10_000_000):07d}"
+
+def _address(rng):
+    city, districts = rng.choice(DISTRICTS)
+    return (f"{rng.choice(NEIGHBOURHOODS)} Mah. {rng.choice(STREETS)} Sk. "
+            f"No:{rng.randint(1, 150)} {rng.choice(districts)}/{city}")
+
+def _time_of_day(seconds):
+    hours, rest = divmod(SHOP_OPEN + seconds, 3600)
+    return f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+def generate_rows(customers, profile=DEFAULT_PROFILE, seed=0):
+    """(müşteri satırları, ödeme satırları) parçaları üret.
+
+    Her müşteri için borç ve ödemeler tarih sırasıyla üretilir; müşterinin
+    borcu kayıtların toplamıdır (hesap ekstresinin son bakiyesiyle aynı).
+    Ödemeler bakiyeyi aşmaz; bir kısmı borcu tamamen kapatır.
+    """
+    rng = random.Random(seed)
+    next_count = _count_sampler(rng, profile.count_distribution, profile.payments_per_customer)
+    until = datetime.strptime(profile.until, "%Y-%m-%d")
+    days = [(until - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(profile.days, -1, -1)]
+    last_day = len(days) - 1
+    mu = math.log(profile.amount_median)
+    
+    customer_rows = []
+    payment_rows = []
+    payment_id = 0
+    for customer_id in range(1, customers + 1):
+        # Kayıtlar müşterinin ilk geldiği günden sonra
+        first_day = rng.randint(0, last_day)
+        count = next_count()
+        moments = sorted((rng.randint(first_day, last_day), rng.randrange(SHOP_HOURS)) for _ in range(count))
+        
+        balance = 0
+        for day, seconds in moments:
+            date = f"{days[day]} {_time_of_day(seconds)}"
+            if balance > 0 and rng.random() < profile.payment_share:
+                if rng.random() < profile.settle_share:
+                    amount = balance
+                else:
+                    # Yuvarlak tutarlı kısmi ödeme
+                    amount = min(balance, max(100, int(rng.lognormvariate(mu, profile.amount_sigma)) // 1000 * 1000))
+                balance -= amount
+                payment_rows.append((payment_id + 1, customer_id, amount, "payment", rng.choice(CREDIT_NOTES), date))
+            else:
+                amount = max(100, int(rng.lognormvariate(mu, profile.amount_sigma)) // 50 * 50)
+                balance += amount
+                payment_rows.append((payment_id + 1, customer_id, amount, "debt", rng.choice(DEBIT_NOTES), date))
+            payment_id += 1
+        
+        # Müşteri ilk kaydıyla birlikte açılır
+        created_day, created_seconds = moments[0] if moments else (first_day, rng.randrange(SHOP_HOURS))
+        created = f"{days[created_day]} {_time_of_day(created_seconds)}"
+        customer_rows.append((customer_id, rng.choice(FIRST_NAMES), rng.choice(SURNAMES), _phone(rng),
+                              _address(rng), balance, created))
+        
+        if len(customer_rows) >= GENERATE_CHUNK_ROWS or len(payment_rows) >= GENERATE_CHUNK_ROWS:
+            yield customer_rows, payment_rows
+            customer_rows, payment_rows = [], []
+    if customer_rows or payment_rows:
+        yield customer_rows, payment_rows
+
+def generate_ledger(ledger, customers, profile=DEFAULT_PROFILE, seed=0, progress=None):
+    """Boş bir deftere sentetik veri yaz; (müşteri, ödeme) sayısını döndürür.
+
+    Hepsi tek işlemde, tetikleyiciler kaldırılarak yazılır; arama indeksi ve
+    hesap özeti sonda yeniden kurulur. progress(yazılan_müşteri, toplam_müşteri).
+    """
+    if customers < 0:
+        raise ValidationError("Müşteri sayısı negatif olamaz")
+    if profile.count_distribution not in COUNT_DISTRIBUTIONS:
+        raise ValidationError(f"Bilinmeyen dağılım: {profile.count_distribution}")
+    if ledger.count_customers():
+        raise ValidationError("Sentetik veri yalnızca boş bir veritabanına yazılabilir")
+    
+    written = payments = 0
+    try:
+        with ledger._bulk_import(bulk=True) as cursor:
+            for customer_rows, payment_rows in generate_rows(customers, profile, seed):
+                cursor.executemany('''
+                    INSERT INTO customers (id, name, surname, phone, address, debt, created_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', customer_rows)
+                cursor.executemany('''
+                    INSERT INTO payments (id, customer_id, amount, payment_type, note, date)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', payment_rows)
+                written += len(customer_rows)
+                payments += len(payment_rows)
+                if progress is not None:
+                    progress(written, customers)
+    except sqlite3.Error as e:
+        raise StorageError(f"Sentetik veri yazılamadı: {e}") from e
+    return written, payments
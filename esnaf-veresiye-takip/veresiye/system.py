@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""İşletim sistemi tümleştirmesi: veri klasörü ve Windows başlangıç kaydı"""
+
+import os
+import sys
+
+def get_app_data_folder():
+    """Uygulama verilerini saklamak için klasör yolu"""
+    if sys.platform == "win32":
+        base_path = os.path.join(os.environ['APPDATA'], "VeresiyeDefteri")
+    else:
+        base_path = os.path.join(os.path.expanduser('~'), ".veresiyedefteri")
+    
+    if not os.path.exists(base_path):
+        os.makedirs(base_path)
+    return base_path
+
+def set_startup(enabled=True):
+    """Uygulamayı Windows başlangıcına ekle/kaldır"""
+    if sys.platform != "win32":
+        return False
+    import winreg  # Yalnızca Windows'ta bulunur
+        
+    app_name = "VeresiyeDefteri"
+    key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
+    
+    try:
+        key = winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            key_path,
+            0,
+            winreg.KEY_WRITE | winreg.KEY_READ
+        )
+        
+        if enabled:
+            # EXE veya script yolunu al
+            if getattr(sys, 'frozen', False):
+                # PyInstaller ile paketlenmiş
+                app_path = sys.executable
+            else:
+                # Script olarak çalışıyor
+                app_path = os.path.abspath(sys.argv[0])
+            
+            # Kayıt defterine ekle
+            winreg.SetValueEx(key, app_name, 0, winreg.REG_SZ, f'"{app_path}" --minimized')
+        else:
+            # Kayıt defterinden kaldır
+            try:
+                winreg.DeleteValue(key, app_name)
+            except FileNotFoundError:
+                # Zaten kayıtlı değilse sorun yok
+                pass
+        
+        winreg.CloseKey(key)
+        return True
+    except Exception as e:
+        print(f"Başlangıç ayarı hatası: {str(e)}")
+        return False
+
+def is_startup_enabled():
+    """Uygulamanın başlangıçta açılıp açılmadığını kontrol et"""
+    if sys.platform != "win32":
+        return False
+    import winreg  # Yalnızca Windows'ta bulunur
+        
+    app_name = "VeresiyeDefteri"
+    key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
+    
+    try:
+        key = winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            key_path,
+            0,
+            winreg.KEY_READ
+        )
+        
+        try:
+            value, _ = winreg.QueryValueEx(key, app_name)
+            winreg.CloseKey(key)
+            return value is not None
+        except FileNotFoundError:
+            winreg.CloseKey(key)
+            return False
+    except Exception:
+        return False
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""Sorgu izleme: deyim ve motor metodu gecikme histogramları, yavaş sorgu günlüğü.
+
+SQLite'ın trace ve progress geri çağrılarıyla çalışır. İzleme kapalıyken
+bağlantılara hiçbir geri çağrı bağlı değildir ve metotlar sarılmaz.
+"""
+
+import logging
+import logging.handlers
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Progress işleyicisi bu kadar sanal makine komutunda bir çağrılır
+PROGRESS_STEPS = 1000
+
+# Deyim metnindeki sabitler ve boşluklar; aynı sorgunun farklı değerleri tek satırda toplanır
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_SPACES = re.compile(r"\s+")
+_BINDINGS = re.compile(r"statement uses (\d+)")
+# SQLite'ın kendi ürettiği iç deyimler ('-- ...') ve FTS5 gölge tablolarına yazan deyimler
+_NESTED = re.compile(r"^--|_fts_(?:data|idx|docsize|content|config)\b")
+
+# Yalnızca bu deyimlerin sorgu planı alınır
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+def normalize_sql(sql):
+    """Deyimi gruplama anahtarına çevir: sabitler '?', değer listeleri '(?...)' olur"""
+    text = _LITERALS.sub("?", sql)
+    text = _PLACEHOLDER_LISTS.sub("(?...)", text)
+    return _SPACES.sub(" ", text).strip()[:300]
+
+class LatencyHistogram:
+    """Logaritmik kovalı gecikme histogramı (ms)"""
+
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        index = 0
+        for bound in self.BOUNDS_MS:
+            if ms <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """Yaklaşık yüzdelik: ilgili kovanın üst sınırı (son kovada en büyük değer)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(self.BOUNDS_MS[index], self.max_ms) if index < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip([str(bound) for bound in self.BOUNDS_MS] + ["inf"], self.counts)),
+        }
+
+class QueryTracer:
+    """Bağlantılara bağlanan izleyici.
+
+    Bir deyimin süresi, trace geri çağrısından aynı bağlantıdaki bir sonraki
+    deyime ya da bağlantının bırakılmasına kadar geçen süredir (satırların
+    okunması dahil). Eşiği aşan deyimler sorgu planıyla birlikte dönen bir
+    günlük dosyasına arka plan iş parçacığında yazılır.
+    """
+
+    LOG_MAX_BYTES = 1024 * 1024
+    LOG_BACKUP_COUNT = 3
+
+    def __init__(self, db_name, log_file, slow_ms=100):
+        self.db_name = db_name
+        self.log_file = log_file
+        self.slow_ms = slow_ms
+        self.statements = {}
+        self.methods = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._states = {}
+        self._slow = None
+        self._slow_thread = None
+        self._closed = False
+        self._explain_lock = threading.Lock()
+
+    # --- bağlantılar ---
+
+    def attach(self, conn):
+        """Bağlantıya trace ve adım sayacını bağla; progress işleyicisinde çağrılacak sayacı döndürür"""
+        # [deyim, başlangıç, adım, metot]
+        state = [None, 0.0, 0, None]
+
+        def trace(sql):
+            # Tetikleyici alt deyimleri dış deyimin metniyle yeniden, FTS5 gölge tablo
+            # deyimleri ayrı geri çağrılarla gelir; ikisi de süren deyimin devamıdır.
+            # Aynı metnin art arda çalıştırılması (executemany) da tek örnek sayılır.
+            if sql == state[0] or _NESTED.search(sql):
+                return
+            now = time.perf_counter()
+            if state[0] is not None:
+                self._finish(state, now)
+            state[0] = sql
+            state[1] = now
+            state[2] = 0
+            state[3] = self.current_method()
+
+        def step():
+            state[2] += 1
+
+        conn.set_trace_callback(trace)
+        self._states[conn] = state
+        return step
+
+    def release(self, conn):
+        """Bağlantı bırakılırken son deyimin süresini kaydet"""
+        state = self._states.get(conn)
+        if state is not None and state[0] is not None:
+            self._finish(state, time.perf_counter())
+            state[0] = None
+
+    def forget(self, conn):
+        """Kapatılan bağlantının durumunu bırak"""
+        self._states.pop(conn, None)
+
+    def _finish(self, state, now):
+        sql, started, steps, method = state
+        ms = (now - started) * 1000
+        key = normalize_sql(sql)
+        with self._lock:
+            histogram = self.statements.get(key)
+            if histogram is None:
+                histogram = self.statements[key] = LatencyHistogram()
+            histogram.add(ms)
+        if ms >= self.slow_ms and not self._closed:
+            self._log_slow(ms, steps, method, sql)
+
+    # --- motor metotları ---
+
+    def current_method(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def wrap(self, name, method):
+        """Metodu süresi ölçülen bir sarmalayıcıyla döndür"""
+        def traced(*args, **kwargs):
+            stack = getattr(self._local, "stack", None)
+            if stack is None:
+                stack = self._local.stack = []
+            stack.append(name)
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                stack.pop()
+                with self._lock:
+                    histogram = self.methods.get(name)
+                    if histogram is None:
+                        histogram = self.methods[name] = LatencyHistogram()
+                    histogram.add(ms)
+        traced.__name__ = getattr(method, "__name__", name)
+        traced.__doc__ = getattr(method, "__doc__", None)
+        return traced
+
+    # --- yavaş sorgu günlüğü ---
+
+    def _log_slow(self, ms, steps, method, sql):
+        if self._slow is None:
+            with self._lock:
+                if self._slow is None:
+                    self._slow = queue.Queue()
+                    self._slow_thread = threading.Thread(target=self._slow_worker, name="slow-query-log",
+                                                         daemon=True)
+                    self._slow_thread.start()
+        self._slow.put((datetime.now().strftime("%Y-%m-%d %H:%M:%S"), ms, steps, method, sql))
+
+    def _slow_worker(self):
+        """Yavaş deyimleri sorgu planlarıyla günlüğe yaz; plan ayrı bir bağlantıda alınır"""
+        logger = logging.Logger("veresiye.slow_queries")
+        handler = logging.handlers.RotatingFileHandler(self.log_file, maxBytes=self.LOG_MAX_BYTES,
+                                                       backupCount=self.LOG_BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        try:
+            while True:
+                item = self._slow.get()
+                if item is None:
+                    break
+                when, ms, steps, method, sql = item
+                plan = self._plan(sql)
+                lines = [f"{when}  {ms:.1f} ms  ~{steps * PROGRESS_STEPS} VM adımı  {method or '-'}",
+                         f"  {_SPACES.sub(' ', sql).strip()[:2000]}"]
+                lines.extend(f"    {step}" for step in plan)
+                logger.warning("\n".join(lines))
+        finally:
+            handler.close()
+
+    def _plan(self, sql):
+        """Deyimin planını kısa ömürlü bir bağlantıda al.
+
+        Bağlantı açık kalırsa Windows'ta veritabanı dosyası değiştirilemez
+        (geri yükleme); paused() süresince plan alınmaz.
+        """
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        with self._explain_lock:
+            try:
+                conn = sqlite3.connect(self.db_name)
+            except sqlite3.Error as e:
+                return [f"PLAN alınamadı: {e}"]
+            try:
+                conn.execute("PRAGMA query_only = ON")
+                return self._explain(conn, sql)
+            finally:
+                conn.close()
+
+    @contextmanager
+    def paused(self):
+        """Veritabanı dosyası değiştirilirken (geri yükleme) plan bağlantısı açılmasın"""
+        with self._explain_lock:
+            yield
+
+    @staticmethod
+    def _explain(conn, sql):
+        explain = f"EXPLAIN QUERY PLAN {sql}"
+        try:
+            try:
+                return [f"PLAN: {row[3]}" for row in conn.execute(explain)]
+            except sqlite3.ProgrammingError as e:
+                # Eski Python sürümleri parametreleri yerleştirilmemiş deyimi verir; plan NULL'larla alınır
+                match = _BINDINGS.search(str(e))
+                if match is None:
+                    raise
+                return [f"PLAN: {row[3]}" for row in conn.execute(explain, (None,) * int(match.group(1)))]
+        except sqlite3.Error as e:
+            # Geçici tablolar ve işlem içindeki şema değişiklikleri başka bağlantıdan görünmez
+            return [f"PLAN alınamadı: {e}"]
+
+    # --- rapor ---
+
+    def snapshot(self):
+        """Histogramların kopyası: {"statements": {...}, "methods": {...}}"""
+        with self._lock:
+            return {
+                "statements": {key: histogram.as_dict() for key, histogram in self.statements.items()},
+                "methods": {key: histogram.as_dict() for key, histogram in self.methods.items()},
+            }
+
+    def summary(self, limit=10):
+        """Toplam süreye göre en pahalı metotlar ve deyimler (metin)"""
+        report = self.snapshot()
+        lines = []
+        for title, rows in (("Metotlar", report["methods"]), ("Deyimler", report["statements"])):
+            lines.append(f"{title} (adet / ort. / p95 / en çok ms):")
+            ranked = sorted(rows.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:limit]
+            for key, row in ranked:
+                lines.append(f"  {row['count']:>6}  {row['mean_ms']:>8.2f}  {row['p95_ms']:>8.2f}  "
+                             f"{row['max_ms']:>9.2f}  {key[:120]}")
+            if not ranked:
+                lines.append("  (kayıt yok)")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.statements = {}
+            self.methods = {}
+
+    def close(self):
+        """Günlük iş parçacığını durdur; bekleyen kayıtlar yazılır"""
+        self._closed = True
+        if self._slow_thread is not None:
+            self._slow.put(None)
+            self._slow_thread.join(timeout=5)
+            self._slow_thread = None